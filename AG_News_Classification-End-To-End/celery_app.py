@@ -9,6 +9,19 @@ celery_app = Celery(
     backend="redis://localhost:6379/0",  # Results stored in Redis
 )
 
+# One prediction pipeline per worker process, its model is loaded by the first task and shared by
+# every later one. Not at worker start: the parent kills a process that is not up within
+# worker_proc_alive_timeout (4 s), less than loading, downloading or training the model can take.
+prediction_pipeline = None
+
+
+def get_prediction_pipeline():
+    global prediction_pipeline
+    if prediction_pipeline is None:
+        prediction_pipeline = PredictionPipeline()
+    return prediction_pipeline
+
+
 @celery_app.task
 def train_model_task():
     """
@@ -26,8 +39,7 @@ def predict_task(text: str):
     Run the prediction process as a Celery task.
     """
     try:
-        prediction_pipeline = PredictionPipeline()
-        predictions = prediction_pipeline.run_pipeline([text])  # Single input
+        predictions = get_prediction_pipeline().run_pipeline([text])  # Single input
         return predictions[0]  # Return the prediction
     except Exception as e:
         return {"status": "failure", "message": str(e)}
\ No newline at end of file
@@ -1,5 +1,5 @@
 import os
-import sys, shutil
+import sys
 import numpy as np
 import torch
 import pandas as pd
@@ -15,6 +15,7 @@ from sklearn.metrics import accuracy_score, f1_score
 from news.entity.config_entity import ModelEvaluationConfig, ModelTrainerConfig
 from news.entity.artifact_entity import ModelEvaluationArtifacts, ModelTrainerArtifacts, DataTransformationArtifacts
 from news.ml.model import RobertaModel
+from news.pipeline.model_registry import ModelRegistry
 
 class ModelEvaluation:
     def __init__(self, model_evaluation_config: ModelEvaluationConfig,
@@ -100,17 +101,13 @@ class ModelEvaluation:
             raise CustomException(e, sys) from e
 
     def copy_best_model(self, source_path: str):
-        """Copy the best model to the 'best_model' folder in the project directory."""
+        """Install the best model as the 'best_model' of the project directory, in a folder of its
+        version that the 'best_model' symlink is switched to, so the prediction workers never see it
+        half copied."""
         try:
-            # Define the path for the 'best_model' folder in the current project directory
             best_model_path = os.path.join(os.getcwd(), BEST_MODEL_DIR)
-            os.makedirs(best_model_path, exist_ok=True)
-            
-            # Copy all files from the source path to the 'best_model' directory
-            for file_name in os.listdir(source_path):
-                shutil.copy(os.path.join(source_path, file_name), best_model_path)
-            
-            logging.info(f"Copied best model from {source_path} to {best_model_path}")
+            version = ModelRegistry(model_dir=best_model_path).install_model(source_path)
+            logging.info(f"Installed best model version {version} from {source_path} as {best_model_path}")
         except Exception as e:
             raise CustomException(e, sys) from e
 
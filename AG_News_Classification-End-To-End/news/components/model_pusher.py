@@ -1,9 +1,12 @@
 import os, sys
+import json
+from datetime import datetime
 from news.logger import logging
 from news.exception import CustomException
 from news.configuration.s3_operations import S3Operation
 from news.entity.config_entity import ModelPusherConfig
 from news.entity.artifact_entity import ModelPusherArtifacts
+from news.pipeline.model_registry import model_file_digests, model_files_version
 from news.constants import *
 
 class ModelPusher:
@@ -40,14 +43,59 @@ class ModelPusher:
             )
             logging.info(f"Successfully uploaded final model to S3 bucket: {self.model_pusher_config.BUCKET_NAME}")
 
+            # The manifest goes last, so that a new version is only seen once all of its files are in place
+            manifest_path = self.write_version_manifest(self.model_pusher_config.TRAINED_MODEL_PATH)
+            self.awscloud.upload_file(
+                from_filename=manifest_path,
+                to_filename=f"{self.model_pusher_config.MODEL_NAME}/{MODEL_VERSION_MANIFEST}",
+                bucket_name=self.model_pusher_config.BUCKET_NAME,
+                remove=False,
+            )
+
+            # The evaluation already installed the accepted model as the local best_model, with a
+            # manifest of the same version since the version only depends on the files
+            with open(manifest_path) as manifest_file:
+                model_version = json.load(manifest_file)["version"]
+
             # Saving the model pusher artifacts
             model_pusher_artifact = ModelPusherArtifacts(
                 bucket_name=self.model_pusher_config.BUCKET_NAME,
-                trained_model_path=self.model_pusher_config.TRAINED_MODEL_PATH
+                trained_model_path=self.model_pusher_config.TRAINED_MODEL_PATH,
+                model_version=model_version
             )
 
             logging.info("Exited the initiate_model_pusher method of ModelTrainer class")
             return model_pusher_artifact
 
         except Exception as e:
-            raise CustomException(e, sys) from e
\ No newline at end of file
+            raise CustomException(e, sys) from e
+
+
+    def write_version_manifest(self, model_dir: str) -> str:
+        """
+            Method Name :   write_version_manifest
+            Description :   This method writes the version manifest of the model in model_dir, with the
+                            size and SHA-256 of each of its files and the version derived from them.
+
+            Output      :    Path of the manifest
+        """
+        logging.info("Entered the write_version_manifest method of ModelPusher class")
+        try:
+            files = model_file_digests(model_dir)
+            # Taken from the files when they are pushed, not from the start of the process, so that
+            # every model trained by a long running worker gets a version of its own
+            version = model_files_version(files)
+            manifest = {
+                "version": version,
+                "pushed_at": datetime.now().isoformat(),
+                "files": files,
+            }
+            manifest_path = os.path.join(model_dir, MODEL_VERSION_MANIFEST)
+            with open(manifest_path, "w") as manifest_file:
+                json.dump(manifest, manifest_file, indent=4)
+
+            logging.info(f"Wrote version manifest {manifest_path} for model version {version}")
+            return manifest_path
+
+        except Exception as e:
+            raise CustomException(e, sys) from e
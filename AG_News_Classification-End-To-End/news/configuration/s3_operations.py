@@ -1,5 +1,6 @@
 import os
 import sys
+import json
 from io import StringIO
 from typing import List, Union
 from news.constants import *
@@ -195,6 +196,32 @@ class S3Operation:
             raise CustomException(e, sys) from e
 
 
+    def read_json_object(self, key: str, bucket_name: str) -> Union[dict, None]:
+
+        """
+        Method Name :   read_json_object
+
+        Description :   This method reads the key object of bucket_name bucket as JSON
+        
+        Output      :   The parsed object, or None if there is no such key
+        """
+        logging.info("Entered the read_json_object method of S3Operations class")
+        try:
+            response = self.s3_client.get_object(Bucket=bucket_name, Key=key)
+            content = json.loads(response["Body"].read().decode())
+            logging.info("Exited the read_json_object method of S3Operations class")
+            return content
+
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey"):
+                logging.info(f"Object {key} not found in bucket {bucket_name}")
+                return None
+            raise CustomException(e, sys) from e
+
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+
     def create_folder(self, folder_name: str, bucket_name: str) -> None:
 
         """
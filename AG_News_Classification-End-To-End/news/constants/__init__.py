@@ -76,5 +76,13 @@ BEST_MODEL_DIR = "best_model"
 MODEL_EVALUATION_FILE_NAME = 'model_evaluation.csv'
 
 
+"""
+Model Pusher and Model Registry realted contant
+"""
+MODEL_VERSION_MANIFEST = "version.json"          # Written by the model pusher next to the model files
+MODEL_REGISTRY_CHECK_INTERVAL = 30               # Seconds between checks of the local best_model for a new version
+MODEL_REGISTRY_REMOTE_CHECK_INTERVAL = 300       # Seconds between checks of the manifest on S3, None to disable
+
+
 APP_HOST = "0.0.0.0"
 APP_PORT = 8080
\ No newline at end of file
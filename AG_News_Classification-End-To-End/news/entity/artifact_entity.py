@@ -39,4 +39,5 @@ class ModelEvaluationArtifacts:
 @dataclass
 class ModelPusherArtifacts:
     bucket_name: str
-    trained_model_path: str
\ No newline at end of file
+    trained_model_path: str
+    model_version: str = None
\ No newline at end of file
@@ -0,0 +1,341 @@
+import os
+import re
+import sys
+import json
+import fcntl
+import time
+import shutil
+import hashlib
+import threading
+from dataclasses import dataclass
+import torch
+from transformers import RobertaTokenizer, RobertaForSequenceClassification
+from news.logger import logging
+from news.exception import CustomException
+from news.constants import *
+from news.configuration.s3_operations import S3Operation
+
+
+def model_file_digests(model_dir: str) -> dict:
+    """
+    Size and SHA-256 of each file of model_dir but its version manifest, by file name.
+    """
+    files = {}
+    for file_name in sorted(os.listdir(model_dir)):
+        file_path = os.path.join(model_dir, file_name)
+        if file_name == MODEL_VERSION_MANIFEST or not os.path.isfile(file_path):
+            continue
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as model_file:
+            for block in iter(lambda: model_file.read(1 << 20), b""):
+                sha256.update(block)
+        files[file_name] = {"size": os.path.getsize(file_path), "sha256": sha256.hexdigest()}
+    return files
+
+
+def model_files_version(files: dict) -> str:
+    """
+    Version of a model with the file digests of model_file_digests: the same files always give the
+    same version, and any change of their content a new one.
+    """
+    digest = hashlib.sha256()
+    for file_name in sorted(files):
+        digest.update(f"{file_name} {files[file_name]['sha256']}\n".encode())
+    return digest.hexdigest()[:16]
+
+
+@dataclass
+class LoadedModel:
+    version: str
+    model: RobertaForSequenceClassification
+    tokenizer: RobertaTokenizer
+    loaded_at: float
+
+
+class ModelRegistry:
+    def __init__(self, model_dir: str = BEST_MODEL_DIR, bucket_name: str = BUCKET_NAME,
+                 bucket_folder_name: str = BEST_MODEL_DIR,
+                 check_interval: float = MODEL_REGISTRY_CHECK_INTERVAL,
+                 remote_check_interval: float = MODEL_REGISTRY_REMOTE_CHECK_INTERVAL):
+        """
+        Keeps the best model and its tokenizer loaded once per worker process and shared by every
+        prediction, instead of loading them from disk for each one.
+
+        At most every check_interval seconds, a prediction starts a check on a background thread of
+        whether the local best_model folder holds a new version, and at most every
+        remote_check_interval seconds whether S3 does, in which case one worker process downloads it
+        into a folder of its own next to the local one and points the best_model symlink at it. The
+        check loads a new version while every prediction keeps using the current model, then replaces
+        it in one assignment; predictions already running finish with the model they started with.
+        """
+        self.model_dir = model_dir
+        self.bucket_name = bucket_name
+        self.bucket_folder_name = bucket_folder_name
+        self.check_interval = check_interval
+        self.remote_check_interval = remote_check_interval
+        self.current = None
+        self.load_lock = threading.Lock()
+        self.last_check = time.monotonic()
+        self.last_remote_check = time.monotonic()
+        self.pending_version = None
+        self.awscloud = None
+
+    def manifest_version(self, model_dir: str = None):
+        """
+        Version written by the model pusher in the manifest of model_dir, None without a manifest.
+        """
+        manifest_path = os.path.join(model_dir or self.model_dir, MODEL_VERSION_MANIFEST)
+        try:
+            with open(manifest_path) as manifest_file:
+                return str(json.load(manifest_file)["version"])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def local_version(self, model_dir: str = None):
+        """
+        Version of the model in model_dir: the version of its manifest, or else a fingerprint of the
+        names, sizes and modification times of its files. None if there is no model there.
+        """
+        model_dir = model_dir or self.model_dir
+        version = self.manifest_version(model_dir)
+        if version is not None:
+            return version
+        try:
+            if not os.path.isfile(os.path.join(model_dir, "model.safetensors")):
+                return None
+            fingerprint = hashlib.sha1()
+            for file_name in sorted(os.listdir(model_dir)):
+                stat = os.stat(os.path.join(model_dir, file_name))
+                fingerprint.update(f"{file_name} {stat.st_size} {stat.st_mtime_ns}\n".encode())
+            return "files-" + fingerprint.hexdigest()[:12]
+        except OSError:
+            return None
+
+    def load(self, model_dir: str = None) -> LoadedModel:
+        """
+        Load the model and tokenizer of model_dir, ready for inference.
+        """
+        try:
+            # The folder the symlink points at now, so that a swap while loading cannot mix two versions
+            model_dir = os.path.realpath(model_dir or self.model_dir)
+            version = self.local_version(model_dir)
+            logging.info(f"Loading model version {version} from {model_dir}")
+            model = RobertaForSequenceClassification.from_pretrained(model_dir)
+            tokenizer = RobertaTokenizer.from_pretrained(model_dir)
+            device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            model.to(device)
+            model.eval()
+            logging.info(f"Loaded model version {version}")
+            return LoadedModel(version=version, model=model, tokenizer=tokenizer, loaded_at=time.time())
+
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def get(self, prepare=None) -> LoadedModel:
+        """
+        The current model, loaded on first use after calling prepare, which should make sure the
+        best model folder exists; reloaded when a check finds a new version.
+        """
+        if self.current is None:
+            with self.load_lock:
+                if self.current is None:
+                    if prepare is not None:
+                        prepare()
+                    self.current = self.load()
+                    self.last_check = self.last_remote_check = time.monotonic()
+            return self.current
+
+        # Only one check runs at a time, on a thread of its own: the prediction that starts it, like
+        # every other one, carries on with the current model while a new version is pulled and loaded
+        now = time.monotonic()
+        if now - self.last_check >= self.check_interval and self.load_lock.acquire(blocking=False):
+            self.last_check = now
+            try:
+                threading.Thread(target=self.refresh_in_background, args=(now,), daemon=True).start()
+            except Exception:
+                self.load_lock.release()
+                raise
+        return self.current
+
+    def refresh_in_background(self, now: float):
+        """
+        Run refresh on the thread started by get, which holds load_lock until it is done.
+        """
+        try:
+            self.refresh(now)
+        except Exception as e:
+            logging.warning(f"Could not check for a new model version: {e}")
+        finally:
+            self.load_lock.release()
+
+    def refresh(self, now: float = None) -> bool:
+        """
+        Load the local model if it is a new version, after pulling a new version from S3 if one is
+        due to be checked. Returns whether a new version was loaded.
+        """
+        now = time.monotonic() if now is None else now
+        self.last_check = now
+        if self.remote_check_interval is not None and now - self.last_remote_check >= self.remote_check_interval:
+            self.last_remote_check = now
+            self.pull_remote_model()
+
+        version = self.local_version()
+        if version is None or version == self.current.version:
+            self.pending_version = None
+            return False
+        if self.manifest_version() is None and version != self.pending_version:
+            # Files without a manifest may still be being copied, they are loaded once unchanged
+            self.pending_version = version
+            return False
+
+        try:
+            loaded = self.load()
+        except Exception as e:
+            logging.warning(f"Could not load model version {version}, keeping version {self.current.version}: {e}")
+            return False
+        if loaded.version != self.local_version():
+            logging.warning(f"Model version {loaded.version} changed while loading, keeping version {self.current.version}")
+            return False
+        logging.info(f"Switching from model version {self.current.version} to {loaded.version}")
+        self.current = loaded
+        self.pending_version = None
+        return True
+
+    def verify_model_dir(self, model_dir: str, manifest: dict) -> bool:
+        """
+        Whether model_dir holds the manifest of the version of manifest, and exactly the files listed
+        in it with their sizes and SHA-256.
+        """
+        if not manifest.get("files") or self.manifest_version(model_dir) != str(manifest.get("version")):
+            return False
+        try:
+            return model_file_digests(model_dir) == manifest["files"]
+        except OSError:
+            return False
+
+    def version_dir(self, version: str) -> str:
+        """
+        Folder of a version of the model, next to the best model symlink.
+        """
+        return f"{self.model_dir.rstrip(os.sep)}.{re.sub(r'[^A-Za-z0-9_.-]', '_', version)}"
+
+    def lock_model_dir(self, blocking: bool = True):
+        """
+        Open and lock the lock file of the best model, which serializes the changes of its symlink
+        and version folders across processes, and is released once closed. None if blocking is False
+        and another process holds it.
+        """
+        lock_file = open(f"{self.model_dir.rstrip(os.sep)}.lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def publish(self, version_dir: str):
+        """
+        Point the best model symlink at version_dir, with the lock of lock_model_dir held. The folder
+        of the previous version is kept for the processes still loading from it, older ones are
+        removed.
+        """
+        base_dir = self.model_dir.rstrip(os.sep)
+        previous_dir = None
+        if os.path.islink(base_dir):
+            previous_dir = os.path.realpath(base_dir)
+        elif os.path.exists(base_dir):
+            # A folder from before the symlink layout, moved aside once
+            previous_dir = f"{base_dir}.local"
+            shutil.rmtree(previous_dir, ignore_errors=True)
+            os.replace(base_dir, previous_dir)
+
+        link_path = f"{base_dir}.link-{os.getpid()}"
+        if os.path.lexists(link_path):
+            os.remove(link_path)
+        os.symlink(os.path.basename(version_dir), link_path)
+        os.replace(link_path, base_dir)
+
+        version_dirs = {os.path.realpath(version_dir), os.path.realpath(previous_dir or version_dir)}
+        parent_dir = os.path.dirname(os.path.abspath(base_dir))
+        prefix = os.path.basename(base_dir) + "."
+        for name in os.listdir(parent_dir):
+            path = os.path.join(parent_dir, name)
+            if (name.startswith(prefix) and os.path.isdir(path) and not os.path.islink(path)
+                    and os.path.realpath(path) not in version_dirs):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def install_model(self, source_dir: str) -> str:
+        """
+        Copy the model of source_dir, with a version manifest, into a folder of its version next to the
+        best model symlink, then point the symlink at it, rather than copying over the folder of the
+        version the workers are using. Returns the version.
+        """
+        files = model_file_digests(source_dir)
+        manifest = {"version": model_files_version(files), "files": files}
+        with self.lock_model_dir() as lock_file:
+            version_dir = self.version_dir(manifest["version"])
+            if not self.verify_model_dir(version_dir, manifest):
+                staging_dir = f"{self.model_dir.rstrip(os.sep)}.staging-{os.getpid()}"
+                shutil.rmtree(staging_dir, ignore_errors=True)
+                os.makedirs(staging_dir)
+                for file_name in files:
+                    shutil.copy(os.path.join(source_dir, file_name), staging_dir)
+                with open(os.path.join(staging_dir, MODEL_VERSION_MANIFEST), "w") as manifest_file:
+                    json.dump(manifest, manifest_file, indent=4)
+                shutil.rmtree(version_dir, ignore_errors=True)
+                os.replace(staging_dir, version_dir)
+            if os.path.realpath(self.model_dir) != os.path.realpath(version_dir):
+                self.publish(version_dir)
+        return manifest["version"]
+
+    def pull_remote_model(self) -> bool:
+        """
+        Download the best model from S3 if its manifest has another version than the local one. Only
+        one worker process downloads at a time, into a folder of the version next to the local one
+        that the best_model symlink then points at, once its files are checked against the manifest.
+        Returns whether a new version was published.
+        """
+        try:
+            if self.awscloud is None:
+                self.awscloud = S3Operation()
+            manifest = self.awscloud.read_json_object(
+                f"{self.bucket_folder_name}/{MODEL_VERSION_MANIFEST}", self.bucket_name)
+            if manifest is None or str(manifest.get("version")) == self.manifest_version():
+                return False
+
+            lock_file = self.lock_model_dir(blocking=False)
+            if lock_file is None:
+                # Another worker process is pulling, its version is picked up by the local checks
+                return False
+            with lock_file:
+                # It may have pulled this version while this process was reading the manifest
+                version = str(manifest.get("version"))
+                if version == self.manifest_version():
+                    return False
+
+                version_dir = self.version_dir(version)
+                if not self.verify_model_dir(version_dir, manifest):
+                    logging.info(f"Downloading model version {version} from S3")
+                    staging_dir = f"{self.model_dir.rstrip(os.sep)}.download-{os.getpid()}"
+                    shutil.rmtree(staging_dir, ignore_errors=True)
+                    self.awscloud.download_folder(folder_key=self.bucket_folder_name, bucket_name=self.bucket_name,
+                                                  local_dir=staging_dir)
+                    # A push while downloading can leave a mix of the files of two versions
+                    if not self.verify_model_dir(staging_dir, manifest):
+                        logging.warning(f"Downloaded files do not match the manifest of model version {version}, "
+                                        f"keeping the local model")
+                        shutil.rmtree(staging_dir, ignore_errors=True)
+                        return False
+                    shutil.rmtree(version_dir, ignore_errors=True)
+                    os.replace(staging_dir, version_dir)
+
+                self.publish(version_dir)
+                return True
+
+        except Exception as e:
+            logging.warning(f"Could not check S3 for a new model version: {e}")
+            return False
+
+
+# Shared by every prediction of the worker process
+model_registry = ModelRegistry()
@@ -1,12 +1,12 @@
 import os
 import sys
 import torch
-from transformers import RobertaTokenizer, RobertaForSequenceClassification
 from news.logger import logging
 from news.exception import CustomException
 from news.constants import *
 from news.pipeline.train_pipeline import TrainPipeline
 from news.configuration.s3_operations import S3Operation
+from news.pipeline.model_registry import model_registry
 
 
 class PredictionPipeline:
@@ -22,6 +22,7 @@ class PredictionPipeline:
             self.model_file = os.path.join(self.model_dir, "model.safetensors")
             self.awscloud = S3Operation()
             self.bucket_name = BUCKET_NAME
+            self.model_registry = model_registry
 
             # Label mapping for AG News classification
             self.label_mapping = {
@@ -113,13 +114,12 @@ class PredictionPipeline:
         except Exception as e:
             raise CustomException(e, sys) from e
 
-    def run_pipeline(self, texts):
+    def prepare_best_model(self):
         """
-        Main pipeline to handle prediction.
+        Make sure the best_model folder exists locally, downloading it from S3, or training it first
+        if there is none on S3 either.
         """
         try:
-            logging.info("Running the prediction pipeline")
-
             # Check if the best_model folder exists locally
             if not self.check_best_model_exists():
                 logging.warning("Best model not found locally. Checking on S3.")
@@ -136,15 +136,31 @@ class PredictionPipeline:
                     bucket_name=BUCKET_NAME,
                     local_dir=BEST_MODEL_DIR,
                 )
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def load_model(self):
+        """
+        The model and tokenizer of the worker process, loaded once and shared by every prediction.
+        """
+        try:
+            return self.model_registry.get(prepare=self.prepare_best_model)
+        except Exception as e:
+            raise CustomException(e, sys) from e
+
+    def run_pipeline(self, texts):
+        """
+        Main pipeline to handle prediction.
+        """
+        try:
+            logging.info("Running the prediction pipeline")
 
-            # Load model and tokenizer
-            logging.info("Loading model and tokenizer")
-            model = RobertaForSequenceClassification.from_pretrained(self.model_dir)
-            tokenizer = RobertaTokenizer.from_pretrained(self.model_dir)
+            # The model of the registry is only reloaded when a new version is found
+            loaded_model = self.load_model()
 
             # Predict
-            predictions = self.predict_texts(texts, model, tokenizer)
-            logging.info("Prediction pipeline completed successfully")
+            predictions = self.predict_texts(texts, loaded_model.model, loaded_model.tokenizer)
+            logging.info(f"Prediction pipeline completed successfully with model version {loaded_model.version}")
             return predictions
         except Exception as e:
             raise CustomException(e, sys) from e
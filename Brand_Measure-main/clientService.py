@@ -1,57 +1,63 @@
 import os
+import uuid
 from wsgiref import simple_server
-from flask import Flask, request, render_template, jsonify
+from flask import Flask, Response, request, render_template, jsonify
 from flask_cors import CORS
-import shutil
+from werkzeug.utils import secure_filename
 
-from com_in_ineuron_ai_speech_to_text.transcriptGenerator import generateTranscript
-from com_in_ineuron_ai_spellingcorrector.spellcorrector import spell_corrector
-from com_in_ineuron_ai_keywordspotter.keywordSpotter import AddMultiKeywords
+from com_in_ineuron_ai_spellingcorrector.spellcorrector import spell_corrector, engine
+from com_in_ineuron_ai_keywordspotter.keywordIndex import KeywordIndex
+from com_in_ineuron_ai_service.instrumentation import stageMetrics
+from com_in_ineuron_ai_service.jobQueue import JobQueue
+from com_in_ineuron_ai_service.transcriptCache import TranscriptCache
+from com_in_ineuron_ai_service.transcriptJobs import TranscriptJobRunner
 
 app = Flask(__name__)
 CORS(app)
 
 app.config['DEBUG'] = True
 
-class ClientService:
-    def __init__(self):
-        self.FolderPath = "InputFiles"
-        self.fileList = os.listdir(self.FolderPath)
-        self.separatedOutputFiles = "./SeparatedOutputFiles"
-        self.outputText = {}
-
-    def processAudioFile(self):
-        outputResponseObj = {}
-        for val in self.fileList:
-            inputFileTranscriptedOp = generateTranscript(os.path.join(self.FolderPath, val), self.separatedOutputFiles)
-        outputResponseObj["inputFileTranscriptedOp"] = inputFileTranscriptedOp
-
-        spellCorrectedOpMap = {}
-        for val in inputFileTranscriptedOp.keys():
-            spellcorrectedOp = spell_corrector(inputFileTranscriptedOp[val])
-            spellCorrectedOpMap[val] = spellcorrectedOp
-        outputResponseObj["spellCorrectedOpMap"] = spellCorrectedOpMap
-
-        extractedKeywordMap = {}
-        for val in inputFileTranscriptedOp.keys():
-            adding = AddMultiKeywords(inputFileTranscriptedOp[val], {"place": ["england"], "team": ["manchester united"], "game": ["football"]})
-            result = adding.addkey()
-            extractedKeywordMap[val] = result
-        outputResponseObj["extractedKeywors"] = extractedKeywordMap
-
-        return outputResponseObj
-
+# compiled once and shared by every request rather than per transcript
+keywordIndex = KeywordIndex({"place": ["england"], "team": ["manchester united"], "game": ["football"]})
 
 inputFileDir = "./InputFiles"
 archiveDir = './ArchivedInputFiles'
 
 
-def archiveOldInputFiles():
-    files = os.listdir(inputFileDir)
-    for f in files:
-        if os.path.exists(os.path.join(archiveDir, f)):
-            os.remove(os.path.join(archiveDir, f))
-        shutil.move(os.path.join(inputFileDir, f), archiveDir)
+class ClientService:
+    """
+    Uploaded files are processed as jobs, in upload order, by a pool of
+    worker threads; each job runs transcription, spelling correction
+    and keyword spotting as concurrent stages, and is archived once
+    processed; re-uploaded audio is answered from the transcript cache
+
+    The stages are timed for /metrics; with traceFolder, a Chrome trace
+    of each job is saved there too
+    """
+    def __init__(self, workers=1, traceFolder=None):
+        self.FolderPath = inputFileDir
+        self.separatedOutputFiles = "./SeparatedOutputFiles"
+        # at most about 256 MB of transcripts and results
+        self.cache = TranscriptCache("./TranscriptCache", maxBytes=256 * 2 ** 20)
+        runner = TranscriptJobRunner(spell_corrector, keywordIndex.extract, self.separatedOutputFiles,
+                                     archivePath=archiveDir, cache=self.cache,
+                                     traceFolder=traceFolder)
+        self.jobs = JobQueue(runner, workers=workers)
+
+    def submitFile(self, path):
+        return self.jobs.submit(path)
+
+    def submitInputFiles(self):
+        """Queue the files of the input folder that are not queued yet"""
+        queued = {job.path for job in self.jobs.list() if not job.done.is_set()}
+        return [self.submitFile(path) for path in
+                sorted(os.path.join(self.FolderPath, f) for f in os.listdir(self.FolderPath))
+                if path not in queued]
+
+    def processAudioFile(self):
+        """Process every file of the input folder and wait for the results, keyed by file name"""
+        jobs = self.submitInputFiles()
+        return {os.path.basename(job.path): self.jobs.wait(job.id).toDict() for job in jobs}
 
 
 @app.route("/", methods=["GET"])
@@ -63,23 +69,47 @@ def homePage():
 def getInputFile():
     try:
         inputFile = request.files.get('file')
-        archiveOldInputFiles()
-        inputFile.save(os.path.join("InputFiles", inputFile.filename))
-        return jsonify({"output": "Successfully uploaded the file"})
+        # a unique name, the file stays in the input folder until processed
+        fileName = "{}_{}".format(uuid.uuid4().hex[:8], secure_filename(inputFile.filename))
+        path = os.path.join(inputFileDir, fileName)
+        inputFile.save(path)
+        job = clntApp.submitFile(path)
+        return jsonify({"output": "Successfully uploaded the file", "jobId": job.id})
     except Exception as e:
         return jsonify({"outputError": str(e)})
 
 
 @app.route("/startprocessing", methods=["POST"])
 def processInputFile():
-    opResponseObj = clntApp.processAudioFile()
-    return jsonify(opResponseObj)
+    # queues the files of the input folder without waiting for them
+    jobs = clntApp.submitInputFiles()
+    return jsonify({"jobIds": [job.id for job in jobs]})
+
+
+@app.route("/jobs", methods=["GET"])
+def listJobs():
+    return jsonify([job.toDict(withResult=False) for job in clntApp.jobs.list()])
+
+
+@app.route("/jobs/<jobId>", methods=["GET"])
+def getJob(jobId):
+    job = clntApp.jobs.get(jobId)
+    if job is None:
+        return jsonify({"outputError": "Unknown job: {}".format(jobId)}), 404
+    return jsonify(job.toDict())
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    return Response(stageMetrics.render(), mimetype="text/plain; version=0.0.4")
 
 
 if __name__ == "__main__":
     clntApp = ClientService()
+    # build the spelling dictionary index before serving the first request
+    engine.load()
     host = '0.0.0.0'
     port = 5000
     httpd = simple_server.make_server(host, port, app)
     print("Serving on %s %d" % (host, port))
-    httpd.serve_forever()
\ No newline at end of file
+    httpd.serve_forever()
@@ -1,37 +1,100 @@
-from pydub import AudioSegment
-from pydub.utils import which
-
-AudioSegment.converter = which("ffmpeg")
-
-# AudioSegment.converter = "/home/jiwitesh/ffmpeg-3.2/ffmpeg"
-# AudioSegment.ffmpeg = "/home/jiwitesh/ffmpeg-3.2/ffmpeg"
-# AudioSegment.ffprobe ="/home/jiwitesh/ffmpeg-3.2/ffmpeg"
-
-
-def StoreDiarizedOutput(labelling):
-    # Creating different audios based on the labelling/timeframes received.
-    output = {}
-    for x, y, z in labelling:
-        if x in output:
-            output[x].append((y, z))
-        else:
-            output[x] = [(y, z)]
-
-    values = []
-    items = output.items()
-    for item in items:
-        values.append(item[1])
-
-    audio = AudioSegment.from_wav('DenoisedInputFiles/DenoisedSignal.wav')
-    # audio = ffmpeg.input('Denoise/Denoise_commercial_mono.wav')
-    voices = []
-    for i in values:
-        n = audio[0]
-        for j in i:
-            start_time, stop_time = j
-            n += audio[(start_time * 1000):(stop_time * 1000)]
-        voices.append(n)
-
-    for i, j in enumerate(voices):
-        j.export(f'SeparatedOutputFiles/speaker{i}.wav', format="wav")
-    return
\ No newline at end of file
+import os
+import wave
+
+import numpy as np
+
+from com_in_ineuron_ai_finaloutputsignal.wavFile import WavFile
+
+# frames copied per write, bounds the memory a long turn takes
+BLOCK_FRAMES = 1 << 20
+
+
+def floatToPcm16(samples):
+    return (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+
+
+def speakerFrameRanges(labelling, frameCount, frameRate):
+    """
+    Frame ranges of the turns of each speaker, in order of first turn,
+    cut where pydub cuts audio[start * 1000:stop * 1000]; each track
+    starts with the first millisecond of the recording like the
+    AudioSegment tracks it replaces
+    """
+    lengthMs = round(1000 * frameCount / frameRate)
+    framesPerMs = frameRate / 1000.0
+
+    def frameIndex(ms):
+        return int(min(ms, lengthMs) * framesPerMs)
+
+    ranges = {}
+    for x, y, z in labelling:
+        if x not in ranges:
+            ranges[x] = [(0, int(framesPerMs))]
+        start = frameIndex(y * 1000)
+        ranges[x].append((start, max(start, frameIndex(z * 1000))))
+    return ranges
+
+
+def gatherRange(frames, start, stop):
+    # the last turn may end up to a millisecond past the recording,
+    # padded with silence like pydub does
+    data = frames[start:stop]
+    missing = stop - start - len(data)
+    if missing > 0:
+        data = np.concatenate((data, np.zeros((missing,) + frames.shape[1:], frames.dtype)))
+    return data
+
+
+def assembleSpeakers(labelling, wav, sampleRate=16000):
+    """
+    Samples of each speaker's track, in order of first turn, gathered
+    from the waveform wav with one concatenation per speaker
+    """
+    wav = np.asarray(wav)
+    ranges = speakerFrameRanges(labelling, len(wav), sampleRate)
+    return [np.concatenate([gatherRange(wav, start, stop) for start, stop in turns])
+            for turns in ranges.values()]
+
+
+def openSignal(wav, sampleRate, wavPath):
+    # frames indexed by frame, how to encode them and the output format
+    if wav is not None:
+        wav = np.asarray(wav)
+        if wav.ndim == 1:
+            wav = wav[:, None]
+        if np.issubdtype(wav.dtype, np.floating):
+            return wav, sampleRate, floatToPcm16, wav.shape[1], 2
+        return wav, sampleRate, lambda block: block.astype("<i2").tobytes(), wav.shape[1], 2
+    wavFile = WavFile(wavPath)
+    if wavFile.isFloat:
+        return wavFile.frames, wavFile.frameRate, floatToPcm16, wavFile.channels, 2
+    # PCM frames are copied byte for byte, whatever their sample width
+    return (wavFile.frames, wavFile.frameRate, lambda block: block.tobytes(),
+            wavFile.channels, wavFile.sampleWidth)
+
+
+def StoreDiarizedOutput(labelling, wav=None, sampleRate=16000, folderPath="SeparatedOutputFiles",
+                        wavPath='DenoisedInputFiles/DenoisedSignal.wav'):
+    """
+    Write one file per speaker with all of their turns, cut from the
+    denoised waveform wav (float samples in [-1, 1]) kept in memory, or
+    else from the wav file at wavPath, memory-mapped so that only the
+    turns are read. Each track is streamed to its file a block at a
+    time, so the time taken grows linearly with the number of turns and
+    the memory taken does not grow with the recording.
+    """
+    frames, sampleRate, encode, channels, sampleWidth = openSignal(wav, sampleRate, wavPath)
+    ranges = speakerFrameRanges(labelling, len(frames), sampleRate)
+
+    if not os.path.isdir(folderPath):
+        os.makedirs(folderPath)
+    for i, turns in enumerate(ranges.values()):
+        with wave.open(os.path.join(folderPath, f'speaker{i}.wav'), "wb") as output:
+            output.setnchannels(channels)
+            output.setsampwidth(sampleWidth)
+            output.setframerate(sampleRate)
+            for start, stop in turns:
+                for blockStart in range(start, stop, BLOCK_FRAMES):
+                    blockStop = min(blockStart + BLOCK_FRAMES, stop)
+                    output.writeframesraw(encode(gatherRange(frames, blockStart, blockStop)))
+    return
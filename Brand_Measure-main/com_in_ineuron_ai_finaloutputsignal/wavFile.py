@@ -0,0 +1,61 @@
+import os
+import struct
+
+import numpy as np
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+
+class WavFile:
+    """
+    Memory-mapped view of a wav file, the samples are only read from
+    disk when sliced, so files larger than memory can be cut
+
+    frames is a (frameCount, frameWidth) uint8 array of the raw bytes
+    of each frame for PCM files, and a (frameCount, channels) float
+    array of samples for IEEE float files.
+    """
+    def __init__(self, path):
+        with open(path, "rb") as infile:
+            header = infile.read(12)
+            if len(header) < 12 or header[:4] != b"RIFF" or header[8:] != b"WAVE":
+                raise ValueError("Not a wav file: {}".format(path))
+            fmt = None
+            while True:
+                chunk = infile.read(8)
+                if len(chunk) < 8:
+                    raise ValueError("No data chunk in wav file: {}".format(path))
+                chunkId, size = struct.unpack("<4sI", chunk)
+                if chunkId == b"data":
+                    dataOffset = infile.tell()
+                    break
+                body = infile.read(size + size % 2)
+                if chunkId == b"fmt ":
+                    fmt = body
+        if fmt is None:
+            raise ValueError("No fmt chunk in wav file: {}".format(path))
+        audioFormat, channels, frameRate, __, blockAlign, bits = struct.unpack_from("<HHIIHH", fmt)
+        if audioFormat == WAVE_FORMAT_EXTENSIBLE:
+            audioFormat = struct.unpack_from("<H", fmt, 24)[0]
+        if audioFormat not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+            raise ValueError("Unsupported wav format 0x{:X}: {}".format(audioFormat, path))
+        self.path = path
+        self.channels = channels
+        self.frameRate = frameRate
+        self.sampleWidth = bits // 8
+        self.isFloat = audioFormat == WAVE_FORMAT_IEEE_FLOAT
+        # streaming writers may leave the data size unset, trust the file
+        size = min(size, os.path.getsize(path) - dataOffset)
+        self.frameCount = size // blockAlign
+        if self.isFloat:
+            dtype = "<f{}".format(self.sampleWidth)
+            shape = (self.frameCount, channels)
+        else:
+            dtype = np.uint8
+            shape = (self.frameCount, blockAlign)
+        if self.frameCount:
+            self.frames = np.memmap(path, dtype=dtype, mode="r", offset=dataOffset, shape=shape)
+        else:
+            self.frames = np.zeros(shape, dtype=dtype)
@@ -0,0 +1,230 @@
+import gc
+import json
+import os
+import pickle
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from flashtext import KeywordProcessor
+
+# bumped whenever the layout of a saved index changes
+FORMAT_VERSION = 1
+
+
+def readCatalog(path):
+    """
+    Read a brand catalogue, a JSON object mapping each category to the
+    list of its aliases, e.g. {"team": ["manchester united", "man utd"]}
+    """
+    with open(path, encoding="utf-8") as infile:
+        catalog = json.load(infile)
+    if not isinstance(catalog, dict) or not all(
+            isinstance(aliases, list) for aliases in catalog.values()):
+        raise ValueError("Catalogue should map categories to lists of "
+                         "aliases: {}".format(path))
+    return catalog
+
+
+def catalogSignature(path):
+    """Modification time and size of a catalogue, None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+@contextmanager
+def gcPaused():
+    """
+    Pause the garbage collector while a trie is built, its many small
+    dicts would otherwise trigger collections that dominate the time
+    taken to compile or load a large catalogue
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def compileKeywords(keywordDict, caseSensitive=False):
+    """Build the flashtext trie of a {category: [aliases]} dictionary"""
+    processor = KeywordProcessor(case_sensitive=caseSensitive)
+    with gcPaused():
+        processor.add_keywords_from_dict(keywordDict)
+    return processor
+
+
+class KeywordIndex:
+    """
+    Keyword dictionary compiled once into a flashtext trie and shared
+    by every extraction, instead of one trie per transcript.
+
+    An index built from a catalogue file with fromCatalog can be saved
+    next to it and loaded again without compiling the aliases, and is
+    recompiled by reload when the catalogue changes. With
+    checkInterval, extractions check the catalogue themselves at most
+    once per checkInterval seconds: one extraction recompiles while the
+    other ones carry on with the current trie, which is also kept if
+    the catalogue cannot be read. A reload swaps the whole trie, so
+    extractions running meanwhile see either the old or the new
+    catalogue, never a mix.
+    """
+    def __init__(self, keywordDict, caseSensitive=False, catalogPath=None,
+                 cachePath=None, checkInterval=None):
+        self.caseSensitive = caseSensitive
+        self.catalogPath = catalogPath
+        self.cachePath = cachePath
+        self.checkInterval = checkInterval
+        self.processor = compileKeywords(keywordDict, caseSensitive)
+        self.signature = None
+        self.lastCheck = time.monotonic()
+        self.lock = threading.Lock()
+        self.checkLock = threading.Lock()
+
+    @classmethod
+    def fromCatalog(cls, catalogPath, cachePath=None, caseSensitive=False,
+                    checkInterval=None):
+        """
+        Index a catalogue file, loading the index from cachePath if it
+        was saved from the catalogue as it is now, and saving it there
+        otherwise
+        """
+        signature = catalogSignature(catalogPath)
+        if cachePath is not None and os.path.exists(cachePath):
+            try:
+                index = cls.load(cachePath)
+            except ValueError:
+                index = None
+            if (index is not None and index.signature == signature
+                    and index.caseSensitive == caseSensitive):
+                index.catalogPath = catalogPath
+                index.cachePath = cachePath
+                index.checkInterval = checkInterval
+                return index
+        index = cls(readCatalog(catalogPath), caseSensitive, catalogPath,
+                    cachePath, checkInterval)
+        # the signature taken before reading, a change meanwhile is
+        # picked up by the next reload
+        index.signature = signature
+        if cachePath is not None:
+            index.save(cachePath)
+        return index
+
+    @classmethod
+    def load(cls, path):
+        """Load an index saved with save, without recompiling it"""
+        try:
+            with open(path, "rb") as infile, gcPaused():
+                data = pickle.load(infile)
+        except (pickle.UnpicklingError, EOFError):
+            data = None
+        if not isinstance(data, dict) or data.get("version") != FORMAT_VERSION:
+            raise ValueError("Unsupported keyword index: {}".format(path))
+        index = cls.__new__(cls)
+        index.caseSensitive = data["caseSensitive"]
+        index.catalogPath = None
+        index.cachePath = None
+        index.checkInterval = None
+        index.processor = data["processor"]
+        index.signature = data["signature"]
+        index.lastCheck = time.monotonic()
+        index.lock = threading.Lock()
+        index.checkLock = threading.Lock()
+        return index
+
+    def save(self, path):
+        """
+        Write the compiled index to path, through a temporary file so a
+        concurrent load never reads it half written
+        """
+        folder = os.path.dirname(path)
+        if folder and not os.path.isdir(folder):
+            os.makedirs(folder)
+        with self.lock:
+            data = {"version": FORMAT_VERSION,
+                    "caseSensitive": self.caseSensitive,
+                    "signature": self.signature,
+                    "processor": self.processor}
+            tempPath = "{}.{}.tmp".format(path, os.getpid())
+            with open(tempPath, "wb") as outfile:
+                pickle.dump(data, outfile, pickle.HIGHEST_PROTOCOL)
+            os.replace(tempPath, path)
+
+    def reload(self, force=False):
+        """
+        Recompile the index if its catalogue changed since it was
+        compiled, or with force=True, and save it to cachePath.
+        Returns True if the index was recompiled; an index built from a
+        dictionary rather than a catalogue is never recompiled.
+        """
+        if self.catalogPath is None:
+            return False
+        self.lastCheck = time.monotonic()
+        signature = catalogSignature(self.catalogPath)
+        if not force and signature == self.signature:
+            return False
+        processor = compileKeywords(readCatalog(self.catalogPath),
+                                    self.caseSensitive)
+        with self.lock:
+            self.processor = processor
+            self.signature = signature
+        if self.cachePath is not None:
+            self.save(self.cachePath)
+        return True
+
+    def extract(self, text, spans=False):
+        """
+        Categories of the aliases found in text, in order, or
+        (category, start, end) tuples with spans=True
+        """
+        self.checkCatalog()
+        return self.processor.extract_keywords(text, span_info=spans)
+
+    def extractBatch(self, texts, spans=False):
+        """
+        Extract the keywords of many texts with the same trie; texts is
+        a list, or a dict such as a transcript map, in which case the
+        result is keyed the same way
+        """
+        self.checkCatalog()
+        processor = self.processor
+        if isinstance(texts, dict):
+            return {key: processor.extract_keywords(text, span_info=spans)
+                    for key, text in texts.items()}
+        return [processor.extract_keywords(text, span_info=spans)
+                for text in texts]
+
+    def countCategories(self, texts):
+        """Number of aliases found per category over all the texts"""
+        if isinstance(texts, dict):
+            texts = texts.values()
+        counts = Counter()
+        for keywords in self.extractBatch(list(texts)):
+            counts.update(keywords)
+        return counts
+
+    def checkCatalog(self):
+        if self.checkInterval is None or self.catalogPath is None:
+            return
+        if (time.monotonic() - self.lastCheck < self.checkInterval
+                or not self.checkLock.acquire(blocking=False)):
+            return
+        try:
+            if time.monotonic() - self.lastCheck >= self.checkInterval:
+                self.reload()
+        except (OSError, ValueError) as e:
+            # e.g. a catalogue being saved, it is checked again after
+            # checkInterval
+            print("Keeping the current keywords, could not reload {}: "
+                  "{}".format(self.catalogPath, e))
+        finally:
+            self.checkLock.release()
+
+    def __len__(self):
+        return len(self.processor)
@@ -1,4 +1,14 @@
-from flashtext import KeywordProcessor
+from functools import lru_cache
+
+from com_in_ineuron_ai_keywordspotter.keywordIndex import KeywordIndex
+from com_in_ineuron_ai_service.instrumentation import stageMetrics
+
+
+@lru_cache(maxsize=32)
+def compiledIndex(keywordItems):
+    # one compiled index per distinct keyword dictionary
+    return KeywordIndex({category: list(aliases)
+                         for category, aliases in keywordItems})
 
 
 class AddMultiKeywords:
@@ -7,8 +17,9 @@ class AddMultiKeywords:
         self.text = text
         self.keyword_dict = keyword_dict
 
+    @stageMetrics.timed("addkey")
     def addkey(self):
-        keyword_processor = KeywordProcessor()
-        keyword_processor.add_keywords_from_dict(self.keyword_dict)
-        extractedKeyword = keyword_processor.extract_keywords(self.text)
-        return extractedKeyword
\ No newline at end of file
+        keywordItems = tuple((category, tuple(aliases))
+                             for category, aliases in self.keyword_dict.items())
+        extractedKeyword = compiledIndex(keywordItems).extract(self.text)
+        return extractedKeyword
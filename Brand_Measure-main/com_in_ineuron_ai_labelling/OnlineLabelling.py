@@ -0,0 +1,132 @@
+from collections import Counter, deque
+
+import numpy as np
+
+SAMPLING_RATE = 16000
+
+
+class OnlineSpeakerClustering:
+    """
+    Running speaker centroids for partial embeddings seen one at a time:
+    an embedding goes to the speaker whose centroid it is most similar
+    to (cosine similarity) if that is at least threshold, and otherwise
+    starts a new speaker, up to maxSpeakers. The centroid of a speaker
+    is the normalized sum of its embeddings.
+    """
+    def __init__(self, threshold=0.75, maxSpeakers=14):
+        self.threshold = threshold
+        self.maxSpeakers = maxSpeakers
+        self.sums = None
+        self.centroids = None
+        self.counts = []
+
+    def assign(self, embed):
+        embed = np.asarray(embed, np.float64)
+        embed = embed / (np.linalg.norm(embed) or 1.0)
+        if self.sums is None:
+            self.sums = np.zeros((0, len(embed)))
+            self.centroids = np.zeros((0, len(embed)))
+        if len(self.counts):
+            similarities = self.centroids @ embed
+            label = int(np.argmax(similarities))
+            if similarities[label] < self.threshold and len(self.counts) < self.maxSpeakers:
+                label = len(self.counts)
+        else:
+            label = 0
+        if label == len(self.counts):
+            self.sums = np.vstack((self.sums, np.zeros(len(embed))))
+            self.centroids = np.vstack((self.centroids, np.zeros(len(embed))))
+            self.counts.append(0)
+        self.sums[label] += embed
+        self.centroids[label] = self.sums[label] / np.linalg.norm(self.sums[label])
+        self.counts[label] += 1
+        return label
+
+    def assignAll(self, embeds):
+        return np.array([self.assign(embed) for embed in embeds], dtype=int)
+
+
+class StableLabelling:
+    """
+    Turns the speaker labels of partial utterances, fed in order, into
+    (speaker, start, stop) turns the way create_labelling does, emitting
+    each turn once it can no longer change.
+
+    The label of a partial is the most common one among the smoothing
+    partials centred on it, so it is decided once the smoothing // 2
+    partials after it are known; a turn is complete once the next one
+    has started.
+    """
+    def __init__(self, smoothing=9):
+        self.half = smoothing // 2
+        self.window = deque()
+        self.decided = 0
+        self.current = None
+        self.start = 0
+        self.lastTime = None
+
+    def feed(self, labels, wav_splits):
+        """Returns the turns completed by these partials"""
+        turns = []
+        for label, wav_split in zip(labels, wav_splits):
+            self.window.append((label, (wav_split.start + wav_split.stop) / 2 / SAMPLING_RATE))
+            while self.seen() - self.decided > self.half:
+                turns += self.decide()
+        return turns
+
+    def finish(self):
+        """Returns the remaining turns, the last one ending at the last partial"""
+        turns = []
+        while self.decided < self.seen():
+            turns += self.decide()
+        if self.current is not None:
+            turns.append((str(self.current), self.start, self.lastTime))
+            self.current = None
+        return turns
+
+    def seen(self):
+        return self.decided + len(self.window) - min(self.decided, self.half)
+
+    def decide(self):
+        # the window holds up to half partials before the one decided
+        # now, that one and the ones after it
+        before = min(self.decided, self.half)
+        labels = [label for label, __ in self.window]
+        label, time = self.window[before]
+        counts = Counter(labels)
+        best = max(counts.values())
+        if counts[label] < best:
+            label = next(other for other in labels if counts[other] == best)
+        self.decided += 1
+        if before == self.half:
+            self.window.popleft()
+        turns = []
+        if self.current is not None and label != self.current:
+            turns.append((str(self.current), self.start, time))
+            self.start = time
+        self.current = label
+        self.lastTime = time
+        return turns
+
+
+def matchLabels(reference, labels):
+    """
+    Rename the clusters of labels after the clusters of reference they
+    overlap most, greedily by overlap, so that the speakers of an
+    offline pass keep the names the online pass gave them; clusters
+    left without a match get new names
+    """
+    reference = np.asarray(reference)
+    labels = np.asarray(labels)
+    overlaps = Counter(zip(labels.tolist(), reference.tolist()))
+    mapping = {}
+    taken = set()
+    for (label, name), __ in sorted(overlaps.items(), key=lambda item: -item[1]):
+        if label not in mapping and name not in taken:
+            mapping[label] = name
+            taken.add(name)
+    nextName = max(taken | set(reference.tolist()), default=-1) + 1
+    for label in sorted(set(labels.tolist()) - set(mapping)):
+        mapping[label] = nextName
+        nextName += 1
+    return np.array([mapping[label] for label in labels.tolist()], dtype=int)
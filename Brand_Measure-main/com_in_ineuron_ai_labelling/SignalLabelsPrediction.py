@@ -1,24 +1,127 @@
-from spectralcluster import SpectralClusterer
-from kneed import KneeLocator
-from sklearn.cluster import KMeans
-
-def signalLabelPrediction(cont_embeds):
-    # Finding optimum clusters c
-    wcss = []
-    r = range(1, 15)
-    for k in r:
-        km = KMeans(n_clusters=k)
-        km = km.fit(cont_embeds)
-        wcss.append(km.inertia_)
-    kn = KneeLocator(list(r), wcss, S=1.0, curve='convex', direction='decreasing')
-    c=kn.knee
-
-    # Passing the clusters to get the labels
-    clusterer = SpectralClusterer(
-        min_clusters=c,
-        max_clusters=100,
-        p_percentile=0.90,
-        gaussian_blur_sigma=1)
-
-    labels = clusterer.predict(cont_embeds)
-    return(labels)
\ No newline at end of file
+import time
+
+import numpy as np
+from spectralcluster import SpectralClusterer
+from kneed import KneeLocator
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from sklearn.metrics import adjusted_rand_score
+
+
+def kmeansClusterCount(cont_embeds, maxClusters=14):
+    # Finding optimum clusters c
+    wcss = []
+    r = range(1, min(maxClusters, len(cont_embeds)) + 1)
+    for k in r:
+        km = KMeans(n_clusters=k)
+        km = km.fit(cont_embeds)
+        wcss.append(km.inertia_)
+    kn = KneeLocator(list(r), wcss, S=1.0, curve='convex', direction='decreasing')
+    return kn.knee
+
+
+def fastClusterCount(cont_embeds, maxClusters=14, patience=2, batchSize=1024, seed=0):
+    """
+    Elbow of the within-cluster sum of squares like kmeansClusterCount,
+    with mini-batch k-means fits each started from the centroids of the
+    previous k, the cluster with the largest sum of squares split in two
+    along its principal axis, and no fits beyond the knee once it stayed
+    the same for patience more values of k.
+
+    The squared norms of the embeddings are computed once and shared by
+    the distance computations of every k, which give both the inertia
+    and the cluster to split.
+    """
+    X = np.asarray(cont_embeds, dtype=np.float64)
+    maxClusters = min(maxClusters, len(X))
+    rng = np.random.default_rng(seed)
+    sqNorms = np.einsum("ij,ij->i", X, X)
+
+    def assign(centers):
+        distances = sqNorms[:, None] - 2 * X @ centers.T
+        distances += np.einsum("ij,ij->i", centers, centers)
+        nearest = distances.argmin(axis=1)
+        return nearest, np.maximum(distances[np.arange(len(X)), nearest], 0)
+
+    centers = X.mean(axis=0, keepdims=True)
+    nearest, minDistances = assign(centers)
+    ks = [1]
+    wcss = [minDistances.sum()]
+    knee = None
+    stableFor = 0
+    for k in range(2, maxClusters + 1):
+        sse = np.bincount(nearest, weights=minDistances, minlength=k - 1)
+        worst = sse.argmax()
+        if sse[worst] == 0:
+            break
+        members = X[nearest == worst] - centers[worst]
+        # a few power iterations find the principal axis of the cluster
+        axis = rng.normal(size=X.shape[1])
+        for _ in range(10):
+            axis = members.T @ (members @ axis)
+            axis /= np.linalg.norm(axis)
+        offset = axis * np.sqrt(sse[worst] / len(members))
+        init = np.vstack((centers, centers[worst] + offset))
+        init[worst] -= offset
+        km = MiniBatchKMeans(n_clusters=k, init=init, n_init=1,
+                             batch_size=batchSize, random_state=seed)
+        centers = km.fit(X).cluster_centers_
+        nearest, minDistances = assign(centers)
+        ks.append(k)
+        wcss.append(minDistances.sum())
+        if k < 3:
+            continue
+        newKnee = KneeLocator(ks, wcss, S=1.0, curve='convex', direction='decreasing').knee
+        stableFor = stableFor + 1 if newKnee is not None and newKnee == knee else 0
+        knee = newKnee
+        if stableFor >= patience:
+            # confirmed before the largest count
+            return knee
+    return KneeLocator(ks, wcss, S=1.0, curve='convex', direction='decreasing').knee if len(ks) >= 3 else None
+
+
+CLUSTER_COUNT_METHODS = {"kmeans": kmeansClusterCount, "fast": fastClusterCount}
+
+
+def signalLabelPrediction(cont_embeds, method="kmeans"):
+    """
+    Speaker label of each partial embedding; method picks how the
+    minimum number of speakers is estimated, "kmeans" with a full
+    k-means fit per candidate count or "fast" with fastClusterCount
+    """
+    if method not in CLUSTER_COUNT_METHODS:
+        raise ValueError("Unknown cluster count method: {}".format(method))
+    c = CLUSTER_COUNT_METHODS[method](cont_embeds)
+    return spectralLabels(cont_embeds, c)
+
+
+def spectralLabels(cont_embeds, c):
+    # Passing the clusters to get the labels
+    clusterer = SpectralClusterer(
+        min_clusters=c,
+        max_clusters=100,
+        p_percentile=0.90,
+        gaussian_blur_sigma=1)
+
+    labels = clusterer.predict(cont_embeds)
+    return(labels)
+
+
+def compareLabelPrediction(cont_embeds, methods=("kmeans", "fast")):
+    """
+    Time each cluster count method and measure how far its labels agree
+    with those of the first method, as an adjusted Rand index
+    """
+    report = {}
+    for method in methods:
+        start = time.perf_counter()
+        clusters = CLUSTER_COUNT_METHODS[method](cont_embeds)
+        countSeconds = time.perf_counter() - start
+        labels = spectralLabels(cont_embeds, clusters)
+        report[method] = {"clusters": clusters, "countSeconds": countSeconds,
+                          "seconds": time.perf_counter() - start, "labels": labels}
+    reference = report[methods[0]]
+    for method in methods:
+        report[method]["sameClusters"] = report[method]["clusters"] == reference["clusters"]
+        report[method]["adjustedRandIndex"] = adjusted_rand_score(
+            reference["labels"], report[method]["labels"])
+    return report
@@ -1,12 +1,181 @@
-from resemblyzer import preprocess_wav, VoiceEncoder
-from scipy.io.wavfile import write
-
-
-def process(wav_fpath):
-    wav = preprocess_wav(wav_fpath)
-    encoder = VoiceEncoder("cpu")
-    _, cont_embeds, wav_splits = encoder.embed_utterance(wav, return_partials=True, rate=16)
-
-    # Output denoised wave after removing the pauses
-    write('DenoisedInputFiles/DenoisedSignal.wav', 16000, wav)
-    return cont_embeds, wav_splits
+from functools import lru_cache
+
+import numpy as np
+import torch
+from resemblyzer import preprocess_wav, VoiceEncoder
+from resemblyzer.audio import wav_to_mel_spectrogram
+from resemblyzer.hparams import (mel_window_length, mel_window_step, model_embedding_size,
+                                 partials_n_frames, sampling_rate)
+
+from com_in_ineuron_ai_finaloutputsignal.wavFile import WavFile
+from com_in_ineuron_ai_speech_to_text.silenceDetector import decodePcm, maxPossibleAmplitude
+
+
+@lru_cache(maxsize=None)
+def loadEncoder(device="cpu"):
+    # the pretrained weights are loaded once per process and device
+    return VoiceEncoder(device)
+
+
+def partialMels(wav, rate=16, min_coverage=0.75):
+    """
+    Mel spectrogram windows of the partial utterances of a preprocessed
+    waveform, cut the way VoiceEncoder.embed_utterance cuts them
+    """
+    wav_splits, mel_splits = VoiceEncoder.compute_partial_slices(len(wav), rate, min_coverage)
+    max_wave_length = wav_splits[-1].stop
+    if max_wave_length >= len(wav):
+        wav = np.pad(wav, (0, max_wave_length - len(wav)), "constant")
+    mel = wav_to_mel_spectrogram(wav)
+    return [mel[s] for s in mel_splits], wav_splits
+
+
+def embedPartials(wavs, encoder=None, rate=16, batchSize=256):
+    """
+    Partial embeddings of several preprocessed waveforms, computed in
+    forward passes of up to batchSize windows taken across all of them
+    rather than one pass per waveform; the windows of a long recording
+    are spread over several passes, which bounds the memory they take.
+    Returns one (cont_embeds, wav_splits) pair per waveform.
+    """
+    if encoder is None:
+        encoder = loadEncoder()
+    embeds = [[] for _ in wavs]
+    splits = []
+    batch = []
+    owners = []
+
+    def forward():
+        with torch.no_grad():
+            mels = torch.from_numpy(np.stack(batch)).to(encoder.device)
+            partial_embeds = encoder(mels).cpu().numpy()
+        owners_array = np.array(owners)
+        for owner in np.unique(owners_array):
+            embeds[owner].append(partial_embeds[owners_array == owner])
+        del batch[:], owners[:]
+
+    for i, wav in enumerate(wavs):
+        mels, wav_splits = partialMels(wav, rate)
+        splits.append(wav_splits)
+        for mel in mels:
+            batch.append(mel)
+            owners.append(i)
+            if len(batch) == batchSize:
+                forward()
+    if batch:
+        forward()
+    return [(np.concatenate(cont_embeds), wav_splits)
+            for cont_embeds, wav_splits in zip(embeds, splits)]
+
+
+def embedMels(mels, encoder=None, batchSize=256):
+    """Partial embeddings of mel spectrogram windows, batchSize windows per forward pass"""
+    if encoder is None:
+        encoder = loadEncoder()
+    embeds = []
+    for start in range(0, len(mels), batchSize):
+        with torch.no_grad():
+            batch = torch.from_numpy(np.stack(mels[start:start + batchSize])).to(encoder.device)
+            embeds.append(encoder(batch).cpu().numpy())
+    if not embeds:
+        return np.zeros((0, model_embedding_size), np.float32)
+    return np.concatenate(embeds)
+
+
+def streamWav(path, windowSeconds=30):
+    """
+    Read a wav file window by window and preprocess each window on its
+    own, so that a recording of any length is never decoded whole.
+
+    The volume is normalized and the long silences trimmed per window
+    rather than over the whole recording, so the concatenated windows
+    are close to, but not exactly, what preprocess_wav makes of the
+    whole file.
+    """
+    wavFile = WavFile(path)
+    windowFrames = max(1, int(windowSeconds * wavFile.frameRate))
+    for start in range(0, wavFile.frameCount, windowFrames):
+        frames = wavFile.frames[start:start + windowFrames]
+        if wavFile.isFloat:
+            samples = np.asarray(frames, np.float32).mean(axis=1)
+        else:
+            pcm = decodePcm(frames.tobytes(), wavFile.channels, wavFile.sampleWidth)
+            width = 4 if wavFile.sampleWidth == 3 else wavFile.sampleWidth
+            samples = (pcm.mean(axis=1) / maxPossibleAmplitude(width)).astype(np.float32)
+        yield preprocess_wav(samples, source_sr=wavFile.frameRate)
+
+
+class PartialStream:
+    """
+    Mel spectrogram windows of the partial utterances of a preprocessed
+    waveform that is fed piece by piece, cut the way partialMels cuts
+    the whole waveform. Only the audio of the partials not cut yet is
+    kept, and the spectrogram of each piece is computed once.
+    """
+    def __init__(self, rate=16, min_coverage=0.75):
+        self.rate = rate
+        self.min_coverage = min_coverage
+        self.hop = int(sampling_rate * mel_window_step / 1000)
+        self.step = int(np.round((sampling_rate / rate) / self.hop)) * self.hop
+        self.size = partials_n_frames * self.hop
+        # whole frames of audio either side of an STFT window
+        self.context = int(np.ceil(sampling_rate * mel_window_length / 1000 / 2 / self.hop)) * self.hop
+        self.buffer = np.zeros(0, np.float32)
+        self.offset = 0
+        self.length = 0
+        self.count = 0
+
+    def feed(self, wav):
+        """Returns the mel windows and wav slices of the partials complete so far"""
+        self.buffer = np.concatenate((self.buffer, np.asarray(wav, np.float32)))
+        self.length += len(wav)
+        ready = 0
+        while True:
+            stop = (self.count + ready) * self.step + self.size
+            if stop + self.context > self.length:
+                break
+            ready += 1
+        return self.cut(ready)
+
+    def finish(self):
+        """Returns the last partials, the audio padded as partialMels pads it"""
+        wav_splits, __ = VoiceEncoder.compute_partial_slices(self.length, self.rate, self.min_coverage)
+        ready = len(wav_splits) - self.count
+        padding = wav_splits[-1].stop - self.length
+        if padding > 0:
+            self.buffer = np.concatenate((self.buffer, np.zeros(padding, np.float32)))
+        self.length = max(self.length, wav_splits[-1].stop)
+        return self.cut(ready)
+
+    def cut(self, ready):
+        if ready <= 0:
+            return [], []
+        start = self.count * self.step
+        stop = (self.count + ready - 1) * self.step + self.size
+        # the real audio around the partials rather than the reflection
+        # padding of the STFT, except at the ends of the waveform
+        left = min(self.context, start)
+        right = min(self.context, self.length - stop)
+        segment = self.buffer[start - left - self.offset:stop + right - self.offset]
+        mel = wav_to_mel_spectrogram(segment)
+        first = left // self.hop
+        mels = [mel[first + i * self.step // self.hop:][:partials_n_frames] for i in range(ready)]
+        wav_splits = [slice((self.count + i) * self.step, (self.count + i) * self.step + self.size)
+                      for i in range(ready)]
+        self.count += ready
+        # keep the audio of the next partial and the context before it
+        keep = max(0, self.count * self.step - self.context)
+        self.buffer = self.buffer[keep - self.offset:]
+        self.offset = keep
+        return mels, wav_splits
+
+
+def process(wav_fpath, encoder=None):
+    """
+    Denoise a recording and embed its partial utterances; the denoised
+    waveform is returned rather than written to a shared file, so
+    concurrent calls do not overwrite each other
+    """
+    wav = preprocess_wav(wav_fpath)
+    (cont_embeds, wav_splits), = embedPartials([wav], encoder)
+    return cont_embeds, wav_splits, wav
@@ -1,18 +1,130 @@
-
-from pathlib import Path
-from com_in_ineuron_ai_preprocessing.SingalPreprocessing import *
-from com_in_ineuron_ai_labelling.SignalLabelsPrediction import signalLabelPrediction
-from com_in_ineuron_ai_labelling.SignalLabelling import *
-from com_in_ineuron_ai_finaloutputsignal.StoreDiarizedOutput import StoreDiarizedOutput
-
-
-class BrandMeasureService:
-
-    def performSpeakerDiarization(self, audio_file_path):
-        wav_fpath = Path(audio_file_path)
-        cont_embeds, wav_splits =process(wav_fpath)
-        labels=signalLabelPrediction(cont_embeds)
-        labelling = create_labelling(labels,wav_splits)
-        output=StoreDiarizedOutput(labelling)
-
-
+import os
+import tempfile
+import wave
+from pathlib import Path
+
+import numpy as np
+
+from com_in_ineuron_ai_preprocessing.SingalPreprocessing import *
+from com_in_ineuron_ai_labelling.OnlineLabelling import OnlineSpeakerClustering, StableLabelling, matchLabels
+from com_in_ineuron_ai_labelling.SignalLabelsPrediction import signalLabelPrediction
+from com_in_ineuron_ai_labelling.SignalLabelling import *
+from com_in_ineuron_ai_finaloutputsignal.StoreDiarizedOutput import StoreDiarizedOutput, floatToPcm16
+from com_in_ineuron_ai_service.instrumentation import stageMetrics
+
+
+class BrandMeasureService:
+    """
+    Speaker diarization service; the voice encoder is loaded once, when
+    the service is created, and shared by every call; each step is timed
+    as spans of metrics
+    """
+    def __init__(self, device="cpu", batchSize=256, metrics=None):
+        self.encoder = loadEncoder(device)
+        self.batchSize = batchSize
+        self.metrics = metrics if metrics is not None else stageMetrics
+
+    def performSpeakerDiarization(self, audio_file_path, folderPath="SeparatedOutputFiles", trace=None):
+        return self.performSpeakerDiarizationBatch([audio_file_path], folderPath, perFileFolders=False,
+                                                   trace=trace)[0]
+
+    def performSpeakerDiarizationBatch(self, audio_file_paths, folderPath="SeparatedOutputFiles",
+                                       perFileFolders=True, trace=None):
+        """
+        Diarize several recordings, embedding the partial utterances of
+        all of them in shared forward passes; the speakers of each
+        recording are written to a folder named after it in folderPath.
+        Returns the labelling of each recording.
+        """
+        wavs = []
+        for path in audio_file_paths:
+            with self.metrics.span("preprocess", trace, audioBytes=os.path.getsize(path), path=path):
+                wavs.append(preprocess_wav(Path(path)))
+        with self.metrics.span("embed", trace, audioBytes=sum(wav.nbytes for wav in wavs)):
+            embedded = embedPartials(wavs, self.encoder, batchSize=self.batchSize)
+        labellings = []
+        for path, wav, (cont_embeds, wav_splits) in zip(audio_file_paths, wavs, embedded):
+            with self.metrics.span("labels", trace, path=path):
+                labels = signalLabelPrediction(cont_embeds)
+                labelling = create_labelling(labels, wav_splits)
+            outputFolder = folderPath
+            if perFileFolders:
+                outputFolder = os.path.join(folderPath, Path(path).stem)
+            with self.metrics.span("store", trace, audioBytes=wav.nbytes, path=path):
+                StoreDiarizedOutput(labelling, wav, folderPath=outputFolder)
+            labellings.append(labelling)
+        return labellings
+
+    def performStreamingDiarization(self, audio_file_path, folderPath="SeparatedOutputFiles", windowSeconds=30,
+                                    threshold=0.75, smoothing=9, reconcile=None, onTurn=None, trace=None):
+        """
+        Diarize a recording of any length window by window: each window
+        of windowSeconds is preprocessed and its partial utterances
+        embedded as it is read, and every partial goes to a speaker of
+        OnlineSpeakerClustering with the given similarity threshold.
+        Speaker turns are passed to onTurn as soon as they are stable
+        (see StableLabelling), long before the end of the recording.
+
+        Only the partials not embedded yet are kept in memory, the
+        denoised audio is written to a temporary file in folderPath from
+        which the speakers are cut at the end. With reconcile set to a
+        cluster count method of signalLabelPrediction, the embeddings
+        are kept too and labelled again by an offline pass once the
+        recording is read, the offline speakers being named after the
+        online ones they overlap most.
+
+        Returns the labelling, the reconciled one with reconcile; times
+        are in the denoised audio, like performSpeakerDiarization's.
+        """
+        if not os.path.isdir(folderPath):
+            os.makedirs(folderPath)
+        clustering = OnlineSpeakerClustering(threshold)
+        stable = StableLabelling(smoothing)
+        partials = PartialStream()
+        turns = []
+        labels, embeds, splits = [], [], []
+
+        def emit(newTurns):
+            turns.extend(newTurns)
+            if onTurn is not None:
+                for turn in newTurns:
+                    onTurn(turn)
+
+        def label(mels, wav_splits):
+            with self.metrics.span("embed", trace, audioBytes=len(wav_splits) * partials.step * 4):
+                cont_embeds = embedMels(mels, self.encoder, self.batchSize)
+            windowLabels = clustering.assignAll(cont_embeds)
+            if reconcile is not None:
+                labels.append(windowLabels)
+                embeds.append(cont_embeds)
+                splits.extend(wav_splits)
+            emit(stable.feed(windowLabels, wav_splits))
+
+        handle, denoisedPath = tempfile.mkstemp(suffix=".wav", dir=folderPath)
+        os.close(handle)
+        try:
+            with wave.open(denoisedPath, "wb") as denoised:
+                denoised.setnchannels(1)
+                denoised.setsampwidth(2)
+                denoised.setframerate(16000)
+                windows = streamWav(audio_file_path, windowSeconds)
+                while True:
+                    with self.metrics.span("preprocess", trace, path=audio_file_path) as span:
+                        wav = next(windows, None)
+                        span.audioBytes = 0 if wav is None else wav.nbytes
+                    if wav is None:
+                        break
+                    denoised.writeframes(floatToPcm16(wav))
+                    label(*partials.feed(wav))
+                label(*partials.finish())
+            emit(stable.finish())
+            labelling = turns
+            if reconcile is not None:
+                with self.metrics.span("labels", trace, path=audio_file_path):
+                    offlineLabels = signalLabelPrediction(np.concatenate(embeds), reconcile)
+                    labelling = create_labelling(matchLabels(np.concatenate(labels), offlineLabels), splits)
+            with self.metrics.span("store", trace, audioBytes=os.path.getsize(denoisedPath), path=audio_file_path):
+                StoreDiarizedOutput(labelling, folderPath=folderPath, wavPath=denoisedPath)
+        finally:
+            os.remove(denoisedPath)
+        return labelling
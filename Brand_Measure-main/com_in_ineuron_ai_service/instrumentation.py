@@ -0,0 +1,200 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+
+def peakRss():
+    """Peak resident set size of the process in bytes, None where unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Span:
+    """
+    One run of a stage: its wall time, the CPU time of the thread it
+    ran in, the bytes of audio it processed and the peak RSS of the
+    process when it ended
+    """
+    def __init__(self, name, audioBytes=0, args=None):
+        self.name = name
+        self.audioBytes = audioBytes
+        self.args = dict(args or {})
+        self.thread = threading.get_ident()
+        self.threadName = threading.current_thread().name
+        self.error = None
+        self.wall = None
+        self.cpu = None
+        self.peakRss = None
+        self.start = time.perf_counter()
+        self.cpuStart = time.thread_time()
+
+    def finish(self, error=None):
+        self.wall = time.perf_counter() - self.start
+        self.cpu = time.thread_time() - self.cpuStart
+        self.peakRss = peakRss()
+        self.error = error
+
+    def toEvent(self, pid):
+        """The span as a Chrome trace complete event"""
+        args = dict(self.args, audioBytes=self.audioBytes, cpuSeconds=self.cpu,
+                    peakRss=self.peakRss)
+        if self.error is not None:
+            args["error"] = self.error
+        return {"name": self.name, "cat": "stage", "ph": "X",
+                "ts": self.start * 1e6, "dur": self.wall * 1e6,
+                "pid": pid, "tid": self.thread, "args": args}
+
+
+class JobTrace:
+    """
+    The spans of one job, saved as a Chrome trace JSON file that
+    chrome://tracing or Perfetto shows as a flame chart per thread
+    """
+    def __init__(self, name):
+        self.name = name
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def add(self, span):
+        with self.lock:
+            self.spans.append(span)
+
+    def toChrome(self):
+        pid = os.getpid()
+        with self.lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        threads = OrderedDict((span.thread, span.threadName) for span in spans)
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": thread,
+                   "args": {"name": threadName}}
+                  for thread, threadName in threads.items()]
+        events += [span.toEvent(pid) for span in spans]
+        return {"traceEvents": events, "displayTimeUnit": "ms",
+                "otherData": {"job": self.name}}
+
+    def save(self, path):
+        folderPath = os.path.dirname(path)
+        if folderPath and not os.path.isdir(folderPath):
+            os.makedirs(folderPath)
+        with open(path, "w") as outfile:
+            json.dump(self.toChrome(), outfile)
+
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.audioBytes = 0
+
+
+class StageMetrics:
+    """
+    Totals of the spans of each stage since the process started,
+    rendered in the Prometheus text exposition format
+
+    A stage is timed with the span context manager, or with the timed
+    decorator for a whole function; spans given a JobTrace are also
+    added to it.
+    """
+    def __init__(self, prefix="brandmeasure"):
+        self.prefix = prefix
+        self.stages = OrderedDict()
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def span(self, name, trace=None, audioBytes=0, **args):
+        """
+        Time the block as a run of stage name; the span it yields can
+        be given the audio bytes once they are known
+        """
+        span = Span(name, audioBytes, args)
+        error = None
+        try:
+            yield span
+        except Exception as e:
+            error = type(e).__name__
+            raise
+        finally:
+            span.finish(error)
+            self.record(span)
+            if trace is not None:
+                trace.add(span)
+
+    def timed(self, name):
+        """Decorator timing every call of a function as stage name"""
+        def decorator(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return function(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, span):
+        with self.lock:
+            stats = self.stages.get(span.name)
+            if stats is None:
+                stats = self.stages[span.name] = StageStats()
+            stats.calls += 1
+            stats.errors += span.error is not None
+            stats.wall += span.wall
+            stats.cpu += span.cpu
+            stats.audioBytes += span.audioBytes
+
+    def snapshot(self):
+        """The totals of each stage, keyed by stage name"""
+        with self.lock:
+            return OrderedDict((name, {"calls": stats.calls, "errors": stats.errors,
+                                       "wallSeconds": stats.wall, "cpuSeconds": stats.cpu,
+                                       "audioBytes": stats.audioBytes})
+                               for name, stats in self.stages.items())
+
+    def render(self):
+        """The metrics in the Prometheus text format"""
+        stages = self.snapshot()
+        families = [
+            ("stage_wall_seconds", "summary", "Wall time spent in each stage", [
+                ("_sum", "wallSeconds"), ("_count", "calls")]),
+            ("stage_cpu_seconds_total", "counter", "CPU time of the threads running each stage", [
+                ("", "cpuSeconds")]),
+            ("stage_audio_bytes_total", "counter", "Bytes of audio processed by each stage", [
+                ("", "audioBytes")]),
+            ("stage_errors_total", "counter", "Runs of each stage that raised an error", [
+                ("", "errors")]),
+        ]
+        lines = []
+        for family, metricType, helpText, samples in families:
+            name = "{}_{}".format(self.prefix, family)
+            lines += ["# HELP {} {}".format(name, helpText), "# TYPE {} {}".format(name, metricType)]
+            for stage, totals in stages.items():
+                for suffix, key in samples:
+                    lines.append('{}{}{{stage="{}"}} {}'.format(
+                        name, suffix, escapeLabel(stage), totals[key]))
+        peak = peakRss()
+        if peak is not None:
+            name = "{}_peak_rss_bytes".format(self.prefix)
+            lines += ["# HELP {} Peak resident set size of the process".format(name),
+                      "# TYPE {} gauge".format(name), "{} {}".format(name, peak)]
+        return "\n".join(lines) + "\n"
+
+
+def escapeLabel(value):
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+# shared by the stages of the whole service
+stageMetrics = StageMetrics()
@@ -0,0 +1,219 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+# end of stream marker passed down the stage queues
+DONE = object()
+
+
+class StagePipeline:
+    """
+    Run the items of a source through a sequence of stages, each on its
+    own worker threads and connected to the next one by a bounded
+    queue, so that an item can be in a later stage while the next items
+    are still in an earlier one, and a slow stage holds back the source
+    rather than letting items pile up in memory.
+
+    stages is a list of (function, workers) pairs, each function taking
+    an item and returning it for the next stage. With more than one
+    worker, a stage may pass items on out of order.
+    """
+    def __init__(self, stages, queueSize=8):
+        self.stages = stages
+        self.queueSize = queueSize
+
+    def run(self, source, sink):
+        """
+        Feed source through the stages and call sink on every item that
+        comes out of the last one, in the calling thread. The first
+        error raised by the source, a stage or sink stops the pipeline
+        and is raised again here once all its threads have ended.
+        """
+        queues = [queue.Queue(self.queueSize) for _ in range(len(self.stages) + 1)]
+        remaining = [workers for _, workers in self.stages]
+        stop = threading.Event()
+        errors = []
+        lock = threading.Lock()
+
+        def put(q, item):
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+
+        def get(q):
+            while not stop.is_set():
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            return DONE
+
+        def fail(error):
+            with lock:
+                errors.append(error)
+            stop.set()
+
+        def finish(i):
+            # the last worker of a stage to finish ends the next stage
+            with lock:
+                remaining[i] -= 1
+                last = remaining[i] == 0
+            if last:
+                workers = self.stages[i + 1][1] if i + 1 < len(self.stages) else 1
+                for _ in range(workers):
+                    put(queues[i + 1], DONE)
+
+        def feed():
+            try:
+                for item in source:
+                    if not put(queues[0], item):
+                        return
+            except Exception as e:
+                fail(e)
+                return
+            finally:
+                if hasattr(source, "close"):
+                    source.close()
+            for _ in range(self.stages[0][1] if self.stages else 1):
+                put(queues[0], DONE)
+
+        def work(i, function):
+            try:
+                while True:
+                    item = get(queues[i])
+                    if item is DONE:
+                        break
+                    if not put(queues[i + 1], function(item)):
+                        return
+            except Exception as e:
+                fail(e)
+                return
+            finish(i)
+
+        threads = [threading.Thread(target=feed, daemon=True)]
+        for i, (function, workers) in enumerate(self.stages):
+            threads += [threading.Thread(target=work, args=(i, function), daemon=True)
+                        for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = get(queues[-1])
+                if item is DONE:
+                    break
+                sink(item)
+        except Exception as e:
+            fail(e)
+        finally:
+            for thread in threads:
+                thread.join()
+        if errors:
+            raise errors[0]
+
+
+class Job:
+    """
+    An uploaded file waiting for, going through or done with processing
+
+    progress holds counters the job function updates as it goes, status
+    is one of queued, running, done and failed.
+    """
+    def __init__(self, path):
+        self.id = uuid.uuid4().hex
+        self.path = path
+        self.status = "queued"
+        self.progress = {}
+        self.result = None
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.done = threading.Event()
+
+    def toDict(self, withResult=True):
+        report = {"jobId": self.id, "status": self.status,
+                  "progress": dict(self.progress), "error": self.error,
+                  "submitted": self.submitted, "started": self.started,
+                  "finished": self.finished}
+        if withResult:
+            report["result"] = self.result
+        return report
+
+
+class JobQueue:
+    """
+    Queue of jobs run in submission order by a pool of worker threads,
+    runJob being called with each job and returning its result
+
+    Finished jobs are kept for lookup by id, the oldest ones forgotten
+    once there are more than keepJobs of them.
+    """
+    def __init__(self, runJob, workers=1, keepJobs=100):
+        self.runJob = runJob
+        self.workers = workers
+        self.keepJobs = keepJobs
+        self.pending = queue.Queue()
+        self.jobs = OrderedDict()
+        self.finished = []
+        self.threads = []
+        self.lock = threading.Lock()
+
+    def start(self):
+        with self.lock:
+            if self.threads:
+                return
+            self.threads = [threading.Thread(target=self.work, daemon=True)
+                            for _ in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, path):
+        """Queue a file for processing and return its job"""
+        job = Job(path)
+        with self.lock:
+            self.jobs[job.id] = job
+        self.pending.put(job)
+        self.start()
+        return job
+
+    def get(self, jobId):
+        with self.lock:
+            return self.jobs.get(jobId)
+
+    def list(self):
+        with self.lock:
+            return list(self.jobs.values())
+
+    def wait(self, jobId, timeout=None):
+        """Wait for a job to finish, returns the job or None if unknown"""
+        job = self.get(jobId)
+        if job is not None:
+            job.done.wait(timeout)
+        return job
+
+    def work(self):
+        while True:
+            job = self.pending.get()
+            job.status = "running"
+            job.started = time.time()
+            try:
+                job.result = self.runJob(job)
+                job.status = "done"
+            except Exception as e:
+                job.error = str(e)
+                job.status = "failed"
+            job.finished = time.time()
+            job.done.set()
+            self.forget(job)
+
+    def forget(self, job):
+        with self.lock:
+            self.finished.append(job.id)
+            while len(self.finished) > self.keepJobs:
+                self.jobs.pop(self.finished.pop(0), None)
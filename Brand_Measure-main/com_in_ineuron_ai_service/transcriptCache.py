@@ -0,0 +1,153 @@
+import hashlib
+import json
+import os
+import threading
+import wave
+from collections import OrderedDict
+
+# bumped whenever the layout of the entries changes
+FORMAT_VERSION = 1
+
+
+def pcmKey(pcmData, frameRate, sampleWidth, channels=1):
+    """Content hash of raw PCM audio and its format"""
+    digest = hashlib.sha256("pcm {} {} {} {}|".format(
+        FORMAT_VERSION, frameRate, sampleWidth, channels).encode())
+    digest.update(pcmData)
+    return digest.hexdigest()
+
+
+def recordingKey(path, params, blockFrames=1 << 16):
+    """
+    Content hash of the decoded PCM frames of a wav file and of the
+    parameters it is processed with; the same audio uploaded under
+    another name or with other header chunks has the same key
+    """
+    digest = hashlib.sha256("recording {} {}|".format(
+        FORMAT_VERSION, json.dumps(params, sort_keys=True)).encode())
+    with wave.open(str(path), "rb") as wav:
+        digest.update("{} {} {}|".format(
+            wav.getframerate(), wav.getsampwidth(), wav.getnchannels()).encode())
+        while True:
+            data = wav.readframes(blockFrames)
+            if not data:
+                break
+            digest.update(data)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    On-disk cache of transcripts keyed by content hashes, one JSON file
+    per entry in folderPath, evicted least recently used first once the
+    entries take more than maxBytes
+
+    Entries are stored by kind, e.g. "chunk" for the transcript of one
+    chunk and "result" for the processed result of a whole recording.
+    The last use of an entry is its file modification time, so the
+    order of use survives restarts.
+    """
+    def __init__(self, folderPath="TranscriptCache", maxBytes=256 * 2 ** 20):
+        self.folderPath = folderPath
+        self.maxBytes = maxBytes
+        self.lock = threading.Lock()
+        if not os.path.isdir(folderPath):
+            os.makedirs(folderPath)
+        entries = []
+        for entry in os.scandir(folderPath):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, entry.name, stat.st_size))
+            elif entry.name.endswith(".tmp"):
+                # left over by a write that never finished
+                os.remove(entry.path)
+        # least recently used first
+        self.sizes = OrderedDict((name, size) for __, name, size in sorted(entries))
+        self.totalBytes = sum(self.sizes.values())
+
+    def fileName(self, kind, key):
+        return "{}-{}.json".format(kind, key)
+
+    def get(self, kind, key):
+        """The value stored under kind and key, or None if there is none"""
+        name = self.fileName(kind, key)
+        path = os.path.join(self.folderPath, name)
+        with self.lock:
+            if name not in self.sizes:
+                return None
+            try:
+                with open(path, encoding="utf-8") as infile:
+                    entry = json.load(infile)
+                os.utime(path)
+            except (OSError, ValueError):
+                # removed or damaged behind our back
+                self.drop(name)
+                return None
+            self.sizes.move_to_end(name)
+        return entry["value"]
+
+    def put(self, kind, key, value):
+        """Store value, which may be any JSON value but None"""
+        name = self.fileName(kind, key)
+        path = os.path.join(self.folderPath, name)
+        data = json.dumps({"value": value}, ensure_ascii=False).encode("utf-8")
+        with self.lock:
+            tempPath = "{}.{}.{}.tmp".format(path, os.getpid(), threading.get_ident())
+            with open(tempPath, "wb") as outfile:
+                outfile.write(data)
+            os.replace(tempPath, path)
+            self.totalBytes += len(data) - self.sizes.pop(name, 0)
+            self.sizes[name] = len(data)
+            self.evict()
+
+    def evict(self):
+        while self.totalBytes > self.maxBytes and len(self.sizes) > 1:
+            name = next(iter(self.sizes))
+            try:
+                os.remove(os.path.join(self.folderPath, name))
+            except FileNotFoundError:
+                pass
+            self.drop(name)
+
+    def drop(self, name):
+        self.totalBytes -= self.sizes.pop(name, 0)
+
+    def clear(self):
+        with self.lock:
+            for name in list(self.sizes):
+                try:
+                    os.remove(os.path.join(self.folderPath, name))
+                except FileNotFoundError:
+                    pass
+                self.drop(name)
+
+    def __len__(self):
+        return len(self.sizes)
+
+    def recognizer(self, recognizer):
+        """Wrap a recognizer so that it only recognizes chunks it has not seen"""
+        return CachedRecognizer(recognizer, self)
+
+
+class CachedRecognizer:
+    """
+    Recognizer answering from the cache for chunks whose audio it has
+    recognized before, including chunks without speech; hits counts the
+    chunks answered from the cache
+    """
+    def __init__(self, recognizer, cache):
+        self.recognizer = recognizer
+        self.cache = cache
+        self.hits = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, pcmData, sampleRate, sampleWidth):
+        key = pcmKey(pcmData, sampleRate, sampleWidth)
+        entry = self.cache.get("chunk", key)
+        if entry is not None:
+            with self.lock:
+                self.hits += 1
+            return entry["text"]
+        text = self.recognizer(pcmData, sampleRate, sampleWidth)
+        self.cache.put("chunk", key, {"text": text})
+        return text
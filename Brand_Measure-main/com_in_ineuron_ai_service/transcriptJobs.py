@@ -0,0 +1,143 @@
+import os
+import shutil
+import threading
+
+from com_in_ineuron_ai_service.instrumentation import JobTrace, stageMetrics
+from com_in_ineuron_ai_service.jobQueue import StagePipeline
+from com_in_ineuron_ai_service.transcriptCache import recordingKey
+from com_in_ineuron_ai_speech_to_text.transcriptGenerator import (
+    CHUNKING_PARAMS, GoogleRecognizer, iterTranscript)
+
+
+class TranscriptJobRunner:
+    """
+    Process an uploaded recording as a pipeline of three concurrent
+    stages: transcription of the chunks (itself spread over maxWorkers
+    recognizer threads), spelling correction and keyword spotting, so
+    that a chunk is corrected and spotted while the next ones are still
+    being transcribed.
+
+    The job progress counts the chunks through each stage, with the
+    total number of chunks once transcription has finished. The result
+    has the transcripts, corrected transcripts and keywords of each
+    chunk, in chunk order. With archivePath, the recording is moved
+    there once it has been processed.
+
+    With a TranscriptCache, a recording processed before with the same
+    audio and chunking parameters gets its stored result, and of a new
+    recording only the chunks whose audio was not recognized before are
+    sent to the recognizer. The results depend on the spelling
+    dictionary and the keywords too, so the cache should be cleared
+    when they change, or given cacheVersion, which is part of the key of
+    the results.
+
+    Every stage is timed as spans of metrics, per chunk for recognition,
+    spelling correction and keyword spotting; with traceFolder, the
+    spans of each job are also saved there as a Chrome trace named
+    after the job id.
+    """
+    def __init__(self, spellCorrector, keywordExtractor, folderPath="SeparatedOutputFiles",
+                 recognizer=None, maxWorkers=4, spellWorkers=1, queueSize=8, archivePath=None,
+                 cache=None, cacheVersion=None, metrics=None, traceFolder=None):
+        self.spellCorrector = spellCorrector
+        self.keywordExtractor = keywordExtractor
+        self.folderPath = folderPath
+        self.recognizer = recognizer
+        self.maxWorkers = maxWorkers
+        self.spellWorkers = spellWorkers
+        self.queueSize = queueSize
+        self.archivePath = archivePath
+        self.cache = cache
+        self.cacheVersion = cacheVersion
+        self.metrics = metrics if metrics is not None else stageMetrics
+        self.traceFolder = traceFolder
+
+    def __call__(self, job):
+        trace = JobTrace(job.id) if self.traceFolder is not None else None
+        try:
+            with self.metrics.span("job", trace, path=job.path) as span:
+                span.audioBytes = os.path.getsize(job.path)
+                return self.process(job, trace)
+        finally:
+            if trace is not None:
+                trace.save(os.path.join(self.traceFolder, "{}.json".format(job.id)))
+
+    def process(self, job, trace):
+        progress = job.progress
+        progress.update(transcribed=0, corrected=0, spotted=0, chunks=None)
+        baseRecognizer = self.recognizer or GoogleRecognizer()
+
+        def recognizer(pcmData, sampleRate, sampleWidth):
+            with self.metrics.span("recognize", trace, audioBytes=len(pcmData)):
+                return baseRecognizer(pcmData, sampleRate, sampleWidth)
+
+        if self.cache is not None:
+            with self.metrics.span("cacheLookup", trace):
+                params = dict(CHUNKING_PARAMS, folderPath=self.folderPath, version=self.cacheVersion)
+                resultKey = recordingKey(job.path, params)
+                result = self.cache.get("result", resultKey)
+            if result is not None:
+                chunks = len(result["inputFileTranscriptedOp"])
+                progress.update(transcribed=chunks, corrected=chunks, spotted=chunks,
+                                chunks=chunks, cached=True)
+                self.archive(job.path, trace)
+                return result
+            # only the chunks missing from the cache reach the recognizer spans
+            recognizer = self.cache.recognizer(recognizer)
+        lock = threading.Lock()
+
+        def advance(counter):
+            with lock:
+                progress[counter] += 1
+
+        def transcripts():
+            # splitting and recognition, including the time spent
+            # waiting for the later stages to take the transcripts
+            with self.metrics.span("transcribe", trace):
+                for index, (chunkName, text) in enumerate(iterTranscript(
+                        job.path, self.folderPath, recognizer, self.maxWorkers)):
+                    advance("transcribed")
+                    yield {"index": index, "chunk": chunkName, "text": text}
+            progress["chunks"] = progress["transcribed"]
+
+        def correct(item):
+            with self.metrics.span("correct", trace, chunk=item["index"]):
+                item["corrected"] = self.spellCorrector(item["text"])
+            advance("corrected")
+            return item
+
+        def spot(item):
+            with self.metrics.span("spot", trace, chunk=item["index"]):
+                item["keywords"] = self.keywordExtractor(item["text"])
+            advance("spotted")
+            return item
+
+        items = []
+        pipeline = StagePipeline([(correct, self.spellWorkers), (spot, 1)], self.queueSize)
+        pipeline.run(transcripts(), items.append)
+        items.sort(key=lambda item: item["index"])
+
+        result = {
+            "inputFileTranscriptedOp": {item["chunk"]: item["text"] for item in items},
+            "spellCorrectedOpMap": {item["chunk"]: item["corrected"] for item in items},
+            "extractedKeywors": {item["chunk"]: item["keywords"] for item in items},
+        }
+        if self.cache is not None:
+            progress["cachedChunks"] = recognizer.hits
+            self.cache.put("result", resultKey, result)
+        self.archive(job.path, trace)
+        return result
+
+    def archive(self, path, trace=None):
+        if self.archivePath is not None:
+            with self.metrics.span("archive", trace, audioBytes=os.path.getsize(path)):
+                archiveFile(path, self.archivePath)
+
+
+def archiveFile(path, archivePath):
+    if not os.path.isdir(archivePath):
+        os.makedirs(archivePath)
+    target = os.path.join(archivePath, os.path.basename(path))
+    if os.path.exists(target):
+        os.remove(target)
+    shutil.move(path, target)
@@ -0,0 +1,341 @@
+import math
+import wave
+
+import numpy as np
+
+
+def readWavBlocks(path, blockMs=2000):
+    """
+    Read a PCM wav file in blocks of about blockMs milliseconds
+
+    Yields (frames, channels) int64 sample arrays with the values
+    pydub works with: 8-bit samples are made signed and 24-bit samples
+    are widened to 32 bits the way AudioSegment.from_wav does.
+    """
+    with wave.open(str(path), "rb") as wav:
+        frameRate = wav.getframerate()
+        channels = wav.getnchannels()
+        sampleWidth = wav.getsampwidth()
+        blockFrames = max(1, frameRate * blockMs // 1000)
+        while True:
+            data = wav.readframes(blockFrames)
+            if not data:
+                break
+            yield decodePcm(data, channels, sampleWidth)
+
+
+def wavParams(path):
+    """
+    Return the frame rate, channel count and (pydub) sample width of a
+    wav file
+    """
+    with wave.open(str(path), "rb") as wav:
+        sampleWidth = wav.getsampwidth()
+        return (wav.getframerate(), wav.getnchannels(),
+                4 if sampleWidth == 3 else sampleWidth)
+
+
+def decodePcm(data, channels, sampleWidth):
+    if sampleWidth == 1:
+        samples = np.frombuffer(data, dtype=np.uint8).astype(np.int64) - 128
+    elif sampleWidth == 2:
+        samples = np.frombuffer(data, dtype="<i2").astype(np.int64)
+    elif sampleWidth == 3:
+        raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int64)
+        samples = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples -= (samples & 0x800000) << 1
+        # pydub pads the low byte with the sign
+        samples = (samples << 8) | np.where(samples < 0, 0xFF, 0)
+    elif sampleWidth == 4:
+        samples = np.frombuffer(data, dtype="<i4").astype(np.int64)
+    else:
+        raise ValueError("Unsupported sample width: {}".format(sampleWidth))
+    return samples.reshape(-1, channels)
+
+
+def encodePcm(samples, sampleWidth):
+    """
+    Raw little-endian PCM bytes of samples in the (pydub) sample width,
+    8-bit samples stay signed like AudioSegment.raw_data
+    """
+    dtype = {1: "<i1", 2: "<i2", 4: "<i4"}[sampleWidth]
+    return samples.astype(dtype).tobytes()
+
+
+def writeWav(path, pcmData, frameRate, sampleWidth, channels=1):
+    """
+    Write PCM bytes from encodePcm to a wav file
+    """
+    if sampleWidth == 1:
+        # wav stores 8-bit samples unsigned
+        pcmData = (np.frombuffer(pcmData, dtype=np.int8).view(np.uint8)
+                   ^ 0x80).tobytes()
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(sampleWidth)
+        wav.setframerate(frameRate)
+        wav.writeframes(pcmData)
+
+
+def toMono(samples):
+    """
+    Average the channels, rounding down like AudioSegment.set_channels(1)
+    """
+    if samples.shape[1] == 1:
+        return samples
+    return samples.sum(axis=1, keepdims=True) // samples.shape[1]
+
+
+def maxPossibleAmplitude(sampleWidth):
+    return (2 ** (sampleWidth * 8)) / 2
+
+
+def wavDbfs(path, blockMs=2000):
+    """
+    Loudness of a whole wav file in dBFS, like AudioSegment.dBFS but
+    read block by block
+    """
+    frameRate, channels, sampleWidth = wavParams(path)
+    sumSquares = 0.0
+    numSamples = 0
+    for samples in readWavBlocks(path, blockMs):
+        sumSquares += float(np.square(samples, dtype=np.float64).sum())
+        numSamples += samples.size
+    rms = int(math.sqrt(sumSquares / numSamples)) if numSamples else 0
+    if not rms:
+        return -float("inf")
+    return 20 * math.log(rms / maxPossibleAmplitude(sampleWidth), 10)
+
+
+class SilenceSplitter:
+    """
+    Incremental, vectorized replacement of pydub.silence.split_on_silence
+
+    Feed it the samples of a recording block by block with feed(), and
+    call flush() after the last block; both return the chunks that are
+    complete so far as (frames, channels) sample arrays. The chunks and
+    their boundaries are the ones split_on_silence (seek_step=1) returns
+    for the whole recording:
+
+    - a window of min_silence_len ms starting at every millisecond is
+      silent if its RMS is at most silence_thresh (dBFS),
+    - overlapping or adjacent silent windows form one silence,
+    - the sound between silences is a chunk, with keep_silence ms of
+      the silence around it (True for all of it), split halfway when
+      two chunks would overlap.
+
+    The energy of each millisecond is summed once, and the RMS of all
+    windows comes from differences of its running sum instead of
+    slicing the audio per millisecond. Only the samples of the chunk
+    being assembled and of one window are kept, so memory is bounded by
+    the longest chunk rather than the recording. Unlike pydub, an empty
+    recording has no chunks rather than an empty one.
+    """
+    def __init__(self, frameRate, channels, sampleWidth, min_silence_len=1000,
+                 silence_thresh=-16, keep_silence=100):
+        self.frameRate = frameRate
+        self.channels = channels
+        self.minSilenceLen = min_silence_len
+        if isinstance(keep_silence, bool):
+            # as good as the length of the recording
+            keep_silence = math.inf if keep_silence else 0
+        self.keepSilence = keep_silence
+        self.threshold = (10 ** (float(silence_thresh) / 20)
+                          * maxPossibleAmplitude(sampleWidth))
+        self.framesPerMs = frameRate / 1000.0
+        self.numFrames = 0
+        # samples from frame pcmStart on, and the energy of the frames
+        # of the last, incomplete millisecond
+        self.pcm = []
+        self.pcmStart = 0
+        self.tailEnergy = np.zeros(0)
+        # energy of the complete milliseconds from binsStart on, the
+        # first window not evaluated yet
+        self.bins = np.zeros(0)
+        self.binsStart = 0
+        self.numBins = 0
+        # [first, last] window start of the silence being extended
+        self.openSilence = None
+        # end of the last silence, and the padded start of the sound
+        # after it
+        self.prevEnd = 0
+        self.nextStart = -self.keepSilence
+
+    def frameAt(self, ms):
+        return int(ms * self.framesPerMs)
+
+    def framesAt(self, ms):
+        return (ms * self.framesPerMs).astype(np.int64)
+
+    def feed(self, samples):
+        if len(samples) == 0:
+            return []
+        self.pcm.append(samples)
+        energy = np.square(samples, dtype=np.float64).sum(axis=1)
+        energy = np.concatenate((self.tailEnergy, energy))
+        tailStart = self.numFrames - (len(energy) - len(samples))
+        self.numFrames += len(samples)
+
+        # milliseconds whose frames are all there
+        ms = np.arange(self.numBins,
+                       int(self.numFrames / self.framesPerMs) + 2)
+        edges = self.framesAt(ms)
+        edges = edges[edges <= self.numFrames]
+        self.addBins(energy, tailStart, edges)
+        self.tailEnergy = energy[edges[-1] - tailStart:]
+
+        chunks = []
+        self.evaluateWindows(self.numBins - self.minSilenceLen, chunks)
+        self.trim()
+        return chunks
+
+    def flush(self):
+        """
+        Complete the recording, returns the remaining chunks
+        """
+        # pydub pads a last, incomplete millisecond with silence
+        length = round(1000 * (self.numFrames / self.frameRate))
+        ms = np.arange(self.numBins, length + 1)
+        edges = self.framesAt(ms)
+        tailStart = self.numFrames - len(self.tailEnergy)
+        self.addBins(self.tailEnergy, tailStart,
+                     np.minimum(edges, self.numFrames))
+        self.tailEnergy = np.zeros(0)
+
+        chunks = []
+        self.evaluateWindows(length - self.minSilenceLen, chunks)
+        if self.openSilence is not None:
+            self.closeSilence(chunks, length)
+        if self.prevEnd != length:
+            self.emit(max(self.nextStart, 0), length, chunks)
+        self.pcm = []
+        self.pcmStart = self.numFrames
+        return chunks
+
+    def addBins(self, energy, tailStart, edges):
+        if len(edges) < 2:
+            return
+        running = np.concatenate(([0.0], np.cumsum(energy)))
+        sums = running[edges[1:] - tailStart] - running[edges[:-1] - tailStart]
+        self.bins = np.concatenate((self.bins, sums))
+        self.numBins += len(sums)
+
+    def evaluateWindows(self, lastStart, chunks):
+        """
+        Evaluate the windows starting at binsStart up to lastStart
+        """
+        if lastStart < self.binsStart:
+            return
+        length = self.minSilenceLen
+        starts = np.arange(self.binsStart, lastStart + 1)
+        running = np.concatenate(([0.0], np.cumsum(self.bins)))
+        offsets = starts - self.binsStart
+        sums = running[offsets + length] - running[offsets]
+        # samples per window, including the silence pydub pads a last,
+        # incomplete millisecond with
+        counts = (self.framesAt(starts + length)
+                  - self.framesAt(starts)) * self.channels
+        rms = np.floor(np.sqrt(sums / np.maximum(counts, 1)))
+        silent = starts[rms <= self.threshold]
+        self.bins = self.bins[len(starts):]
+        self.binsStart = lastStart + 1
+        self.addSilentWindows(silent, chunks)
+
+    def addSilentWindows(self, silent, chunks):
+        length = self.minSilenceLen
+        if len(silent):
+            breaks = np.flatnonzero(np.diff(silent) > length) + 1
+            firsts = silent[np.concatenate(([0], breaks))].tolist()
+            lasts = silent[np.concatenate((breaks - 1,
+                                           [len(silent) - 1]))].tolist()
+            for first, last in zip(firsts, lasts):
+                if (self.openSilence is not None
+                        and first <= self.openSilence[1] + length):
+                    self.openSilence[1] = last
+                    continue
+                if self.openSilence is not None:
+                    self.closeSilence(chunks)
+                self.openSilence = [first, last]
+        # no later window can extend the silence any more
+        if (self.openSilence is not None
+                and self.openSilence[1] + length < self.binsStart):
+            self.closeSilence(chunks)
+
+    def closeSilence(self, chunks, length=None):
+        """
+        Emit the sound before the open silence, now that the start of
+        the sound after it is known; length is given once it is known
+        too
+        """
+        start, last = self.openSilence
+        self.openSilence = None
+        end = last + self.minSilenceLen
+        # only a silence at the very start has no sound before it
+        if start > self.prevEnd:
+            paddedEnd = start + self.keepSilence
+            if end == length:
+                # no sound after it
+                self.emit(max(self.nextStart, 0), min(paddedEnd, length),
+                          chunks)
+            elif end - self.keepSilence < paddedEnd:
+                # the sounds share the silence halfway, the same as
+                # halving their padded ends like pydub does, also when
+                # keep_silence is True
+                middle = (start + end) // 2
+                self.emit(max(self.nextStart, 0), middle, chunks)
+                self.nextStart = middle
+                self.prevEnd = end
+                return
+            else:
+                self.emit(max(self.nextStart, 0), paddedEnd, chunks)
+        self.nextStart = end - self.keepSilence
+        self.prevEnd = end
+
+    def emit(self, start, end, chunks):
+        startFrame = self.frameAt(start)
+        endFrame = self.frameAt(end)
+        samples = (np.concatenate(self.pcm) if len(self.pcm) > 1
+                   else self.pcm[0] if self.pcm
+                   else np.zeros((0, self.channels), dtype=np.int64))
+        chunk = samples[startFrame - self.pcmStart:endFrame - self.pcmStart]
+        missing = endFrame - startFrame - len(chunk)
+        if missing > 0:
+            chunk = np.concatenate(
+                (chunk, np.zeros((missing, self.channels), dtype=chunk.dtype)))
+        self.pcm = [samples]
+        chunks.append(chunk)
+
+    def trim(self):
+        """
+        Drop the samples no chunk can start before any more
+        """
+        keepFrom = self.nextStart
+        # before the first sound, it starts after the open silence
+        if (self.openSilence is not None
+                and self.openSilence[0] <= self.prevEnd):
+            keepFrom = (self.openSilence[1] + self.minSilenceLen
+                        - self.keepSilence)
+        if math.isinf(keepFrom) or keepFrom <= 0:
+            return
+        keepFrame = self.frameAt(keepFrom)
+        if keepFrame <= self.pcmStart:
+            return
+        samples = np.concatenate(self.pcm)
+        self.pcm = [samples[keepFrame - self.pcmStart:]]
+        self.pcmStart = keepFrame
+
+
+def splitWavOnSilence(path, min_silence_len=1000, silence_thresh=-16,
+                      keep_silence=100, blockMs=2000):
+    """
+    Yield the chunks of a wav file split on silence, reading it block
+    by block, see SilenceSplitter
+    """
+    frameRate, channels, sampleWidth = wavParams(path)
+    splitter = SilenceSplitter(frameRate, channels, sampleWidth,
+                               min_silence_len, silence_thresh, keep_silence)
+    for samples in readWavBlocks(path, blockMs):
+        for chunk in splitter.feed(samples):
+            yield chunk
+    for chunk in splitter.flush():
+        yield chunk
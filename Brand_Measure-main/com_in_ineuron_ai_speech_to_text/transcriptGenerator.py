@@ -1,39 +1,106 @@
-import speech_recognition as sr 
-import os 
-from pydub import AudioSegment
-from pydub.silence import split_on_silence
+import speech_recognition as sr
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-# create a speech recognition object
-r = sr.Recognizer()
+from com_in_ineuron_ai_speech_to_text.silenceDetector import (
+    encodePcm, splitWavOnSilence, toMono, wavDbfs, wavParams, writeWav)
 
-def generateTranscript(path, folderPath):
+
+class GoogleRecognizer:
     """
-    Splitting the large audio file into chunks
-    and apply speech recognition on each of these chunks
+    Default recognizer backend, sends each chunk to the Google Web
+    Speech API. A recognizer is any callable taking the raw PCM bytes
+    of a mono chunk, its sample rate and its sample width in bytes, and
+    returning the recognized text or None if nothing was recognized.
     """
-    sound = AudioSegment.from_wav(path)  
+    def __init__(self, language="en-US"):
+        self.language = language
+        self.recognizer = sr.Recognizer()
+
+    def __call__(self, pcmData, sampleRate, sampleWidth):
+        audio = sr.AudioData(pcmData, sampleRate, sampleWidth)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language)
+        except sr.UnknownValueError:
+            return None
+
 
-    chunks = split_on_silence(sound,
-        min_silence_len=500,
-        silence_thresh=sound.dBFS-14,
-        keep_silence=500,
+# how recordings are split into chunks, the silence threshold being
+# relative to the loudness of the whole recording
+MIN_SILENCE_LEN = 500
+SILENCE_THRESH_OFFSET = -14
+KEEP_SILENCE = 500
+CHUNKING_PARAMS = {"min_silence_len": MIN_SILENCE_LEN,
+                   "silence_thresh": "dBFS{:+d}".format(SILENCE_THRESH_OFFSET),
+                   "keep_silence": KEEP_SILENCE}
+
+
+def splitChunks(path):
+    """
+    Split a recording on its pauses into mono PCM chunks, reading it
+    block by block
+    """
+    sampleWidth = wavParams(path)[2]
+    chunks = splitWavOnSilence(path,
+        min_silence_len=MIN_SILENCE_LEN,
+        silence_thresh=wavDbfs(path)+SILENCE_THRESH_OFFSET,
+        keep_silence=KEEP_SILENCE,
     )
+    for chunk in chunks:
+        yield encodePcm(toMono(chunk), sampleWidth)
+
 
-    if not os.path.isdir(folderPath):
+def iterTranscript(path, folderPath="SeparatedOutputFiles", recognizer=None,
+                   maxWorkers=4, exportChunks=False):
+    """
+    Yield the (chunk file name, transcript) of each chunk of a recording
+    in chunk order, as soon as it and the chunks before it are
+    recognized; see generateTranscript
+    """
+    if recognizer is None:
+        recognizer = GoogleRecognizer()
+    frameRate, __, sampleWidth = wavParams(path)
+    if exportChunks and not os.path.isdir(folderPath):
         os.makedirs(folderPath)
 
-    textMap = {}
-    for i, audio_chunk in enumerate(chunks, start=1):
-        chunk_filename = os.path.join(folderPath, "speech_chunk{}.wav".format(i))
-        audio_chunk.export(chunk_filename, format="wav")
-        
-        with sr.AudioFile(chunk_filename) as source:
-            audio_listened = r.record(source)
-            try:
-                text = r.recognize_google(audio_listened)
-                text = "{}. ".format(text.capitalize())
-                textMap[chunk_filename] = text
-            except sr.UnknownValueError as e:
-                print("Error in chunk {}: {}".format(i, str(e)))
-                
-    return textMap
\ No newline at end of file
+    def collect(i, chunkName, future):
+        text = future.result()
+        if not text:
+            print("Error in chunk {}: no speech recognized".format(i))
+            return None
+        return chunkName, "{}. ".format(text.capitalize())
+
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=maxWorkers) as executor:
+        for i, pcmData in enumerate(splitChunks(path), start=1):
+            chunkName = os.path.join(folderPath, "speech_chunk{}.wav".format(i))
+            if exportChunks:
+                writeWav(chunkName, pcmData, frameRate, sampleWidth)
+            pending.append((i, chunkName, executor.submit(
+                recognizer, pcmData, frameRate, sampleWidth)))
+            # collect in chunk order whatever order the chunks finish in
+            while len(pending) > 2 * maxWorkers:
+                transcript = collect(*pending.popleft())
+                if transcript:
+                    yield transcript
+        while pending:
+            transcript = collect(*pending.popleft())
+            if transcript:
+                yield transcript
+
+
+def generateTranscript(path, folderPath="SeparatedOutputFiles", recognizer=None,
+                       maxWorkers=4, exportChunks=False):
+    """
+    Splitting the large audio file into chunks
+    and apply speech recognition on each of these chunks
+
+    The chunks stay in memory and are recognized by a pool of at most
+    maxWorkers threads, the recognizer calls being network bound, while
+    the next chunks are being split off; at most about twice as many
+    chunks as workers are held in memory. The transcripts are keyed by
+    chunk file name in chunk order; the chunks are only written to
+    folderPath with exportChunks=True.
+    """
+    return dict(iterTranscript(path, folderPath, recognizer, maxWorkers, exportChunks))
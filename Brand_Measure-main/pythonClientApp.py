@@ -8,13 +8,19 @@ import json
 
 from com_in_ineuron_ai_speech_to_text.transcriptGenerator import generateTranscript
 from com_in_ineuron_ai_spellingcorrector.spellcorrector import spell_corrector
-from com_in_ineuron_ai_keywordspotter.keywordSpotter import AddMultiKeywords
+from com_in_ineuron_ai_keywordspotter.keywordIndex import KeywordIndex
+from com_in_ineuron_ai_service.instrumentation import stageMetrics
 
 
 app = Flask(__name__)
 CORS(app)
 app.config['DEBUG'] = True
 
+# compiled once and shared by every transcript
+keywordIndex = KeywordIndex({"place": ["england"],
+                             "team": ["manchester united"],
+                             "game": ["football"]})
+
 
 class ClientService:
     def __init__(self):
@@ -26,13 +32,16 @@ class ClientService:
     def processAudioFile(self):
         outputResponseObj = {}
         for val in self.fileList:
-            inputFileTranscriptedOp = generateTranscript(os.path.join(self.FolderPath,val), self.separatedOutputFiles)
+            path = os.path.join(self.FolderPath, val)
+            with stageMetrics.span("transcribe", audioBytes=os.path.getsize(path), path=path):
+                inputFileTranscriptedOp = generateTranscript(path, self.separatedOutputFiles)
         print(inputFileTranscriptedOp)
         outputResponseObj["inputFileTranscriptedOp"] = inputFileTranscriptedOp
 
         spellCorrectedOpMap = {}
         for val in inputFileTranscriptedOp.keys():
-            spellcorrectedOp = spell_corrector(inputFileTranscriptedOp[val])
+            with stageMetrics.span("correct"):
+                spellcorrectedOp = spell_corrector(inputFileTranscriptedOp[val])
             # print("Input Text : ", outputText[val])
             # print("Corrected Text : ", spellcorrectedOp)
             spellCorrectedOpMap[val] = spellcorrectedOp
@@ -40,14 +49,8 @@ class ClientService:
         outputResponseObj["spellCorrectedOpMap"] = spellCorrectedOpMap
         print(inputFileTranscriptedOp)
 
-        extractedKeywordMap = {}
-        for val in inputFileTranscriptedOp.keys():
-            adding = AddMultiKeywords(inputFileTranscriptedOp[val],
-                                      {"place": ["england"],
-                                       "team": ["manchester united"],
-                                       "game": ["football"]})
-            result = adding.addkey()
-            extractedKeywordMap[val] = result
+        with stageMetrics.span("spot"):
+            extractedKeywordMap = keywordIndex.extractBatch(inputFileTranscriptedOp)
         outputResponseObj["extractedKeywors"] = extractedKeywordMap
 
         return outputResponseObj
@@ -60,9 +63,10 @@ archiveDir = './ArchivedInputFiles'
 def archiveOldInputFiles():
     files = os.listdir(inputFileDir)
     for f in files:
-        if os.path.exists(os.path.join(archiveDir, f)):
-            os.remove(os.path.join(archiveDir, f))
-        shutil.move(os.path.join(inputFileDir, f), archiveDir)
+        with stageMetrics.span("archive", audioBytes=os.path.getsize(os.path.join(inputFileDir, f))):
+            if os.path.exists(os.path.join(archiveDir, f)):
+                os.remove(os.path.join(archiveDir, f))
+            shutil.move(os.path.join(inputFileDir, f), archiveDir)
 
 
 def processInputFile():
@@ -77,3 +81,4 @@ if __name__ == "__main__":
     clntApp = ClientService()
     outputVal = processInputFile()
     print(outputVal)
+    print(stageMetrics.render())
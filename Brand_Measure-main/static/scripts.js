@@ -18,27 +18,39 @@ document.getElementById("fileUploadForm").addEventListener("submit", function(ev
             statusDiv.textContent = `Error: ${data.outputError}`;
             return;
         }
-        statusDiv.textContent = "File uploaded successfully. Starting processing...";
-        processAudio(); // Start processing after successful upload
+        statusDiv.textContent = "File uploaded successfully. Processing...";
+        pollJob(data.jobId); // Processing starts as soon as the file is uploaded
     })
     .catch(error => {
         statusDiv.textContent = `Error: ${error}`;
     });
 });
 
-function processAudio() {
-    fetch("/startprocessing", {
-        method: "POST"
-    })
+function pollJob(jobId) {
+    fetch(`/jobs/${jobId}`)
     .then(response => response.json())
     .then(data => {
-        document.getElementById("status").textContent = "Processing complete!";
-        
+        const statusDiv = document.getElementById("status");
+        if (data.outputError || data.status === "failed") {
+            statusDiv.textContent = `Processing Error: ${data.outputError || data.error}`;
+            return;
+        }
+        if (data.status !== "done") {
+            const progress = data.progress;
+            statusDiv.textContent = data.status === "queued" ? "Waiting for earlier uploads..." :
+                `Processing... ${progress.transcribed || 0} chunks transcribed, ` +
+                `${progress.corrected || 0} corrected, ${progress.spotted || 0} spotted`;
+            setTimeout(() => pollJob(jobId), 1000);
+            return;
+        }
+        statusDiv.textContent = "Processing complete!";
+        const result = data.result;
+
         // Update content of each pre element without changing the structure
-        document.getElementById("transcript").textContent = JSON.stringify(data.inputFileTranscriptedOp, null, 2);
-        document.getElementById("spellCorrected").textContent = JSON.stringify(data.spellCorrectedOpMap, null, 2);
-        document.getElementById("extractedKeywords").textContent = JSON.stringify(data.extractedKeywors, null, 2);
-        
+        document.getElementById("transcript").textContent = JSON.stringify(result.inputFileTranscriptedOp, null, 2);
+        document.getElementById("spellCorrected").textContent = JSON.stringify(result.spellCorrectedOpMap, null, 2);
+        document.getElementById("extractedKeywords").textContent = JSON.stringify(result.extractedKeywors, null, 2);
+
         // Scroll to the results section after processing
         document.getElementById("transcriptResults").scrollIntoView({ behavior: "smooth" });
     })
@@ -1,3 +1,5 @@
 from . import editdistance
 from . import helpers
 from .symspellpy import SymSpell, Verbosity
+from .engine import SymSpellEngine
+from .registry import DictionaryRegistry
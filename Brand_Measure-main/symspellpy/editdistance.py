@@ -12,6 +12,8 @@ class DistanceAlgorithm(Enum):
     """Supported edit distance algorithms"""
     LEVENSHTEIN = 0  #: Levenshtein algorithm.
     DAMERUAUOSA = 1  #: Damerau optimal string alignment algorithm
+    LEVENSHTEIN_FAST = 2  #: Bit-parallel Levenshtein algorithm.
+    DAMERUAUOSA_FAST = 3  #: Bit-parallel Damerau optimal string alignment algorithm
 
 class EditDistance(object):
     """Edit distance algorithms.
@@ -41,6 +43,10 @@ class EditDistance(object):
             self._distance_comparer = Levenshtein()
         elif algorithm == DistanceAlgorithm.DAMERUAUOSA:
             self._distance_comparer = DamerauOsa()
+        elif algorithm == DistanceAlgorithm.LEVENSHTEIN_FAST:
+            self._distance_comparer = LevenshteinFast()
+        elif algorithm == DistanceAlgorithm.DAMERUAUOSA_FAST:
+            self._distance_comparer = DamerauOsaFast()
         else:
             raise ValueError("Unknown distance algorithm")
 
@@ -65,8 +71,48 @@ class EditDistance(object):
         return self._distance_comparer.distance(string_1, string_2,
                                                 max_distance)
 
+    def compare_batch(self, string_1, strings_2, max_distance):
+        """Compare many strings to the base string to determine their
+        edit distances, using the previously selected algorithm.
+
+        Parameters
+        ----------
+        string_1 : str
+            Base string.
+        strings_2 : list of str
+            The strings to compare.
+        max_distance : int
+            The maximum distance allowed.
+
+        Returns
+        -------
+        list of int
+            The edit distance (or -1 if `max_distance` exceeded) of
+            each string in `strings_2`.
+        """
+        return self._distance_comparer.distances(string_1, strings_2,
+                                                 max_distance)
+
+    @property
+    def supports_batch(self):
+        """bool: True if :meth:`compare_batch` is faster than calling
+        :meth:`compare` for each string."""
+        return self._distance_comparer.supports_batch
+
+    @property
+    def min_batch_size(self):
+        """int: Smallest number of strings :meth:`compare_batch` is
+        faster for."""
+        return self._distance_comparer.min_batch_size
+
 class AbstractDistanceComparer(object):
     """An interface to compute relative distance between two strings"""
+    #: Whether :meth:`distances` is implemented more efficiently than
+    #: one :meth:`distance` call per string.
+    supports_batch = False
+    #: Smallest number of strings :meth:`distances` is faster for.
+    min_batch_size = 1
+
     def distance(self, string_1, string_2, max_distance):
         """Return a measure of the distance between two strings.
 
@@ -94,6 +140,28 @@ class AbstractDistanceComparer(object):
         """
         raise NotImplementedError("Should have implemented this")
 
+    def distances(self, string_1, strings_2, max_distance):
+        """Return a measure of the distance between one string and each
+        of many other strings.
+
+        Parameters
+        ----------
+        string_1 : str
+            The string to compare against.
+        strings_2 : list of str
+            The other strings to compare.
+        max_distance : int
+            The maximum distance that is of interest.
+
+        Returns
+        -------
+        list of int
+            The result of :meth:`distance` for each string in
+            `strings_2`.
+        """
+        return [self.distance(string_1, string_2, max_distance)
+                for string_2 in strings_2]
+
 class Levenshtein(AbstractDistanceComparer):
     """Class providing Levenshtein algorithm for computing edit
     distance metric between two strings
@@ -384,3 +452,282 @@ class DamerauOsa(AbstractDistanceComparer):
             if char_1_costs[i + len_diff] > max_distance:
                 return -1
         return current_cost if current_cost <= max_distance else -1
+
+class BitParallelMixin(object):
+    """Shared state of the bit-parallel comparers.
+
+    The bit-parallel algorithms encode the positions of every character
+    of `string_1` (the pattern) as a bit mask. :meth:`SymSpell.lookup`
+    compares one phrase against many suggestions, so the masks of the
+    last pattern are kept and reused until a different `string_1` is
+    passed.
+
+    Attributes
+    ----------
+    _pattern : str
+        The `string_1` the cached masks were computed for.
+    _pattern_masks : dict
+        Bit mask of the positions of each character in
+        :attr:`_pattern`, bit i being set if `_pattern[i]` is the
+        character.
+    """
+    #: Longest pattern the bit vectors are used for; longer patterns
+    #: fall back to the dynamic programming implementation.
+    word_size = 64
+    #: Smallest batch :meth:`distances` vectorizes with NumPy; below
+    #: this the array setup costs more than comparing one by one.
+    min_batch_size = 128
+    supports_batch = True
+    _transpositions = False
+
+    def __init__(self):
+        super(BitParallelMixin, self).__init__()
+        self._pattern = None
+        self._pattern_masks = dict()
+
+    def _masks(self, pattern):
+        if pattern is not self._pattern and pattern != self._pattern:
+            masks = dict()
+            bit = 1
+            for char in pattern:
+                masks[char] = masks.get(char, 0) | bit
+                bit <<= 1
+            self._pattern = pattern
+            self._pattern_masks = masks
+        return self._pattern_masks
+
+    def distances(self, string_1, strings_2, max_distance):
+        """Return the distance between one string and each of many
+        other strings. Large batches are compared in lockstep: the
+        candidates are padded into one array of code points and every
+        bit-vector operation runs on all of them at once, one text
+        position per step.
+
+        Parameters
+        ----------
+        string_1 : str
+            The string to compare against.
+        strings_2 : list of str
+            The other strings to compare.
+        max_distance : int
+            The maximum distance that is of interest.
+
+        Returns
+        -------
+        list of int
+            The result of :meth:`distance` for each string in
+            `strings_2`.
+        """
+        if (len(strings_2) < self.min_batch_size or not string_1
+                or len(string_1) > self.word_size or max_distance <= 0):
+            return [self.distance(string_1, string_2, max_distance)
+                    for string_2 in strings_2]
+        max_distance = int(min(2 ** 31 - 1, max_distance))
+        len_1 = len(string_1)
+        masks = self._masks(string_1)
+        chars = np.array(sorted(ord(char) for char in masks),
+                         dtype=np.uint32)
+        char_masks = np.array([masks[chr(char)] for char in chars],
+                              dtype=np.uint64)
+        lengths = np.fromiter(map(len, strings_2), dtype=np.int64,
+                              count=len(strings_2))
+        max_len = int(lengths.max())
+        # padding positions are past the end of their string and never
+        # counted, so the padding character does not matter
+        codes = np.frombuffer(
+            "".join(string_2.ljust(max_len, "\0")
+                    for string_2 in strings_2).encode("utf-32-le"),
+            dtype=np.uint32).reshape(len(strings_2), max_len)
+        positions = np.searchsorted(chars, codes)
+        positions[positions == len(chars)] = 0
+        pattern_masks = np.where(chars[positions] == codes,
+                                 char_masks[positions], np.uint64(0))
+
+        one = np.uint64(1)
+        all_ones = np.uint64((1 << len_1) - 1)
+        last_bit = np.uint64(1 << (len_1 - 1))
+        vertical_pos = np.full(len(strings_2), all_ones, dtype=np.uint64)
+        vertical_neg = np.zeros(len(strings_2), dtype=np.uint64)
+        diagonal_zero = np.zeros(len(strings_2), dtype=np.uint64)
+        prev_pattern_mask = np.zeros(len(strings_2), dtype=np.uint64)
+        current_distance = np.full(len(strings_2), len_1, dtype=np.int64)
+        for j in range(max_len):
+            pattern_mask = pattern_masks[:, j]
+            diagonal_zero_next = ((((pattern_mask & vertical_pos)
+                                    + vertical_pos) ^ vertical_pos)
+                                  | pattern_mask | vertical_neg)
+            if self._transpositions:
+                diagonal_zero_next |= ((((~diagonal_zero) & pattern_mask)
+                                        << one) & prev_pattern_mask)
+                prev_pattern_mask = pattern_mask
+            diagonal_zero = diagonal_zero_next
+            horizontal_pos = (vertical_neg
+                              | ~(diagonal_zero | vertical_pos)) & all_ones
+            horizontal_neg = diagonal_zero & vertical_pos
+            active = j < lengths
+            current_distance += ((horizontal_pos & last_bit) != 0) & active
+            current_distance -= ((horizontal_neg & last_bit) != 0) & active
+            horizontal_pos = (horizontal_pos << one) | one
+            horizontal_neg <<= one
+            vertical_pos = (horizontal_neg
+                            | ~(diagonal_zero | horizontal_pos)) & all_ones
+            vertical_neg = horizontal_pos & diagonal_zero
+        current_distance[current_distance > max_distance] = -1
+        current_distance[np.abs(lengths - len_1) > max_distance] = -1
+        return current_distance.tolist()
+
+    def _trivial_distance(self, string_1, string_2, max_distance):
+        """Handle the cases not needing a full comparison, shared with
+        the dynamic programming implementations. Returns None if the
+        strings need to be compared.
+        """
+        if string_1 is None or string_2 is None:
+            return helpers.null_distance_results(string_1, string_2,
+                                                 max_distance)
+        if max_distance <= 0:
+            return 0 if string_1 == string_2 else -1
+        if abs(len(string_1) - len(string_2)) > max_distance:
+            return -1
+        if not string_1 or not string_2:
+            return max(len(string_1), len(string_2))
+        return None
+
+class LevenshteinFast(BitParallelMixin, Levenshtein):
+    """Class providing the bit-parallel Levenshtein algorithm of Myers
+    in the formulation of Hyyrö for computing the edit distance metric
+    between two strings. One text character is processed per step for
+    all pattern positions at once.
+
+    Strings longer than :attr:`word_size` are compared with
+    :class:`Levenshtein`.
+    """
+    def distance(self, string_1, string_2, max_distance):
+        """Compute and return the Levenshtein edit distance between two
+        strings.
+
+        Parameters
+        ----------
+        string_1 : str
+            One of the strings to compare. Character masks are cached
+            for this string, pass the string that stays the same
+            across calls here.
+        string_2 : str
+            The other string to compare.
+        max_distance : int
+            The maximum distance that is of interest.
+
+        Returns
+        -------
+        int
+            -1 if the distance is greater than the maxDistance, 0 if
+            the strings are equivalent, otherwise a positive number
+            whose magnitude increases as difference between the strings
+            increases.
+        """
+        distance = self._trivial_distance(string_1, string_2, max_distance)
+        if distance is not None:
+            return distance
+        if len(string_1) > self.word_size:
+            return super(LevenshteinFast, self).distance(
+                string_1, string_2, max_distance)
+        masks = self._masks(string_1)
+        len_1 = len(string_1)
+        len_2 = len(string_2)
+        all_ones = (1 << len_1) - 1
+        last_bit = 1 << (len_1 - 1)
+        vertical_pos = all_ones
+        vertical_neg = 0
+        current_distance = len_1
+        for j, char_2 in enumerate(string_2):
+            pattern_mask = masks.get(char_2, 0)
+            diagonal_zero = ((((pattern_mask & vertical_pos) + vertical_pos)
+                              ^ vertical_pos) | pattern_mask | vertical_neg)
+            horizontal_pos = (vertical_neg
+                              | ~(diagonal_zero | vertical_pos)) & all_ones
+            horizontal_neg = diagonal_zero & vertical_pos
+            if horizontal_pos & last_bit:
+                current_distance += 1
+            elif horizontal_neg & last_bit:
+                current_distance -= 1
+            # the last row changes by at most 1 per remaining character
+            if current_distance - (len_2 - j - 1) > max_distance:
+                return -1
+            horizontal_pos = (horizontal_pos << 1) | 1
+            horizontal_neg <<= 1
+            vertical_pos = (horizontal_neg
+                            | ~(diagonal_zero | horizontal_pos)) & all_ones
+            vertical_neg = horizontal_pos & diagonal_zero
+        return current_distance if current_distance <= max_distance else -1
+
+class DamerauOsaFast(BitParallelMixin, DamerauOsa):
+    """Class providing the bit-parallel Damerau-Levenshtein optimal
+    string alignment (OSA) algorithm of Hyyrö, which extends the
+    bit-parallel Levenshtein algorithm with adjacent transpositions.
+
+    Strings longer than :attr:`word_size` are compared with
+    :class:`DamerauOsa`.
+    """
+    _transpositions = True
+    def distance(self, string_1, string_2, max_distance):
+        """Compute and return the Damerau-Levenshtein optimal string
+        alignment edit distance between two strings.
+
+        Parameters
+        ----------
+        string_1 : str
+            One of the strings to compare. Character masks are cached
+            for this string, pass the string that stays the same
+            across calls here.
+        string_2 : str
+            The other string to compare.
+        max_distance : int
+            The maximum distance that is of interest.
+
+        Returns
+        -------
+        int
+            -1 if the distance is greater than the maxDistance, 0 if
+            the strings are equivalent, otherwise a positive number
+            whose magnitude increases as difference between the strings
+            increases.
+        """
+        distance = self._trivial_distance(string_1, string_2, max_distance)
+        if distance is not None:
+            return distance
+        if len(string_1) > self.word_size:
+            return super(DamerauOsaFast, self).distance(
+                string_1, string_2, max_distance)
+        masks = self._masks(string_1)
+        len_1 = len(string_1)
+        len_2 = len(string_2)
+        all_ones = (1 << len_1) - 1
+        last_bit = 1 << (len_1 - 1)
+        vertical_pos = all_ones
+        vertical_neg = 0
+        diagonal_zero = 0
+        prev_pattern_mask = 0
+        current_distance = len_1
+        for j, char_2 in enumerate(string_2):
+            pattern_mask = masks.get(char_2, 0)
+            transposition = ((((~diagonal_zero) & pattern_mask) << 1)
+                             & prev_pattern_mask)
+            diagonal_zero = ((((pattern_mask & vertical_pos) + vertical_pos)
+                              ^ vertical_pos) | pattern_mask | vertical_neg
+                             | transposition)
+            horizontal_pos = (vertical_neg
+                              | ~(diagonal_zero | vertical_pos)) & all_ones
+            horizontal_neg = diagonal_zero & vertical_pos
+            if horizontal_pos & last_bit:
+                current_distance += 1
+            elif horizontal_neg & last_bit:
+                current_distance -= 1
+            # the last row changes by at most 1 per remaining character
+            if current_distance - (len_2 - j - 1) > max_distance:
+                return -1
+            horizontal_pos = (horizontal_pos << 1) | 1
+            horizontal_neg <<= 1
+            vertical_pos = (horizontal_neg
+                            | ~(diagonal_zero | horizontal_pos)) & all_ones
+            vertical_neg = horizontal_pos & diagonal_zero
+            prev_pattern_mask = pattern_mask
+        return current_distance if current_distance <= max_distance else -1
@@ -0,0 +1,439 @@
+"""
+.. module:: engine
+   :synopsis: Module for sharing a single loaded SymSpell index per
+              process.
+"""
+import copy
+import os.path
+import threading
+
+from symspellpy.journal import Journal
+from symspellpy.symspellpy import SymSpell
+
+class SymSpellEngine(object):
+    """Load-once holder for a :class:`.symspellpy.SymSpell` index.
+
+    The dictionary and bigram files are only read the first time the
+    index is requested. Every later request reuses the same object, so
+    a request handler only pays for the lookup itself. The index is
+    rebuilt on an explicit :meth:`reload`, which builds the new object
+    on the side and swaps it in once it is complete, so lookups that
+    are running concurrently keep using the previous index.
+
+    If `index_path` is given, the index is memory-mapped from that file
+    with :meth:`.symspellpy.SymSpell.load_index` as long as its metadata
+    records the modification times and sizes the dictionary files have
+    now, and rewritten after each build otherwise, so worker processes
+    share one physical copy.
+
+    If `journal_path` is given as well, words can be added and deleted
+    online with :meth:`create_dictionary_entry` and
+    :meth:`delete_dictionary_entry`. Each update is appended to the
+    :class:`.journal.Journal` before it is applied, and a build replays
+    the updates the snapshot in `index_path` does not contain yet. Once
+    `compact_every` updates accumulated, a background thread writes a
+    new snapshot from the previous one and the journal, so a restart
+    only replays the updates since then. A rebuild from changed
+    dictionary files replays the whole journal, which compaction keeps
+    to one or two updates per word.
+
+    **NOTE**: The returned :class:`.symspellpy.SymSpell` object is
+    shared by every caller in the process and should be treated as
+    read-only. Dictionary updates should go through the files and
+    :meth:`reload`, or through the update methods of the engine. The
+    first update of a mapped index applies to an in-memory copy that
+    is published once complete, later ones modify the shared object in
+    place and should not run concurrently with lookups of the updated
+    words on other threads.
+
+    Parameters
+    ----------
+    dictionary_path : str
+        The path+filename of the word/frequency count dictionary.
+    bigram_path : str, optional
+        The path+filename of the bigram dictionary.
+    max_dictionary_edit_distance : int, optional
+        Maximum edit distance for doing lookups.
+    prefix_length : int, optional
+        The length of word prefixes used for spell checking.
+    count_threshold : int, optional
+        The minimum frequency count for dictionary words to be
+        considered correct spellings.
+    term_index : int, optional
+        The column position of the word in `dictionary_path`.
+    count_index : int, optional
+        The column position of the frequency count in
+        `dictionary_path`.
+    bigram_term_index : int, optional
+        The column position of the first word in `bigram_path`.
+    bigram_count_index : int, optional
+        The column position of the frequency count in `bigram_path`.
+    encoding : str, optional
+        Text encoding of the dictionary files.
+    index_path : str, optional
+        The path+filename of the compact index file.
+    cache_size : int, optional
+        The maximum number of results cached per lookup method of the
+        shared index, 0 disables the caches.
+    bloom_error_rate : float, optional
+        The false positive rate of the Bloom filter over the deletes
+        saved in `index_path`, no filter if omitted.
+    journal_path : str, optional
+        The path+filename of the journal of online updates, which
+        requires `index_path`.
+    compact_every : int, optional
+        The number of updates since the last snapshot that starts a
+        background compaction, None to only compact on
+        :meth:`compact`.
+
+    Attributes
+    ----------
+    _sym_spell : :class:`.symspellpy.SymSpell`
+        The currently published index, or None if not loaded yet.
+    _signature : tuple
+        Modification time and size of the dictionary files the
+        current index was built from.
+    _lock : threading.Lock
+        Serializes index builds so concurrent first requests only
+        build once, and online updates.
+    _index_lock : threading.Lock
+        Serializes the writes of `index_path` by builds and
+        compactions.
+    _journal : :class:`.journal.Journal`
+        The journal of online updates, or None.
+    _snapshot_seq : int
+        The sequence number of the last journal update in the snapshot
+        in `index_path`.
+    _compaction : threading.Thread
+        The last compaction started, or None.
+
+    Raises
+    ------
+    ValueError
+        If `journal_path` is given without `index_path`.
+    """
+    def __init__(self, dictionary_path, bigram_path=None,
+                 max_dictionary_edit_distance=2, prefix_length=7,
+                 count_threshold=1, term_index=0, count_index=1,
+                 bigram_term_index=0, bigram_count_index=2,
+                 encoding=None, index_path=None, cache_size=0,
+                 bloom_error_rate=None, journal_path=None,
+                 compact_every=10000):
+        if journal_path is not None and index_path is None:
+            raise ValueError("journal_path requires an index_path")
+        self._dictionary_path = dictionary_path
+        self._bigram_path = bigram_path
+        self._max_dictionary_edit_distance = max_dictionary_edit_distance
+        self._prefix_length = prefix_length
+        self._count_threshold = count_threshold
+        self._term_index = term_index
+        self._count_index = count_index
+        self._bigram_term_index = bigram_term_index
+        self._bigram_count_index = bigram_count_index
+        self._encoding = encoding
+        self._index_path = index_path
+        self._cache_size = cache_size
+        self._bloom_error_rate = bloom_error_rate
+        self._journal_path = journal_path
+        self._compact_every = compact_every
+        self._sym_spell = None
+        self._signature = None
+        self._lock = threading.Lock()
+        self._index_lock = threading.Lock()
+        self._journal = (None if journal_path is None
+                         else Journal(journal_path))
+        self._snapshot_seq = 0
+        self._compaction = None
+
+    def load(self):
+        """Build the index if it has not been built yet.
+
+        Returns
+        -------
+        :class:`.symspellpy.SymSpell`
+            The shared index.
+        """
+        sym_spell = self._sym_spell
+        if sym_spell is not None:
+            return sym_spell
+        with self._lock:
+            if self._sym_spell is None:
+                self._publish()
+            return self._sym_spell
+
+    def reload(self, force=False):
+        """Rebuild the index from the dictionary files.
+
+        Parameters
+        ----------
+        force : bool, optional
+            A flag to determine whether to rebuild even when the
+            dictionary files have not changed since the last build.
+
+        Returns
+        -------
+        bool
+            True if a new index was built and published.
+        """
+        with self._lock:
+            if (not force and self._sym_spell is not None
+                    and not self.is_stale()):
+                return False
+            self._publish()
+            return True
+
+    def unload(self):
+        """Drop the shared index, the next :meth:`load` builds or maps
+        it again. Callers still holding the index keep it alive until
+        they release it.
+
+        **NOTE**: Updates made with :meth:`create_dictionary_entry` and
+        :meth:`delete_dictionary_entry` are lost unless the engine has
+        a journal.
+
+        Returns
+        -------
+        bool
+            True if an index was loaded.
+        """
+        with self._lock:
+            loaded = self._sym_spell is not None
+            self._sym_spell = None
+            self._signature = None
+            return loaded
+
+    def create_dictionary_entry(self, key, count):
+        """Add `count` to the frequency count of `key` in the shared
+        index, see :meth:`.symspellpy.SymSpell.create_dictionary_entry`.
+        With a journal, the update survives restarts and reloads.
+
+        Returns
+        -------
+        bool
+            True if the word was added as a new correctly spelled word.
+        """
+        with self._lock:
+            sym_spell = self._writable()
+            if self._journal is not None:
+                self._journal.append_create(key, count)
+            result = sym_spell.create_dictionary_entry(key, count)
+        self._compact_if_due()
+        return result
+
+    def delete_dictionary_entry(self, key):
+        """Delete `key` from the shared index, see
+        :meth:`.symspellpy.SymSpell.delete_dictionary_entry`. With a
+        journal, the update survives restarts and reloads.
+
+        Returns
+        -------
+        bool
+            True if the word was deleted, or False if it was not found.
+        """
+        with self._lock:
+            sym_spell = self._writable()
+            if self._journal is not None:
+                self._journal.append_delete(key)
+            result = sym_spell.delete_dictionary_entry(key)
+        self._compact_if_due()
+        return result
+
+    def compact(self, wait=False):
+        """Start a background compaction: write a new snapshot to
+        `index_path` from the current snapshot and the journal, then
+        collapse the journal. The shared index is not touched, it
+        already contains every update.
+
+        Parameters
+        ----------
+        wait : bool, optional
+            A flag to determine whether to wait for the compaction to
+            finish.
+
+        Returns
+        -------
+        threading.Thread
+            The compaction, or the one already running.
+
+        Raises
+        ------
+        ValueError
+            If the engine has no journal.
+        """
+        if self._journal is None:
+            raise ValueError("Engine has no journal to compact")
+        with self._lock:
+            if self._compaction is None or not self._compaction.is_alive():
+                self._compaction = threading.Thread(
+                    target=self._compact, args=(self._journal.last_seq,),
+                    daemon=True)
+                self._compaction.start()
+            compaction = self._compaction
+        if wait:
+            compaction.join()
+        return compaction
+
+    def _writable(self):
+        # making a mapped index writable rebuilds its deletes, which
+        # takes a while, so that happens on a copy that replaces the
+        # shared index once complete
+        if self._sym_spell is None:
+            self._publish()
+        if self._sym_spell.index_metadata is not None:
+            sym_spell = copy.copy(self._sym_spell)
+            sym_spell._ensure_writable()
+            self._sym_spell = sym_spell
+        return self._sym_spell
+
+    def _compact(self, upto):
+        signature = self._file_signature()
+        sym_spell = self._map_index(signature)
+        if sym_spell is not None:
+            snapshot_seq = sym_spell.index_metadata.get("journal_seq", 0)
+        else:
+            sym_spell = SymSpell(self._max_dictionary_edit_distance,
+                                 self._prefix_length, self._count_threshold)
+            self._load_files(sym_spell)
+            snapshot_seq = 0
+        if snapshot_seq < upto:
+            self._journal.replay(sym_spell, after=snapshot_seq, upto=upto)
+            with self._index_lock:
+                if self._snapshot_seq < upto:
+                    # the collapsed journal is only valid on top of a
+                    # snapshot that contains the updates up to `upto`;
+                    # after a change of the dictionary files, the
+                    # rebuild writes that snapshot instead
+                    if self._file_signature() != signature:
+                        return
+                    self._save_index(sym_spell, signature, upto)
+        del sym_spell
+        self._journal.compact(upto)
+
+    def _compact_if_due(self):
+        if (self._journal is not None and self._compact_every is not None
+                and (self._journal.last_seq - self._snapshot_seq
+                     >= self._compact_every)):
+            self.compact()
+
+    def is_stale(self):
+        """Check whether the dictionary files changed since the index
+        was built.
+
+        Returns
+        -------
+        bool
+            True if the index is not loaded or any dictionary file has
+            a different modification time or size.
+        """
+        return self._signature != self._file_signature()
+
+    def _publish(self):
+        # take the signature before reading the files, a change while
+        # building then shows up as stale on the next check
+        signature = self._file_signature()
+        self._sym_spell = self._build(signature)
+        self._signature = signature
+
+    def _build(self, signature):
+        sym_spell = self._map_index(signature, self._cache_size)
+        if sym_spell is not None:
+            if self._journal is not None:
+                self._snapshot_seq = sym_spell.index_metadata.get(
+                    "journal_seq", 0)
+                self._journal.replay(sym_spell, after=self._snapshot_seq)
+            return sym_spell
+        sym_spell = SymSpell(self._max_dictionary_edit_distance,
+                             self._prefix_length, self._count_threshold,
+                             cache_size=self._cache_size)
+        self._load_files(sym_spell)
+        journal_seq = 0
+        if self._journal is not None:
+            journal_seq = self._journal.last_seq
+            self._journal.replay(sym_spell, upto=journal_seq)
+        if self._index_path is not None:
+            index_dir = os.path.dirname(self._index_path)
+            if index_dir and not os.path.isdir(index_dir):
+                os.makedirs(index_dir, exist_ok=True)
+            with self._index_lock:
+                self._save_index(sym_spell, signature, journal_seq)
+        return sym_spell
+
+    def _map_index(self, signature, cache_size=0):
+        # None unless `index_path` was built from the dictionary files
+        # with `signature`
+        if (self._index_path is None
+                or not os.path.exists(self._index_path)):
+            return None
+        sym_spell = SymSpell(self._max_dictionary_edit_distance,
+                             self._prefix_length, self._count_threshold,
+                             cache_size=cache_size)
+        if (not sym_spell.load_index(self._index_path)
+                or (sym_spell.index_metadata.get("dictionary_files")
+                    != _signature_metadata(signature))):
+            return None
+        return sym_spell
+
+    def _save_index(self, sym_spell, signature, journal_seq):
+        # called with _index_lock held
+        sym_spell.save_index(
+            self._index_path, self._bloom_error_rate,
+            {"journal_seq": journal_seq,
+             "dictionary_files": _signature_metadata(signature)})
+        self._snapshot_seq = journal_seq
+
+    def _load_files(self, sym_spell):
+        if not sym_spell.load_dictionary(self._dictionary_path,
+                                         self._term_index,
+                                         self._count_index,
+                                         encoding=self._encoding):
+            raise ValueError("Dictionary file not found: "
+                             "{}".format(self._dictionary_path))
+        if self._bigram_path is not None:
+            sym_spell.load_bigram_dictionary(self._bigram_path,
+                                             self._bigram_term_index,
+                                             self._bigram_count_index,
+                                             encoding=self._encoding)
+
+    def _file_signature(self):
+        signature = list()
+        for path in (self._dictionary_path, self._bigram_path):
+            if path is None or not os.path.exists(path):
+                signature.append((path, None, None))
+            else:
+                stat = os.stat(path)
+                signature.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+
+    @property
+    def settings(self):
+        """dict: The constructor arguments of this engine, to create
+        an equivalent engine in another process."""
+        return {"dictionary_path": self._dictionary_path,
+                "bigram_path": self._bigram_path,
+                "max_dictionary_edit_distance":
+                    self._max_dictionary_edit_distance,
+                "prefix_length": self._prefix_length,
+                "count_threshold": self._count_threshold,
+                "term_index": self._term_index,
+                "count_index": self._count_index,
+                "bigram_term_index": self._bigram_term_index,
+                "bigram_count_index": self._bigram_count_index,
+                "encoding": self._encoding,
+                "index_path": self._index_path,
+                "cache_size": self._cache_size,
+                "bloom_error_rate": self._bloom_error_rate,
+                "journal_path": self._journal_path,
+                "compact_every": self._compact_every}
+
+    @property
+    def is_loaded(self):
+        return self._sym_spell is not None
+
+    @property
+    def sym_spell(self):
+        return self.load()
+
+def _signature_metadata(signature):
+    """The modification times and sizes of a file signature, as stored
+    in the index metadata."""
+    return [[mtime, size] for __, mtime, size in signature]
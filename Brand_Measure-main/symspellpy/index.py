@@ -0,0 +1,390 @@
+"""
+.. module:: index
+   :synopsis: Compact, memory-mappable on-disk format for the SymSpell
+              dictionary and deletes index.
+
+The file consists of a small JSON header followed by flat arrays:
+
+* words are interned: their UTF-8 bytes are stored back to back in one
+  blob, addressed by an offsets array, and their counts are packed in a
+  parallel array. A word id is the position of the word in these
+  arrays.
+* word lookup by string goes through a sorted array of 64-bit word
+  hashes and a parallel array of word ids.
+* the deletes are stored CSR-style: a sorted array of 64-bit delete
+  hashes, an offsets array into a flat array of word ids.
+* the bigrams are stored like the words.
+* optionally, a :class:`.bloom.BloomFilter` over the delete strings
+  rejects most deletes that are not in the index before they are
+  hashed and searched for.
+
+All arrays are read through `memoryview` objects over a read-only
+`mmap`, so loading only parses the header and the pages are shared by
+every process that opens the same file.
+"""
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+import hashlib
+import json
+import mmap
+import os
+import sys
+import threading
+
+from symspellpy.bloom import BloomFilter
+
+MAGIC = b"SYMSPIDX"
+FORMAT_VERSION = 1
+_ALIGNMENT = 8
+
+def hash64(string):
+    """Compute a 64-bit hash of a string which, unlike :func:`hash`,
+    is stable across processes.
+
+    Parameters
+    ----------
+    string : str
+        The string to hash.
+
+    Returns
+    -------
+    int
+        Unsigned 64-bit hash value.
+    """
+    return int.from_bytes(hashlib.blake2b(string.encode("utf-8"),
+                                          digest_size=8).digest(),
+                          "little")
+
+class StringCountTable(Mapping):
+    """Read-only mapping of interned strings to their counts, backed by
+    the flat arrays of a :class:`CompactIndex`.
+
+    Parameters
+    ----------
+    blob : memoryview
+        UTF-8 bytes of all strings, back to back.
+    offsets : memoryview
+        Start offset of each string in `blob`, plus the end offset of
+        the last string.
+    counts : memoryview
+        Count of each string.
+    hashes : memoryview
+        Sorted :func:`hash64` values of the strings.
+    hash_ids : memoryview
+        Id of the string for each entry of `hashes`.
+    """
+    def __init__(self, blob, offsets, counts, hashes, hash_ids):
+        self._blob = blob
+        self._offsets = offsets
+        self._counts = counts
+        self._hashes = hashes
+        self._hash_ids = hash_ids
+
+    def __getitem__(self, key):
+        string_id = self.id_of(key)
+        if string_id < 0:
+            raise KeyError(key)
+        return self._counts[string_id]
+
+    def __contains__(self, key):
+        return self.id_of(key) >= 0
+
+    def __iter__(self):
+        for string_id in range(len(self._counts)):
+            yield self.string_at(string_id)
+
+    def __len__(self):
+        return len(self._counts)
+
+    def id_of(self, key):
+        """Return the id of `key`, or -1 if `key` is not in the table.
+        """
+        if not isinstance(key, str):
+            return -1
+        key_hash = hash64(key)
+        i = bisect_left(self._hashes, key_hash)
+        while i < len(self._hashes) and self._hashes[i] == key_hash:
+            string_id = self._hash_ids[i]
+            if self.string_at(string_id) == key:
+                return string_id
+            i += 1
+        return -1
+
+    def string_at(self, string_id):
+        """Return the string with id `string_id`."""
+        return str(self._blob[self._offsets[string_id]:
+                              self._offsets[string_id + 1]], "utf-8")
+
+    def count_at(self, string_id):
+        """Return the count of the string with id `string_id`."""
+        return self._counts[string_id]
+
+class StringList(Sequence):
+    """Read-only sequence of the strings of a :class:`StringCountTable`
+    by id.
+
+    Parameters
+    ----------
+    table : :class:`StringCountTable`
+        The table holding the strings.
+    """
+    def __init__(self, table):
+        self._table = table
+
+    def __getitem__(self, string_id):
+        return self._table.string_at(string_id)
+
+    def __len__(self):
+        return len(self._table)
+
+class DeleteTable(object):
+    """Read-only mapping of delete strings to the ids of the dictionary
+    words they were derived from, backed by the flat arrays of a
+    :class:`CompactIndex`.
+
+    Delete strings themselves are not stored, only their
+    :func:`hash64` values. Hash collisions merely add words to a
+    suggestion list, which :meth:`.symspellpy.SymSpell.lookup` already
+    verifies like any other hash collision. Most deletes probed by a
+    lookup are not in the index; with a `bloom` filter those are
+    rejected without hashing them for the binary search.
+
+    Parameters
+    ----------
+    hashes : memoryview
+        Sorted :func:`hash64` values of the delete strings.
+    offsets : memoryview
+        Start offset of the word ids of each delete in `word_ids`,
+        plus the end offset of the last delete.
+    word_ids : memoryview
+        Word ids of all deletes, back to back.
+    bloom : :class:`.bloom.BloomFilter`, optional
+        Filter over the delete strings.
+    """
+    def __init__(self, hashes, offsets, word_ids, bloom=None):
+        self._hashes = hashes
+        self._offsets = offsets
+        self._word_ids = word_ids
+        self._bloom = bloom
+
+    def __getitem__(self, key):
+        i = self._position(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._word_ids[self._offsets[i]:self._offsets[i + 1]]
+
+    def __contains__(self, key):
+        return self._position(key) >= 0
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def _position(self, key):
+        if self._bloom is not None and key not in self._bloom:
+            return -1
+        key_hash = hash64(key)
+        i = bisect_left(self._hashes, key_hash)
+        if i < len(self._hashes) and self._hashes[i] == key_hash:
+            return i
+        return -1
+
+class CompactIndex(object):
+    """An opened compact index file.
+
+    Parameters
+    ----------
+    filename : str
+        The path+filename of the index file.
+
+    Attributes
+    ----------
+    metadata : dict
+        The settings of the :class:`.symspellpy.SymSpell` object the
+        index was written from.
+    words : :class:`StringCountTable`
+        Dictionary words and their counts.
+    word_list : :class:`StringList`
+        Dictionary words by id.
+    deletes : :class:`DeleteTable`
+        Delete strings and the ids of the words they were derived
+        from.
+    bigrams : :class:`StringCountTable`
+        Bigrams and their counts.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a compact index, or was written with a
+        different format version or byte order.
+    """
+    def __init__(self, filename):
+        with open(filename, "rb") as infile:
+            self._mmap = mmap.mmap(infile.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        header = self._read_header()
+        self.metadata = header["metadata"]
+        sections = {name: self._section(offset, length, typecode)
+                    for name, (offset, length, typecode)
+                    in header["sections"].items()}
+        self.words = StringCountTable(
+            sections["word_blob"], sections["word_offsets"],
+            sections["word_counts"], sections["word_hashes"],
+            sections["word_hash_ids"])
+        self.word_list = StringList(self.words)
+        bloom = None
+        if "delete_bloom" in sections:
+            bloom = BloomFilter(sections["delete_bloom"],
+                                header["bloom_num_hashes"])
+        self.deletes = DeleteTable(
+            sections["delete_hashes"],
+            sections["delete_offsets"], sections["delete_word_ids"], bloom)
+        self.bigrams = StringCountTable(
+            sections["bigram_blob"], sections["bigram_offsets"],
+            sections["bigram_counts"], sections["bigram_hashes"],
+            sections["bigram_hash_ids"])
+
+    @property
+    def size(self):
+        """int: The size of the mapped file in bytes."""
+        return len(self._mmap)
+
+    def _read_header(self):
+        prefix_len = len(MAGIC) + 8
+        if self._buffer[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a compact index file")
+        version, header_len = self._buffer[len(MAGIC):prefix_len].cast("I")
+        if version != FORMAT_VERSION:
+            raise ValueError("Unsupported index format version "
+                             "{}".format(version))
+        header = json.loads(
+            str(self._buffer[prefix_len:prefix_len + header_len], "utf-8"))
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError("Index was written with a different byte "
+                             "order")
+        return header
+
+    def _section(self, offset, length, typecode):
+        return self._buffer[offset:offset + length].cast(typecode)
+
+def write_index(filename, words, deletes, bigrams, metadata,
+                bloom_error_rate=None):
+    """Write a compact index file.
+
+    The file is written to a temporary name first and moved into place,
+    so processes that have the previous index opened keep a consistent
+    view.
+
+    Parameters
+    ----------
+    filename : str
+        The path+filename of the index file.
+    words : dict
+        Dictionary words and their counts.
+    deletes : dict
+        Delete strings and the list of words they were derived from.
+    bigrams : dict
+        Bigrams and their counts.
+    metadata : dict
+        JSON serializable settings stored in the header.
+    bloom_error_rate : float, optional
+        The false positive rate of a Bloom filter over the deletes, no
+        filter is written if omitted.
+    """
+    word_ids = {word: i for i, word in enumerate(words)}
+    delete_hashes = sorted((hash64(delete), delete)
+                           for delete, suggestions in deletes.items()
+                           if suggestions)
+    delete_offsets = array("Q", [0])
+    delete_word_ids = array("I")
+    unique_hashes = array("Q")
+    for delete_hash, delete in delete_hashes:
+        if not unique_hashes or unique_hashes[-1] != delete_hash:
+            unique_hashes.append(delete_hash)
+            delete_offsets.append(delete_offsets[-1])
+        delete_word_ids.extend(word_ids[word] for word in deletes[delete])
+        delete_offsets[-1] = len(delete_word_ids)
+
+    sections = list()
+    sections.extend(_string_count_sections("word", words))
+    sections.extend([("delete_hashes", unique_hashes),
+                     ("delete_offsets", delete_offsets),
+                     ("delete_word_ids", delete_word_ids)])
+    sections.extend(_string_count_sections("bigram", bigrams))
+    header = {"byteorder": sys.byteorder, "metadata": metadata}
+    if bloom_error_rate is not None:
+        bloom = BloomFilter.create(len(delete_hashes), bloom_error_rate)
+        for __, delete in delete_hashes:
+            bloom.add(delete)
+        sections.append(("delete_bloom", array("B", bloom.bits)))
+        header["bloom_num_hashes"] = bloom.num_hashes
+
+    # lay out the sections behind the header, each aligned so that
+    # memoryview.cast gives aligned element access
+    section_table = dict()
+    payloads = list()
+    offset = 0
+    for name, values in sections:
+        data = values.tobytes()
+        section_table[name] = [offset, len(data), values.typecode]
+        padding = -len(data) % _ALIGNMENT
+        payloads.append(data + b"\0" * padding)
+        offset += len(data) + padding
+    header["sections"] = section_table
+    header_len = len(json.dumps(header).encode("utf-8"))
+    # section offsets are relative to the end of the header until the
+    # header length is known; the header length only grows while the
+    # offsets are rewritten, so iterate until it is stable
+    while True:
+        base = len(MAGIC) + 8 + header_len
+        base += -base % _ALIGNMENT
+        header["sections"] = {
+            name: [section_offset + base, length, typecode]
+            for name, (section_offset, length, typecode)
+            in section_table.items()}
+        header_bytes = json.dumps(header).encode("utf-8")
+        if len(header_bytes) <= header_len:
+            break
+        header_len = len(header_bytes)
+    header_bytes += b" " * (header_len - len(header_bytes))
+
+    # unique per process and thread, concurrent writers of the same
+    # index never write to the same temporary file
+    temp_filename = "{}.{}-{}.tmp".format(filename, os.getpid(),
+                                          threading.get_ident())
+    try:
+        with open(temp_filename, "wb") as outfile:
+            outfile.write(MAGIC)
+            outfile.write(array("I", [FORMAT_VERSION, header_len]).tobytes())
+            outfile.write(header_bytes)
+            outfile.write(b"\0" * (base - len(MAGIC) - 8 - header_len))
+            for payload in payloads:
+                outfile.write(payload)
+        os.replace(temp_filename, filename)
+    except BaseException:
+        if os.path.exists(temp_filename):
+            os.remove(temp_filename)
+        raise
+
+def _string_count_sections(prefix, counts):
+    blob = bytearray()
+    offsets = array("Q", [0])
+    packed_counts = array("q")
+    for string, count in counts.items():
+        blob += string.encode("utf-8")
+        offsets.append(len(blob))
+        packed_counts.append(count)
+    hashes = sorted((hash64(string), i) for i, string in enumerate(counts))
+    return [("{}_blob".format(prefix), array("B", blob)),
+            ("{}_offsets".format(prefix), offsets),
+            ("{}_counts".format(prefix), packed_counts),
+            ("{}_hashes".format(prefix), array("Q", (h for h, _ in hashes))),
+            ("{}_hash_ids".format(prefix),
+             array("I", (i for _, i in hashes)))]
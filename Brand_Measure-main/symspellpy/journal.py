@@ -0,0 +1,237 @@
+"""
+.. module:: journal
+   :synopsis: Append-only journal of dictionary updates.
+
+Every :meth:`.symspellpy.SymSpell.create_dictionary_entry` and
+:meth:`.symspellpy.SymSpell.delete_dictionary_entry` call made through
+:class:`.engine.SymSpellEngine` is appended to a journal, one line per
+update::
+
+    <seq>\\t+\\t<word>\\t<count>
+    <seq>\\t-\\t<word>
+
+Sequence numbers increase by one per update. A snapshot records the
+last sequence number it contains, so replaying the journal on top of
+the snapshot skips what is already in it and replays twice nothing,
+even if the process stopped between writing a snapshot and compacting
+the journal.
+"""
+import os
+import threading
+
+class Journal(object):
+    """Append-only journal file of dictionary updates.
+
+    A line that was only partly written when the process stopped is
+    dropped when the journal is opened.
+
+    Parameters
+    ----------
+    path : str
+        The path+filename of the journal, created if it does not
+        exist.
+    sync : bool, optional
+        A flag to determine whether every update is flushed to disk
+        with :func:`os.fsync` before it is applied, rather than only
+        to the operating system.
+
+    Attributes
+    ----------
+    _last_seq : int
+        The sequence number of the last update in the journal.
+    _file : file object
+        The journal opened for appending.
+    _lock : threading.Lock
+        Serializes appends and compaction.
+    """
+    def __init__(self, path, sync=False):
+        self._path = path
+        self._sync = sync
+        self._lock = threading.Lock()
+        self._last_seq = 0
+        valid_size = 0
+        if os.path.exists(path):
+            with open(path, "rb") as infile:
+                for line in infile:
+                    if not line.endswith(b"\n"):
+                        break
+                    valid_size += len(line)
+                    self._last_seq = int(line.split(b"\t", 1)[0])
+            if valid_size < os.path.getsize(path):
+                with open(path, "r+b") as outfile:
+                    outfile.truncate(valid_size)
+        self._file = open(path, "a", encoding="utf-8", newline="\n")
+
+    def append_create(self, key, count):
+        """Record a :meth:`.symspellpy.SymSpell.create_dictionary_entry`
+        call.
+
+        Returns
+        -------
+        int
+            The sequence number of the update.
+
+        Raises
+        ------
+        ValueError
+            If `key` contains a tab or line break.
+        """
+        return self._append("+", key, "\t{}".format(count))
+
+    def append_delete(self, key):
+        """Record a :meth:`.symspellpy.SymSpell.delete_dictionary_entry`
+        call.
+
+        Returns
+        -------
+        int
+            The sequence number of the update.
+
+        Raises
+        ------
+        ValueError
+            If `key` contains a tab or line break.
+        """
+        return self._append("-", key, "")
+
+    def _append(self, op, key, suffix):
+        if "\t" in key or "\n" in key or "\r" in key:
+            raise ValueError("key cannot contain tabs or line breaks")
+        with self._lock:
+            seq = self._last_seq + 1
+            self._file.write("{}\t{}\t{}{}\n".format(seq, op, key, suffix))
+            self._file.flush()
+            if self._sync:
+                os.fsync(self._file.fileno())
+            self._last_seq = seq
+            return seq
+
+    def entries(self, after=0, upto=None):
+        """Read the updates in journal order.
+
+        Parameters
+        ----------
+        after : int, optional
+            Skip updates with this or a lower sequence number.
+        upto : int, optional
+            Stop after the update with this sequence number.
+
+        Returns
+        -------
+        list
+            (seq, op, key, count) tuples, op is "+" or "-" and count is
+            None for deletes.
+        """
+        with self._lock:
+            if upto is None:
+                upto = self._last_seq
+            entries = list()
+            with open(self._path, "r", encoding="utf-8",
+                      newline="\n") as infile:
+                for line in infile:
+                    parts = line.rstrip("\n").split("\t")
+                    seq = int(parts[0])
+                    if seq > upto:
+                        break
+                    if seq > after:
+                        count = int(parts[3]) if parts[1] == "+" else None
+                        entries.append((seq, parts[1], parts[2], count))
+            return entries
+
+    def replay(self, sym_spell, after=0, upto=None):
+        """Apply the updates to `sym_spell`.
+
+        Parameters
+        ----------
+        sym_spell : :class:`.symspellpy.SymSpell`
+            The dictionary to update.
+        after : int, optional
+            Skip updates with this or a lower sequence number, i.e. the
+            updates already in the snapshot `sym_spell` was loaded
+            from.
+        upto : int, optional
+            Stop after the update with this sequence number.
+
+        Returns
+        -------
+        int
+            The number of updates applied.
+        """
+        entries = self.entries(after, upto)
+        for __, op, key, count in entries:
+            if op == "+":
+                sym_spell.create_dictionary_entry(key, count)
+            else:
+                sym_spell.delete_dictionary_entry(key)
+        return len(entries)
+
+    def compact(self, upto):
+        """Collapse the updates up to `upto` into the fewest updates
+        with the same effect: per word, the last delete (if any)
+        followed by one create with the sum of the later counts.
+
+        The updates keep their sequence numbers, so they are still
+        skipped when replayed on top of a snapshot that contains them,
+        and still applied on top of a full build from the dictionary
+        files. The journal then grows with the number of distinct
+        words updated rather than with the number of updates.
+
+        Parameters
+        ----------
+        upto : int
+            The sequence number of the last update to collapse, later
+            updates are kept as they are.
+        """
+        with self._lock:
+            collapsed = dict()
+            tail = list()
+            with open(self._path, "r", encoding="utf-8",
+                      newline="\n") as infile:
+                for line in infile:
+                    parts = line.rstrip("\n").split("\t")
+                    seq = int(parts[0])
+                    if seq > upto:
+                        tail.append(line)
+                        continue
+                    key = parts[2]
+                    if parts[1] == "-":
+                        # a delete makes the earlier updates of the
+                        # word irrelevant
+                        collapsed[key] = [seq, None, 0]
+                    else:
+                        state = collapsed.setdefault(key, [None, None, 0])
+                        state[1] = seq
+                        # counts <= 0 add nothing to the count
+                        state[2] += max(int(parts[3]), 0)
+            lines = list()
+            for key, (delete_seq, create_seq, count) in collapsed.items():
+                if delete_seq is not None:
+                    lines.append((delete_seq, "{}\t-\t{}\n".format(
+                        delete_seq, key)))
+                if create_seq is not None:
+                    lines.append((create_seq, "{}\t+\t{}\t{}\n".format(
+                        create_seq, key, count)))
+            lines.sort()
+            temp_path = "{}.{}.tmp".format(self._path, os.getpid())
+            with open(temp_path, "w", encoding="utf-8",
+                      newline="\n") as outfile:
+                outfile.writelines(line for __, line in lines)
+                outfile.writelines(tail)
+                outfile.flush()
+                os.fsync(outfile.fileno())
+            self._file.close()
+            os.replace(temp_path, self._path)
+            self._file = open(self._path, "a", encoding="utf-8",
+                              newline="\n")
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+    @property
+    def last_seq(self):
+        return self._last_seq
+
+    @property
+    def path(self):
+        return self._path
@@ -2,18 +2,24 @@
 .. module:: symspellpy
    :synopsis: Module for Symmetric Delete spelling correction algorithm.
 """
-from collections import defaultdict, namedtuple
+from array import array
+from collections import Counter, namedtuple
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 import gzip
-from itertools import cycle
+from itertools import islice, repeat
+import locale
 import math
 import os.path
 import pickle
 import re
 import sys
 
+from symspellpy.cache import LRUCache
 from symspellpy.editdistance import DistanceAlgorithm, EditDistance
 import symspellpy.helpers as helpers
+from symspellpy.index import CompactIndex, write_index
 
 class Verbosity(Enum):
     """Controls the closeness/quantity of returned spelling
@@ -39,6 +45,12 @@ class SymSpell(object):
     count_threshold : int
         The minimum frequency count for dictionary words to be
         considered correct spellings.
+    distance_algorithm : :class:`.editdistance.DistanceAlgorithm`, optional
+        The edit distance algorithm used to verify suggestions.
+    cache_size : int, optional
+        The maximum number of results cached for each of
+        :meth:`lookup`, :meth:`lookup_compound` and
+        :meth:`word_segmentation`, 0 disables the caches.
 
     Attributes
     ----------
@@ -49,10 +61,14 @@ class SymSpell(object):
         Dictionary of unique words that are below the count threshold
         for being considered correct spellings.
     _deletes : dict
-        Dictionary that contains a mapping of lists of suggested
+        Dictionary that contains a mapping of the ids of suggested
         correction words to the original words and the deletes derived
-        from them. A list of suggestions might have a single
-        suggestion, or multiple suggestions.
+        from them. Most deletes have a single suggestion, whose id is
+        stored as an int; several suggestions are stored as an
+        `array("I")` of ids. See :attr:`deletes` for the suggestions
+        themselves.
+    _word_list : list
+        The correct spelling words by id, None for deleted words.
     _max_dictionary_edit_distance : int
         Maximum dictionary term length.
     _prefix_length : int
@@ -67,6 +83,21 @@ class SymSpell(object):
         Length of longest word in the dictionary.
     _replaced_words : dict
         Dictionary corrected/modified words
+    _index : :class:`.index.CompactIndex`
+        The memory-mapped index backing :attr:`_words`,
+        :attr:`_deletes` and :attr:`_bigrams` after
+        :meth:`load_index`, or None if they are in-memory dicts.
+    _version : int
+        Counter incremented on every change of the dictionary data,
+        cached results of older versions are discarded.
+    _lookup_cache : :class:`.cache.LRUCache`
+        Results of :meth:`lookup`, or None if caching is disabled.
+    _compound_cache : :class:`.cache.LRUCache`
+        Results of :meth:`lookup_compound`, or None if caching is
+        disabled.
+    _segmentation_cache : :class:`.cache.LRUCache`
+        Results of :meth:`word_segmentation`, or None if caching is
+        disabled.
 
     Raises
     ------
@@ -77,8 +108,10 @@ class SymSpell(object):
         `max_dictionary_edit_distance`.
     ValueError
         If `count_threshold` is negative.
+    ValueError
+        If `cache_size` is negative.
     """
-    data_version = 2
+    data_version = 3
     # number of all words in the corpus used to generate the
     # frequency dictionary. This is used to calculate the word
     # occurrence probability p from word counts c : p=c/N. N equals
@@ -88,7 +121,9 @@ class SymSpell(object):
     N = 1024908267229
     bigram_count_min = sys.maxsize
     def __init__(self, max_dictionary_edit_distance=2, prefix_length=7,
-                 count_threshold=1):
+                 count_threshold=1,
+                 distance_algorithm=DistanceAlgorithm.DAMERUAUOSA,
+                 cache_size=0):
         if max_dictionary_edit_distance < 0:
             raise ValueError("max_dictionary_edit_distance cannot be "
                              "negative")
@@ -98,16 +133,29 @@ class SymSpell(object):
                              "smaller than max_dictionary_edit_distance")
         if count_threshold < 0:
             raise ValueError("count_threshold cannot be negative")
+        if cache_size < 0:
+            raise ValueError("cache_size cannot be negative")
         self._words = dict()
         self._below_threshold_words = dict()
         self._bigrams = dict()
-        self._deletes = defaultdict(list)
+        self._deletes = dict()
+        self._word_list = list()
         self._max_dictionary_edit_distance = max_dictionary_edit_distance
         self._prefix_length = prefix_length
         self._count_threshold = count_threshold
-        self._distance_algorithm = DistanceAlgorithm.DAMERUAUOSA
+        self._distance_algorithm = distance_algorithm
         self._max_length = 0
         self._replaced_words = dict()
+        self._index = None
+        self._version = 0
+        if cache_size > 0:
+            self._lookup_cache = LRUCache(cache_size)
+            self._compound_cache = LRUCache(cache_size)
+            self._segmentation_cache = LRUCache(cache_size)
+        else:
+            self._lookup_cache = None
+            self._compound_cache = None
+            self._segmentation_cache = None
 
     def create_dictionary_entry(self, key, count):
         """Create/Update an entry in the dictionary. For every word
@@ -132,12 +180,39 @@ class SymSpell(object):
             word, or False if the word is added as a below threshold
             word, or updates an existing correctly spelled word.
         """
+        self._ensure_writable()
+        if not self._update_count(key, count):
+            return False
+
+        # edits/suggestions are created only once, no matter how often
+        # word occurs. edits/suggestions are created as soon as the
+        # word occurs in the corpus, even if the same term existed
+        # before in the dictionary as an edit from another word
+
+        # create deletes
+        word_id = len(self._word_list)
+        self._word_list.append(key)
+        _add_word_id(self._deletes, self._edits_prefix(key), word_id)
+        return True
+
+    def _update_count(self, key, count):
+        """Add `count` to the frequency count of `key` with the
+        threshold promotion rules of :meth:`create_dictionary_entry`,
+        without creating the deletes.
+
+        Returns
+        -------
+        bool
+            True if the word was added as a new correctly spelled
+            word and needs its deletes created.
+        """
         if count <= 0:
             # no point doing anything if count is zero, as it can't
             # change anything
             if self._count_threshold > 0:
                 return False
             count = 0
+        self._version += 1
 
         # look first in below threshold words, update count, and allow
         # promotion to correct spelling word if count reaches threshold
@@ -172,18 +247,8 @@ class SymSpell(object):
 
         # what we have at this point is a new, above threshold word
         self._words[key] = count
-
-        # edits/suggestions are created only once, no matter how often
-        # word occurs. edits/suggestions are created as soon as the
-        # word occurs in the corpus, even if the same term existed
-        # before in the dictionary as an edit from another word
         if len(key) > self._max_length:
             self._max_length = len(key)
-
-        # create deletes
-        edits = self._edits_prefix(key)
-        for delete in edits:
-            self._deletes[delete].append(key)
         return True
 
     def delete_dictionary_entry(self, key):
@@ -202,18 +267,29 @@ class SymSpell(object):
             True if the word is successfully deleted, or False if the
             word is not found.
         """
+        self._ensure_writable()
         if key not in self._words:
             return False
+        self._version += 1
         del self._words[key]
         # look for the next longest word if we just deleted the
         # longest word
         if len(key) == self._max_length:
-            self._max_length = max(map(len, self._words.keys()))
+            self._max_length = max(map(len, self._words.keys()), default=0)
 
-        # create deletes
+        # remove deletes, the word's prefix is one of its deletes
         edits = self._edits_prefix(key)
+        word_id = next(
+            word_id for word_id
+            in _word_ids(self._deletes[key[: self._prefix_length]])
+            if self._word_list[word_id] == key)
+        self._word_list[word_id] = None
         for delete in edits:
-            self._deletes[delete].remove(key)
+            word_ids = self._deletes[delete]
+            if word_ids.__class__ is int or len(word_ids) == 1:
+                del self._deletes[delete]
+            else:
+                word_ids.remove(word_id)
         return True
 
     def load_bigram_dictionary(self, corpus, term_index, count_index,
@@ -243,6 +319,8 @@ class SymSpell(object):
         """
         if not os.path.exists(corpus):
             return False
+        self._ensure_writable()
+        self._version += 1
         with open(corpus, "r", encoding=encoding) as infile:
             for line in infile:
                 line_parts = line.rstrip().split(separator)
@@ -287,6 +365,7 @@ class SymSpell(object):
         """
         if not os.path.exists(corpus):
             return False
+        self._version += 1
         with open(corpus, "r", encoding=encoding) as infile:
             for line in infile:
                 line_parts = line.rstrip().split(separator)
@@ -323,18 +402,100 @@ class SymSpell(object):
                     self.create_dictionary_entry(key, 1)
         return True
 
+    def create_dictionary_parallel(self, corpora, workers=None,
+                                   encoding=None, shard_size=2 ** 24):
+        """Load multiple dictionary words from files containing plain
+        text, like :meth:`create_dictionary`, using a pool of worker
+        processes.
+
+        The files are split into shards of about `shard_size` bytes at
+        line boundaries. The workers count the words of each shard,
+        the counts are merged and applied with the threshold promotion
+        rules of :meth:`create_dictionary_entry`, then the workers
+        generate the deletes of the new words. Words are added in the
+        order of their first occurrence, so the result is the same as
+        calling :meth:`create_dictionary` on each file in turn (with
+        a `count_threshold` above 1, words that reach the threshold
+        are not necessarily added in the same order).
+
+        **NOTE**: Merges with any dictionary data already loaded.
+
+        Parameters
+        ----------
+        corpora : str or list of str
+            The path+filename of the file(s).
+        workers : int, optional
+            The number of worker processes, defaults to the number of
+            CPUs. With 1 worker, the shards are processed in this
+            process.
+        encoding : str, optional
+            Text encoding of the corpus files, must be one in which a
+            newline is the single byte `\\n` (e.g. UTF-8).
+        shard_size : int, optional
+            The approximate number of bytes in a shard.
+
+        Returns
+        -------
+        bool
+            True if the files are loaded, or False if any file is not
+            found, in which case nothing is loaded.
+        """
+        if isinstance(corpora, str):
+            corpora = [corpora]
+        if not all(os.path.exists(corpus) for corpus in corpora):
+            return False
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if encoding is None:
+            encoding = locale.getpreferredencoding(False)
+        self._ensure_writable()
+        self._version += 1
+        executor = ProcessPoolExecutor(workers) if workers > 1 else None
+        try:
+            mapper = map if executor is None else executor.map
+            counts = Counter()
+            for shard_counts in mapper(_count_shard,
+                                       _corpus_shards(corpora, shard_size,
+                                                      encoding)):
+                counts.update(shard_counts)
+            new_words = [key for key, count in counts.items()
+                         if self._update_count(key, count)]
+            # a few chunks per worker keep the workers busy when the
+            # chunks take different time
+            chunk_size = max(1, math.ceil(len(new_words) / (workers * 4)))
+            first_id = len(self._word_list)
+            self._word_list.extend(new_words)
+            chunks = [(new_words[i : i + chunk_size], first_id + i,
+                       self._max_dictionary_edit_distance,
+                       self._prefix_length)
+                      for i in range(0, len(new_words), chunk_size)]
+            for chunk_deletes in mapper(_chunk_deletes, chunks):
+                for delete, word_ids in chunk_deletes.items():
+                    existing = self._deletes.get(delete)
+                    if existing is not None:
+                        merged = array("I", _word_ids(existing))
+                        merged.extend(_word_ids(word_ids))
+                        word_ids = merged
+                    self._deletes[delete] = word_ids
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        return True
+
     def save_pickle_stream(self, stream):
-        """Pickle :attr:`_deletes`, :attr:`_words`, and
-        :attr:`_max_length` into a stream for quicker loading later.
+        """Pickle :attr:`_deletes`, :attr:`_words`, :attr:`_word_list`
+        and :attr:`_max_length` into a stream for quicker loading later.
 
         Parameters
         ----------
         stream : str
             The stream to store the pickle data.
         """
+        self._ensure_writable()
         pickle_data = {
             "deletes": self._deletes,
             "words": self._words,
+            "word_list": self._word_list,
             "max_length": self._max_length,
             "data_version": self.data_version
         }
@@ -375,7 +536,10 @@ class SymSpell(object):
             return False
         self._deletes = pickle_data["deletes"]
         self._words = pickle_data["words"]
+        self._word_list = pickle_data["word_list"]
         self._max_length = pickle_data["max_length"]
+        self._index = None
+        self._version += 1
         return True
 
     def load_pickle(self, filename, compressed=True):
@@ -399,6 +563,78 @@ class SymSpell(object):
         with (gzip.open if compressed else open)(filename, "rb") as f:
             return self.load_pickle_stream(f)
 
+    def save_index(self, filename, bloom_error_rate=None, metadata=None):
+        """Save :attr:`_words`, :attr:`_deletes`, :attr:`_bigrams` and
+        :attr:`_max_length` in the compact format of
+        :mod:`symspellpy.index`, which :meth:`load_index` memory-maps
+        instead of unpickling.
+
+        Parameters
+        ----------
+        filename : str
+            The path+filename of the index file.
+        bloom_error_rate : float, optional
+            If given, a Bloom filter over the deletes with this false
+            positive rate is saved with the index, so lookups on the
+            loaded index skip most deletes that are not in it. The
+            filter is rebuilt on every save, and dropped with the
+            mapped index when entries are added or deleted after
+            :meth:`load_index`.
+        metadata : dict, optional
+            Additional JSON serializable entries for the header of the
+            index, see :attr:`index_metadata`.
+        """
+        self._ensure_writable()
+        metadata = dict(metadata or ())
+        metadata.update({
+            "data_version": self.data_version,
+            "max_dictionary_edit_distance": self._max_dictionary_edit_distance,
+            "prefix_length": self._prefix_length,
+            "max_length": self._max_length,
+            "bigram_count_min": self.bigram_count_min
+        })
+        write_index(filename, self._words, self.deletes, self._bigrams,
+                    metadata, bloom_error_rate)
+
+    def load_index(self, filename):
+        """Memory-map an index file written by :meth:`save_index`. The
+        file is opened read-only and its pages are shared with every
+        other process that loads it, so this is near-instant and does
+        not copy the index into each process.
+
+        **NOTE**: Replaces any dictionary data already loaded. Adding
+        or deleting entries afterwards first rebuilds the deletes in
+        memory from the mapped words.
+
+        Parameters
+        ----------
+        filename : str
+            The path+filename of the index file.
+
+        Returns
+        -------
+        bool
+            True if the index is successfully loaded, or False if it
+            was written with a different data version,
+            `max_dictionary_edit_distance` or `prefix_length`.
+        """
+        index = CompactIndex(filename)
+        metadata = index.metadata
+        if (metadata["data_version"] != self.data_version
+                or (metadata["max_dictionary_edit_distance"]
+                    != self._max_dictionary_edit_distance)
+                or metadata["prefix_length"] != self._prefix_length):
+            return False
+        self._index = index
+        self._words = index.words
+        self._word_list = index.word_list
+        self._deletes = index.deletes
+        self._bigrams = index.bigrams
+        self._max_length = metadata["max_length"]
+        self.bigram_count_min = metadata["bigram_count_min"]
+        self._version += 1
+        return True
+
     def lookup(self, phrase, verbosity, max_edit_distance=None,
                include_unknown=False, ignore_token=None,
                transfer_casing=False):
@@ -443,6 +679,25 @@ class SymSpell(object):
             max_edit_distance = self._max_dictionary_edit_distance
         if max_edit_distance > self._max_dictionary_edit_distance:
             raise ValueError("Distance too large")
+        if self._lookup_cache is None:
+            return self._lookup(phrase, verbosity, max_edit_distance,
+                                include_unknown, ignore_token,
+                                transfer_casing)
+        key = (phrase, verbosity, max_edit_distance, include_unknown,
+               ignore_token, transfer_casing)
+        version = self._version
+        suggestions = self._lookup_cache.get(key, version)
+        if suggestions is None:
+            suggestions = self._lookup(phrase, verbosity, max_edit_distance,
+                                       include_unknown, ignore_token,
+                                       transfer_casing)
+            self._lookup_cache.put(key, _copy_suggestions(suggestions),
+                                   version)
+            return suggestions
+        return _copy_suggestions(suggestions)
+
+    def _lookup(self, phrase, verbosity, max_edit_distance,
+                include_unknown, ignore_token, transfer_casing):
         suggestions = list()
         phrase_len = len(phrase)
 
@@ -488,6 +743,7 @@ class SymSpell(object):
 
         considered_deletes = set()
         considered_suggestions = set()
+        word_list = self._word_list
         # we considered the phrase already in the
         # 'phrase in self._words' above
         considered_suggestions.add(phrase)
@@ -504,7 +760,28 @@ class SymSpell(object):
         else:
             candidates.append(phrase)
         distance_comparer = EditDistance(self._distance_algorithm)
+        # distances of the suggestions of the current delete level,
+        # verified in one batch if the comparer supports it. Only
+        # Verbosity.ALL keeps the distance limit fixed, the other modes
+        # tighten it with the first matches and skip most of the level.
+        # Deletes of phrases longer than the prefix are few and
+        # specific, their levels rarely fill a batch
+        batch_levels = (distance_comparer.supports_batch
+                        and verbosity == Verbosity.ALL
+                        and phrase_len <= self._prefix_length)
+        level_end = 0
+        level_distances = dict()
         while candidate_pointer < len(candidates):
+            if (candidate_pointer == level_end and batch_levels):
+                # candidates are ordered by delete distance, so all
+                # candidates up to the current end of the list belong
+                # to the same level
+                level_end = len(candidates)
+                level_distances = self._verify_level(
+                    phrase, phrase_len, phrase_prefix_len,
+                    candidates[candidate_pointer : level_end],
+                    considered_suggestions, max_edit_distance,
+                    max_edit_distance_2, distance_comparer)
             candidate = candidates[candidate_pointer]
             candidate_pointer += 1
             candidate_len = len(candidate)
@@ -522,9 +799,12 @@ class SymSpell(object):
                     continue
                 break
 
-            if candidate in self._deletes:
-                dict_suggestions = self._deletes[candidate]
-                for suggestion in dict_suggestions:
+            word_ids = self._deletes.get(candidate)
+            if word_ids is not None:
+                if word_ids.__class__ is int:
+                    word_ids = (word_ids,)
+                for word_id in word_ids:
+                    suggestion = word_list[word_id]
                     if suggestion == phrase:
                         continue
                     suggestion_len = len(suggestion)
@@ -565,7 +845,6 @@ class SymSpell(object):
                     # pairs have edit distance=1, the others edit
                     # distance=2.
                     distance = 0
-                    min_distance = 0
                     if candidate_len == 0:
                         # suggestions which have no common chars with
                         # phrase (phrase_len<=max_edit_distance &&
@@ -588,22 +867,10 @@ class SymSpell(object):
                     # (phraseLen >= prefixLength) &&
                     # (suggestionLen >= prefixLength)
                     else:
-                        # handles the shortcircuit of min_distance
-                        # assignment when first boolean expression
-                        # evaluates to False
-                        if self._prefix_length - max_edit_distance == candidate_len:
-                            min_distance = (min(phrase_len, suggestion_len) -
-                                            self._prefix_length)
-                        else:
-                            min_distance = 0
-                        # pylint: disable=C0301,R0916
-                        if (self._prefix_length - max_edit_distance == candidate_len
-                                and (min_distance > 1
-                                     and phrase[phrase_len + 1 - min_distance :] != suggestion[suggestion_len + 1 - min_distance :])
-                                or (min_distance > 0
-                                    and phrase[phrase_len - min_distance] != suggestion[suggestion_len - min_distance]
-                                    and (phrase[phrase_len - min_distance - 1] != suggestion[suggestion_len - min_distance]
-                                         or phrase[phrase_len - min_distance] != suggestion[suggestion_len - min_distance - 1]))):
+                        if self._suffix_mismatch(phrase, phrase_len,
+                                                 candidate_len, suggestion,
+                                                 suggestion_len,
+                                                 max_edit_distance):
                             continue
                         else:
                             # delete_in_suggestion_prefix is somewhat
@@ -614,8 +881,11 @@ class SymSpell(object):
                                     or suggestion in considered_suggestions):
                                 continue
                             considered_suggestions.add(suggestion)
-                            distance = distance_comparer.compare(
-                                phrase, suggestion, max_edit_distance_2)
+                            if suggestion in level_distances:
+                                distance = level_distances[suggestion]
+                            else:
+                                distance = distance_comparer.compare(
+                                    phrase, suggestion, max_edit_distance_2)
                             if distance < 0:
                                 continue
                     # do not process higher distances than those
@@ -671,7 +941,7 @@ class SymSpell(object):
 
     def lookup_compound(self, phrase, max_edit_distance,
                         ignore_non_words=False,
-                        transfer_casing=False):
+                        transfer_casing=False, executor=None):
         """`lookup_compound` supports compound aware automatic spelling
         correction of multi-word input strings with three cases:
 
@@ -698,6 +968,12 @@ class SymSpell(object):
         transfer_casing : bool, optional
             A flag to determine whether the casing --- i.e., uppercase
             vs lowercase --- should be carried over from `phrase`.
+        executor : :class:`concurrent.futures.Executor`, optional
+            An executor (e.g. a thread pool) to correct the spans of
+            terms between two consecutive dictionary words
+            concurrently. Two consecutive dictionary words are never
+            combined or split, so the spans are independent and the
+            result is the same as without an executor.
 
         Returns
         -------
@@ -705,20 +981,125 @@ class SymSpell(object):
             suggestions_line is a list of :class:`SuggestItem` objects
             representing suggested correct spellings for `phrase`.
         """
+        if self._compound_cache is None:
+            return self._lookup_compound(phrase, max_edit_distance,
+                                         ignore_non_words, transfer_casing,
+                                         self._replaced_words, executor)
+        key = (phrase, max_edit_distance, ignore_non_words, transfer_casing)
+        version = self._version
+        cached = self._compound_cache.get(key, version)
+        if cached is None:
+            replaced_words = dict()
+            suggestions_line = self._lookup_compound(
+                phrase, max_edit_distance, ignore_non_words,
+                transfer_casing, replaced_words, executor)
+            self._compound_cache.put(
+                key, (_copy_suggestions(suggestions_line),
+                      _copy_suggestions(replaced_words.values(),
+                                        replaced_words)), version)
+        else:
+            suggestions_line, replaced_words = cached
+            suggestions_line = _copy_suggestions(suggestions_line)
+            replaced_words = _copy_suggestions(replaced_words.values(),
+                                               replaced_words)
+        # a cached call still records the words it replaced
+        self._replaced_words.update(replaced_words)
+        return suggestions_line
+
+    def _lookup_compound(self, phrase, max_edit_distance, ignore_non_words,
+                         transfer_casing, replaced_words, executor=None):
         # Parse input string into single terms
         term_list_1 = helpers.parse_words(phrase)
         # Second list of single terms with preserved cases so we can
         # ignore acronyms (all cap words)
+        term_list_2 = None
         if ignore_non_words:
             term_list_2 = helpers.parse_words(phrase, True)
+        distance_comparer = EditDistance(self._distance_algorithm)
+
+        if executor is None:
+            suggestion_parts = self._compound_parts(
+                term_list_1, term_list_2, 0, len(term_list_1), None,
+                max_edit_distance, ignore_non_words, replaced_words)
+        else:
+            spans = self._compound_spans(term_list_1, term_list_2,
+                                         ignore_non_words)
+            span_replaced_words = [dict() for __ in spans]
+            suggestion_parts = list()
+            for parts in executor.map(
+                    self._compound_parts, repeat(term_list_1),
+                    repeat(term_list_2), *zip(*spans),
+                    repeat(max_edit_distance), repeat(ignore_non_words),
+                    span_replaced_words):
+                # the first part of a span replaces the dictionary word
+                # the previous span ended with, if it was combined
+                suggestion_parts[-1:] = parts
+            for span_replaced in span_replaced_words:
+                replaced_words.update(span_replaced)
+
+        joined_term = ""
+        joined_count = self.N
+        for si in suggestion_parts:
+            joined_term += si.term + " "
+            joined_count *= si.count / self.N
+        joined_term = joined_term.rstrip()
+        if transfer_casing:
+            joined_term = helpers.transfer_casing_for_similar_text(phrase,
+                                                                   joined_term)
+        suggestion = SuggestItem(joined_term,
+                                 distance_comparer.compare(
+                                     phrase, joined_term, 2 ** 31 - 1),
+                                 int(joined_count))
+        suggestions_line = list()
+        suggestions_line.append(suggestion)
+
+        return suggestions_line
+
+    def _compound_parts(self, term_list_1, term_list_2, start, end,
+                        first_part, max_edit_distance, ignore_non_words,
+                        replaced_words):
+        """Correct the terms `start` to `end` of :meth:`lookup_compound`.
+
+        Parameters
+        ----------
+        term_list_1 : list of str
+            The lowercase terms of the phrase.
+        term_list_2 : list of str
+            The terms with their original casing, or None if
+            `ignore_non_words` is False.
+        start : int
+            The index of the first term to correct.
+        end : int
+            The index after the last term to correct.
+        first_part : :class:`SuggestItem`
+            The correction of the term before `start`, which has to be
+            a dictionary word following another dictionary word, or
+            None if `start` is 0.
+        max_edit_distance : int
+            The maximum edit distance between input and suggested
+            words.
+        ignore_non_words : bool
+            A flag to determine whether numbers and acronyms are left
+            alone during the spell checking process
+        replaced_words : dict
+            Receives the replaced terms and their corrections.
+
+        Returns
+        -------
+        list
+            The corrections of the terms, starting with the correction
+            of the term before `start` if `first_part` is given.
+        """
         suggestions = list()
         suggestion_parts = list()
+        if first_part is not None:
+            suggestion_parts.append(first_part)
         distance_comparer = EditDistance(self._distance_algorithm)
 
         # translate every item to its best suggestion, otherwise it
         # remains unchanged
         is_last_combi = False
-        for i, __ in enumerate(term_list_1):
+        for i in range(start, end):
             if ignore_non_words:
                 if helpers.try_parse_int64(term_list_1[i]) is not None:
                     suggestion_parts.append(SuggestItem(term_list_1[i], 0, 0))
@@ -728,8 +1109,13 @@ class SymSpell(object):
                     continue
             suggestions = self.lookup(term_list_1[i], Verbosity.TOP,
                                       max_edit_distance)
-            # combi check, always before split
-            if i > 0 and not is_last_combi:
+            # combi check, always before split. A combination cannot
+            # win against two exact matches (distance 0), so known
+            # terms following known terms skip the expensive lookup
+            # of the combined term
+            if (i > 0 and not is_last_combi
+                    and not (suggestions and suggestions[0].distance == 0
+                             and suggestion_parts[-1].distance == 0)):
                 suggestions_combi = self.lookup(
                     term_list_1[i - 1] + term_list_1[i], Verbosity.TOP,
                     max_edit_distance)
@@ -845,37 +1231,100 @@ class SymSpell(object):
                     if suggestion_split_best is not None:
                         # select best suggestion for split pair
                         suggestion_parts.append(suggestion_split_best)
-                        self._replaced_words[term_list_1[i]] = suggestion_split_best
+                        replaced_words[term_list_1[i]] = suggestion_split_best
                     else:
                         si = SuggestItem(term_list_1[i],
                                          max_edit_distance + 1,
                                          int(10 / 10 ** len(term_list_1[i])))
                         suggestion_parts.append(si)
-                        self._replaced_words[term_list_1[i]] = si
+                        replaced_words[term_list_1[i]] = si
                 else:
                     # estimated word occurrence probability
                     # P=10 / (N * 10^word length l)
                     si = SuggestItem(term_list_1[i], max_edit_distance + 1,
                                      int(10 / 10 ** len(term_list_1[i])))
                     suggestion_parts.append(si)
-                    self._replaced_words[term_list_1[i]] = si
-        joined_term = ""
-        joined_count = self.N
-        for si in suggestion_parts:
-            joined_term += si.term + " "
-            joined_count *= si.count / self.N
-        joined_term = joined_term.rstrip()
-        if transfer_casing:
-            joined_term = helpers.transfer_casing_for_similar_text(phrase,
-                                                                   joined_term)
-        suggestion = SuggestItem(joined_term,
-                                 distance_comparer.compare(
-                                     phrase, joined_term, 2 ** 31 - 1),
-                                 int(joined_count))
-        suggestions_line = list()
-        suggestions_line.append(suggestion)
+                    replaced_words[term_list_1[i]] = si
+        return suggestion_parts
 
-        return suggestions_line
+    def _compound_spans(self, term_list_1, term_list_2, ignore_non_words):
+        """Split the terms of :meth:`lookup_compound` into spans that
+        can be corrected independently.
+
+        A dictionary word following another dictionary word (or a
+        number or acronym left alone) is always kept as it is: the
+        combination with the previous term cannot win against two
+        exact matches, and exact matches are never split. Its
+        correction is therefore known in advance and the next span can
+        start from it. Spans are only cut after terms that need a
+        correction, so runs of correct terms are not split up further.
+
+        Returns
+        -------
+        list
+            (start, end, first_part) of each span, the arguments of
+            :meth:`_compound_parts`.
+        """
+        def is_non_word(i):
+            return ignore_non_words and (
+                helpers.try_parse_int64(term_list_1[i]) is not None
+                or helpers.is_acronym(term_list_2[i]))
+
+        spans = list()
+        start = 0
+        first_part = None
+        needs_correction = False
+        for i, term in enumerate(term_list_1):
+            known = term in self._words and not is_non_word(i)
+            if (needs_correction and known and i > start
+                    and i + 1 < len(term_list_1)
+                    and (term_list_1[i - 1] in self._words
+                         or is_non_word(i - 1))):
+                spans.append((start, i + 1, first_part))
+                start = i + 1
+                first_part = SuggestItem(term, 0, self._words[term])
+                needs_correction = False
+            elif not known and not is_non_word(i):
+                needs_correction = True
+        spans.append((start, len(term_list_1), first_part))
+        return spans
+
+    def correct_stream(self, lines, max_edit_distance=None,
+                       ignore_non_words=False, transfer_casing=False):
+        """Correct a stream of lines with :meth:`lookup_compound`.
+
+        Lines are read from `lines` one at a time as the corrections
+        are consumed, so a file object of any size can be passed
+        without reading it into memory.
+
+        Parameters
+        ----------
+        lines : iterable of str
+            The lines to correct, e.g. a file object.
+        max_edit_distance : int, optional
+            The maximum edit distance between input and suggested
+            words. Set to :attr:`_max_dictionary_edit_distance` by
+            default
+        ignore_non_words : bool, optional
+            A flag to determine whether numbers and acronyms are left
+            alone during the spell checking process
+        transfer_casing : bool, optional
+            A flag to determine whether the casing --- i.e., uppercase
+            vs lowercase --- should be carried over from the input.
+
+        Yields
+        ------
+        str
+            The corrected text of each line, without the line ending.
+        """
+        if max_edit_distance is None:
+            max_edit_distance = self._max_dictionary_edit_distance
+        for line in lines:
+            suggestions = self.lookup_compound(line.rstrip("\r\n"),
+                                               max_edit_distance,
+                                               ignore_non_words,
+                                               transfer_casing)
+            yield suggestions[0].term
 
     def word_segmentation(self, phrase, max_edit_distance=None,
                           max_segmentation_word_length=None,
@@ -922,89 +1371,324 @@ class SymSpell(object):
             max_edit_distance = self._max_dictionary_edit_distance
         if max_segmentation_word_length is None:
             max_segmentation_word_length = self._max_length
-        array_size = min(max_segmentation_word_length, len(phrase))
-        compositions = [Composition()] * array_size
-        circular_index = cycle(range(array_size))
-        idx = -1
+        if self._segmentation_cache is None:
+            return self._word_segmentation(phrase, max_edit_distance,
+                                           max_segmentation_word_length,
+                                           ignore_token)
+        key = (phrase, max_edit_distance, max_segmentation_word_length,
+               ignore_token)
+        version = self._version
+        # compositions are immutable and can be shared
+        composition = self._segmentation_cache.get(key, version)
+        if composition is None:
+            composition = self._word_segmentation(
+                phrase, max_edit_distance, max_segmentation_word_length,
+                ignore_token)
+            self._segmentation_cache.put(key, composition, version)
+        return composition
+
+    def _word_segmentation(self, phrase, max_edit_distance,
+                           max_segmentation_word_length, ignore_token):
+        segmented_parts = list()
+        corrected_parts = list()
+        segment = None
+        for segment in self._segments((phrase,), max_edit_distance,
+                                      max_segmentation_word_length,
+                                      ignore_token, None):
+            segmented_parts.append(segment.part)
+            corrected_parts.append(segment.result)
+        if segment is None:
+            return Composition("", "", 0, 0.0)
+        return Composition(" ".join(segmented_parts),
+                           " ".join(corrected_parts), segment.distance_sum,
+                           segment.log_prob_sum)
+
+    def word_segmentation_stream(self, text, max_edit_distance=None,
+                                 max_segmentation_word_length=None,
+                                 ignore_token=None, window=1024):
+        """Divide a long string, or a stream of strings, into words like
+        :meth:`word_segmentation`, yielding each word as soon as it is
+        final.
+
+        The optimum composition of every prefix only keeps a pointer to
+        the composition it extends, instead of the concatenated
+        strings. Once the compositions of all prefixes that can still
+        be extended share their first words, those words cannot change
+        any more and are yielded. If no words become final within
+        `window` characters, the best composition so far is committed,
+        so memory use stays bounded on any input; the result is then no
+        longer guaranteed to equal that of :meth:`word_segmentation`.
+
+        Parameters
+        ----------
+        text : str or iterable of str
+            The string being spell checked, or consecutive pieces of
+            it, e.g. blocks read from a file.
+        max_edit_distance : int, optional
+            The maximum edit distance between input and corrected words
+            (0=no correction/segmentation only).
+        max_segmentation_word_length : int, optional
+            The maximum word length that should be considered.
+        ignore_token : regex pattern, optional
+            A regex pattern describing what words/phrases to ignore and
+            leave unchanged
+        window : int, optional
+            The maximum number of characters that are not final before
+            the best composition so far is committed, or None to never
+            commit early. Inputs shorter than `window` are segmented
+            exactly like :meth:`word_segmentation`.
+
+        Yields
+        ------
+        :class:`Composition`
+            A single word: the segmented part of the input, the spelling
+            corrected word, its edit distance (including an inserted
+            space), and its occurrence probability in log scale.
+        """
+        if max_edit_distance is None:
+            max_edit_distance = self._max_dictionary_edit_distance
+        if max_segmentation_word_length is None:
+            max_segmentation_word_length = self._max_length
+        if isinstance(text, str):
+            text = (text,)
+        for segment in self._segments(text, max_edit_distance,
+                                      max_segmentation_word_length,
+                                      ignore_token, window):
+            yield Composition(segment.part, segment.result,
+                              segment.distance, segment.log_prob)
+
+    def _segments(self, chunks, max_edit_distance,
+                  max_segmentation_word_length, ignore_token, window):
+        """Find the optimum composition of the text of `chunks` and
+        yield its :class:`_Segment` objects in order, as soon as they
+        are final.
+
+        `best` holds the optimum composition of each prefix that can
+        still be extended, keyed by the end position of the prefix, as
+        its last segment. Column `j` extends the composition ending at
+        `j` by every part starting at `j`, with the replacement rules
+        of the original circular array implementation.
+        """
+        chunks = iter(chunks)
+        exhausted = False
+        # unprocessed input, starting at absolute position offset
+        text = ""
+        offset = 0
+        best = dict()
+        # last segment that was yielded
+        root = None
+        j = 0
+        while True:
+            # a column needs the text of its longest part
+            while (not exhausted
+                   and offset + len(text) < j + max_segmentation_word_length):
+                chunk = next(chunks, None)
+                if chunk is None:
+                    exhausted = True
+                else:
+                    text += chunk
+            text_end = offset + len(text)
+            if j >= text_end:
+                break
+            source = best.pop(j, None)
 
-        # outer loop (column): all possible part start positions
-        for j in range(len(phrase)):
             # inner loop (row): all possible part lengths (from start
             # position): part can't be bigger than longest word in
             # dictionary (other than long unknown word)
-            imax = min(len(phrase) - j, max_segmentation_word_length)
+            imax = min(text_end - j, max_segmentation_word_length)
             for i in range(1, imax + 1):
-                # get top spelling correction/ed for part
-                part = phrase[j : j + i]
-                separator_len = 0
-                top_ed = 0
-                top_log_prob = 0.0
-                top_result = ""
-
-                if part[0].isspace():
-                    # remove space for levensthein calculation
-                    part = part[1 :]
-                else:
-                    # add ed+1: space did not exist, had to be inserted
-                    separator_len = 1
-
-                # remove space from part1, add number of removed spaces
-                # to top_ed
-                top_ed += len(part)
-                # remove space.
-                # add number of removed spaces to ed
-                part = part.replace(" ", "")
-                top_ed -= len(part)
-
-                results = self.lookup(part, Verbosity.TOP, max_edit_distance,
-                                      ignore_token=ignore_token)
-                if results:
-                    top_result = results[0].term
-                    top_ed += results[0].distance
-                    # Naive Bayes Rule. We assume the word
-                    # probabilities of two words to be independent.
-                    # Therefore the resulting probability of the word
-                    # combination is the product of the two word
-                    # probabilities. Instead of computing the product
-                    # of probabilities we are computing the sum of the
-                    # logarithm of probabilities because the
-                    # probabilities of words are about 10^-10, the
-                    # product of many such small numbers could exceed
-                    # (underflow) the floating number range and become
-                    # zero. log(ab)=log(a)+log(b)
-                    top_log_prob = math.log10(float(results[0].count) /
-                                              float(self.N))
-                else:
-                    top_result = part
-                    # default, if word not found. otherwise long input
-                    # text would win as long unknown word (with
-                    # ed=edmax+1), although there there should many
-                    # spaces inserted
-                    top_ed += len(part)
-                    top_log_prob = math.log10(10.0 / self.N /
-                                              math.pow(10.0, len(part)))
-
-                dest = (i + idx) % array_size
+                (part, top_result, top_ed, separator_len,
+                 top_log_prob) = self._segment_part(
+                     text[j - offset : j - offset + i], max_edit_distance,
+                     ignore_token)
+                dest = j + i
+                current = best.get(dest)
                 # set values in first loop
-                if j == 0:
-                    compositions[dest] = Composition(part, top_result,
-                                                     top_ed, top_log_prob)
+                if source is None:
+                    best[dest] = _Segment(dest, None, part, top_result,
+                                          top_ed, top_log_prob, top_ed,
+                                          top_log_prob)
                 # pylint: disable=C0301,R0916
-                elif (i == max_segmentation_word_length
+                elif (current is None
                       # replace values if better log_prob_sum, if same
                       # edit distance OR one space difference
-                      or ((compositions[idx].distance_sum + top_ed == compositions[dest].distance_sum
-                           or compositions[idx].distance_sum + separator_len + top_ed == compositions[dest].distance_sum)
-                          and compositions[dest].log_prob_sum < compositions[idx].log_prob_sum + top_log_prob)
+                      or ((source.distance_sum + top_ed == current.distance_sum
+                           or source.distance_sum + separator_len + top_ed == current.distance_sum)
+                          and current.log_prob_sum < source.log_prob_sum + top_log_prob)
                       # replace values if smaller edit distance
-                      or compositions[idx].distance_sum + separator_len + top_ed < compositions[dest].distance_sum):
-                    compositions[dest] = Composition(
-                        compositions[idx].segmented_string + " " + part,
-                        compositions[idx].corrected_string + " " + top_result,
-                        compositions[idx].distance_sum + separator_len + top_ed,
-                        compositions[idx].log_prob_sum + top_log_prob)
-            idx = next(circular_index)
-        return compositions[idx]
+                      or source.distance_sum + separator_len + top_ed < current.distance_sum):
+                    best[dest] = _Segment(
+                        dest, source, part, top_result,
+                        separator_len + top_ed, top_log_prob,
+                        source.distance_sum + separator_len + top_ed,
+                        source.log_prob_sum + top_log_prob)
+            j += 1
+            if j - offset > 4096:
+                text = text[j - offset :]
+                offset = j
+
+            # segments shared by all compositions that can still be
+            # extended are final
+            chains = [_Segment.chain(segment, root)
+                      for segment in best.values()]
+            final = chains[0]
+            for chain in chains[1 :]:
+                k = 0
+                while (k < len(final) and k < len(chain)
+                       and final[k] is chain[k]):
+                    k += 1
+                final = final[: k]
+            if (window is not None and j < text_end
+                    and j - (0 if root is None else root.end) > window):
+                # no convergence within the window, commit the best
+                # composition of the text so far and restart from it
+                final = _Segment.chain(best[j], root)
+                best = {j: best[j]}
+            for segment in final:
+                yield segment
+            if final:
+                root = final[-1]
+                # drop the references to the yielded segments
+                root.prev = None
+        if j > 0:
+            for segment in _Segment.chain(best[j], root):
+                yield segment
+
+    def _segment_part(self, part, max_edit_distance, ignore_token):
+        """Get the top spelling correction of a part of the input of
+        :meth:`word_segmentation`, and its edit distance and
+        occurrence probability.
+        """
+        separator_len = 0
+        top_ed = 0
+        top_log_prob = 0.0
+        top_result = ""
+
+        if part[0].isspace():
+            # remove space for levensthein calculation
+            part = part[1 :]
+        else:
+            # add ed+1: space did not exist, had to be inserted
+            separator_len = 1
+
+        # remove space from part1, add number of removed spaces
+        # to top_ed
+        top_ed += len(part)
+        # remove space.
+        # add number of removed spaces to ed
+        part = part.replace(" ", "")
+        top_ed -= len(part)
+
+        results = self.lookup(part, Verbosity.TOP, max_edit_distance,
+                              ignore_token=ignore_token)
+        if results:
+            top_result = results[0].term
+            top_ed += results[0].distance
+            # Naive Bayes Rule. We assume the word
+            # probabilities of two words to be independent.
+            # Therefore the resulting probability of the word
+            # combination is the product of the two word
+            # probabilities. Instead of computing the product
+            # of probabilities we are computing the sum of the
+            # logarithm of probabilities because the
+            # probabilities of words are about 10^-10, the
+            # product of many such small numbers could exceed
+            # (underflow) the floating number range and become
+            # zero. log(ab)=log(a)+log(b)
+            top_log_prob = math.log10(float(results[0].count) /
+                                      float(self.N))
+        else:
+            top_result = part
+            # default, if word not found. otherwise long input
+            # text would win as long unknown word (with
+            # ed=edmax+1), although there there should many
+            # spaces inserted
+            top_ed += len(part)
+            top_log_prob = math.log10(10.0 / self.N /
+                                      math.pow(10.0, len(part)))
+        return part, top_result, top_ed, separator_len, top_log_prob
+
+    def _ensure_writable(self):
+        """Replace the read-only tables of a loaded index with in-memory
+        dicts, regenerating the deletes from the words since the index
+        only stores their hashes.
+        """
+        if self._index is None:
+            return
+        # build the new tables before replacing any, so lookups on
+        # other threads never see words without their deletes
+        words = dict(self._words.items())
+        bigrams = dict(self._bigrams.items())
+        word_list = list(words)
+        deletes = dict()
+        for word_id, key in enumerate(word_list):
+            _add_word_id(deletes, self._edits_prefix(key), word_id)
+        (self._words, self._bigrams, self._word_list, self._deletes,
+         self._index) = words, bigrams, word_list, deletes, None
+
+    def _verify_level(self, phrase, phrase_len, phrase_prefix_len,
+                      level_candidates, considered_suggestions,
+                      max_edit_distance, max_edit_distance_2,
+                      distance_comparer):
+        """Compute the edit distances of the suggestions of one delete
+        level of a :attr:`Verbosity.ALL` :meth:`lookup` with a single
+        batch comparison. The suggestions are selected with the same
+        checks as :meth:`lookup`, so they cover every suggestion of the
+        level that reaches the distance computation. Levels too small for the batch to pay
+        off are left to :meth:`lookup` to compare one by one.
+        """
+        candidate_len = len(level_candidates[0])
+        if (candidate_len == 0
+                or phrase_prefix_len - candidate_len > max_edit_distance_2):
+            return dict()
+        batch = list()
+        batch_set = set()
+        word_list = self._word_list
+        for candidate in level_candidates:
+            for word_id in _word_ids(self._deletes.get(candidate, ())):
+                suggestion = word_list[word_id]
+                suggestion_len = len(suggestion)
+                if (suggestion_len == 1
+                        or abs(suggestion_len - phrase_len) > max_edit_distance_2
+                        or suggestion_len < candidate_len
+                        or (suggestion_len == candidate_len
+                            and suggestion != candidate)
+                        or suggestion in considered_suggestions
+                        or suggestion in batch_set):
+                    continue
+                suggestion_prefix_len = min(suggestion_len,
+                                            self._prefix_length)
+                if ((suggestion_prefix_len > phrase_prefix_len
+                     and suggestion_prefix_len - candidate_len > max_edit_distance_2)
+                        or self._suffix_mismatch(phrase, phrase_len,
+                                                 candidate_len, suggestion,
+                                                 suggestion_len,
+                                                 max_edit_distance)):
+                    continue
+                batch_set.add(suggestion)
+                batch.append(suggestion)
+        if len(batch) < distance_comparer.min_batch_size:
+            return dict()
+        return dict(zip(batch, distance_comparer.compare_batch(
+            phrase, batch, max_edit_distance_2)))
+
+    def _suffix_mismatch(self, phrase, phrase_len, candidate_len,
+                         suggestion, suggestion_len, max_edit_distance):
+        """Check whether the number of edits in the prefix equals
+        `max_edit_distance` and the suffixes differ, in which case the
+        edit distance exceeds `max_edit_distance` and does not need to
+        be computed.
+        """
+        if self._prefix_length - max_edit_distance != candidate_len:
+            return False
+        min_distance = min(phrase_len, suggestion_len) - self._prefix_length
+        # pylint: disable=C0301,R0916
+        return ((min_distance > 1
+                 and phrase[phrase_len + 1 - min_distance :] != suggestion[suggestion_len + 1 - min_distance :])
+                or (min_distance > 0
+                    and phrase[phrase_len - min_distance] != suggestion[suggestion_len - min_distance]
+                    and (phrase[phrase_len - min_distance - 1] != suggestion[suggestion_len - min_distance]
+                         or phrase[phrase_len - min_distance] != suggestion[suggestion_len - min_distance - 1])))
 
     def _delete_in_suggestion_prefix(self, delete, delete_len, suggestion,
                                      suggestion_len):
@@ -1069,6 +1753,57 @@ class SymSpell(object):
         hash_set.add(key)
         return self._edits(key, 0, hash_set)
 
+    def cache_info(self):
+        """Report the statistics of the result caches.
+
+        Returns
+        -------
+        dict
+            :class:`.cache.CacheInfo` of the :meth:`lookup`,
+            :meth:`lookup_compound` and :meth:`word_segmentation`
+            caches, keyed by method name. Empty if caching is disabled.
+        """
+        if self._lookup_cache is None:
+            return dict()
+        return {"lookup": self._lookup_cache.info(),
+                "lookup_compound": self._compound_cache.info(),
+                "word_segmentation": self._segmentation_cache.info()}
+
+    def clear_cache(self):
+        """Drop all cached results and reset the cache statistics."""
+        for cache in (self._lookup_cache, self._compound_cache,
+                      self._segmentation_cache):
+            if cache is not None:
+                cache.clear()
+
+    def memory_usage(self, sample_size=1000):
+        """Estimate the memory held by the dictionary data.
+
+        The size of the in-memory dicts is extrapolated from the sizes
+        of the keys and values of a sample of their entries. Tables of
+        an index loaded with :meth:`load_index` count with the size of
+        the mapped file, whose pages are shared with other processes
+        that map the same file.
+
+        Parameters
+        ----------
+        sample_size : int, optional
+            The number of entries of each dict to measure.
+
+        Returns
+        -------
+        int
+            The approximate size in bytes.
+        """
+        size = 0 if self._index is None else self._index.size
+        for table in (self._words, self._below_threshold_words,
+                      self._bigrams, self._deletes):
+            if isinstance(table, dict):
+                size += _dict_size(table, sample_size)
+        if isinstance(self._word_list, list):
+            size += sys.getsizeof(self._word_list)
+        return size
+
     @property
     def below_threshold_words(self):
         return self._below_threshold_words
@@ -1079,7 +1814,20 @@ class SymSpell(object):
 
     @property
     def deletes(self):
-        return self._deletes
+        """Read-only mapping of delete strings to the list of words
+        they were derived from."""
+        return _DeleteView(self._deletes, self._word_list)
+
+    @property
+    def index_metadata(self):
+        """dict: The header metadata of the index loaded with
+        :meth:`load_index`, or None if the dictionary is not backed by
+        an index."""
+        return None if self._index is None else self._index.metadata
+
+    @property
+    def max_dictionary_edit_distance(self):
+        return self._max_dictionary_edit_distance
 
     @property
     def replaced_words(self):
@@ -1180,6 +1928,151 @@ class SuggestItem(object):
     def count(self, count):
         self._count = count
 
+def _corpus_shards(corpora, shard_size, encoding):
+    """Split files into (path, start, end, encoding) byte ranges of
+    about `shard_size` bytes. :func:`_count_shard` moves the ranges to
+    line boundaries.
+    """
+    shards = list()
+    for corpus in corpora:
+        size = os.path.getsize(corpus)
+        for start in range(0, max(size, 1), shard_size):
+            shards.append((corpus, start, min(start + shard_size, size),
+                           encoding))
+    return shards
+
+def _count_shard(shard):
+    """Count the words of the lines starting in the byte range of a
+    shard. A line belongs to the shard its first byte falls in, so
+    every line is counted exactly once.
+    """
+    corpus, start, end, encoding = shard
+    with open(corpus, "rb") as infile:
+        start = _line_start(infile, start)
+        end = _line_start(infile, end)
+        infile.seek(start)
+        text = infile.read(end - start).decode(encoding)
+    return Counter(SymSpell()._parse_words(text))
+
+def _line_start(infile, position):
+    """Return the position of the first line starting at or after
+    `position`.
+    """
+    if position == 0:
+        return 0
+    infile.seek(position - 1)
+    infile.readline()
+    return infile.tell()
+
+def _chunk_deletes(chunk):
+    """Create the deletes of a chunk of words, as a dict of deletes to
+    the ids of the words they were created from, in the order of the
+    chunk. The words are numbered from the first id of the chunk.
+    """
+    keys, first_id, max_dictionary_edit_distance, prefix_length = chunk
+    sym_spell = SymSpell(max_dictionary_edit_distance, prefix_length)
+    deletes = dict()
+    for word_id, key in enumerate(keys, first_id):
+        _add_word_id(deletes, sym_spell._edits_prefix(key), word_id)
+    return deletes
+
+def _add_word_id(deletes, edits, word_id):
+    """Add `word_id` to the suggestions of each delete in `edits`."""
+    for delete in edits:
+        word_ids = deletes.get(delete)
+        if word_ids is None:
+            deletes[delete] = word_id
+        elif word_ids.__class__ is int:
+            deletes[delete] = array("I", (word_ids, word_id))
+        else:
+            word_ids.append(word_id)
+
+def _word_ids(word_ids):
+    """Return the ids of a :attr:`SymSpell._deletes` value as a
+    sequence."""
+    return (word_ids,) if word_ids.__class__ is int else word_ids
+
+class _DeleteView(Mapping):
+    """Read-only view of :attr:`SymSpell._deletes` with the word ids
+    resolved to the words."""
+    def __init__(self, deletes, word_list):
+        self._deletes = deletes
+        self._word_list = word_list
+
+    def __getitem__(self, key):
+        return [self._word_list[word_id]
+                for word_id in _word_ids(self._deletes[key])]
+
+    def __contains__(self, key):
+        return key in self._deletes
+
+    def __iter__(self):
+        return iter(self._deletes)
+
+    def __len__(self):
+        return len(self._deletes)
+
+def _dict_size(table, sample_size):
+    """Estimate the size of a dict and its keys and values from a
+    sample of entries spread over it, the first entries are those of
+    the most frequent words. Values shared by several entries, like
+    the id of a word in the deletes derived from it, count once."""
+    size = sys.getsizeof(table)
+    if not table:
+        return size
+    sample = 0
+    num_items = 0
+    seen = set()
+    step = max(len(table) // sample_size, 1)
+    for key, value in islice(table.items(), 0, None, step):
+        sample += sys.getsizeof(key)
+        if id(value) not in seen:
+            seen.add(id(value))
+            sample += sys.getsizeof(value)
+        num_items += 1
+    return size + sample * len(table) // num_items
+
+def _copy_suggestions(suggestions, keys=None):
+    """Copy :class:`SuggestItem` objects, so cached results cannot be
+    modified through the objects handed out to callers. If `keys` is
+    given, the copies are returned in a dict under those keys.
+    """
+    copies = [SuggestItem(suggestion.term, suggestion.distance,
+                          suggestion.count) for suggestion in suggestions]
+    if keys is None:
+        return copies
+    return dict(zip(keys, copies))
+
+class _Segment(object):
+    """Last word of a composition found by :meth:`SymSpell._segments`,
+    linked to the composition it extends.
+    """
+    __slots__ = ("end", "prev", "part", "result", "distance", "log_prob",
+                 "distance_sum", "log_prob_sum")
+
+    def __init__(self, end, prev, part, result, distance, log_prob,
+                 distance_sum, log_prob_sum):
+        self.end = end
+        self.prev = prev
+        self.part = part
+        self.result = result
+        self.distance = distance
+        self.log_prob = log_prob
+        self.distance_sum = distance_sum
+        self.log_prob_sum = log_prob_sum
+
+    @staticmethod
+    def chain(segment, root):
+        """Return the segments from after `root` up to `segment`, in
+        order.
+        """
+        segments = list()
+        while segment is not None and segment is not root:
+            segments.append(segment)
+            segment = segment.prev
+        segments.reverse()
+        return segments
+
 Composition = namedtuple("Composition",
                          ["segmented_string", "corrected_string",
                           "distance_sum", "log_prob_sum"])
@@ -0,0 +1,50 @@
+import unittest
+
+import pytest
+
+from symspellpy.cache import CacheInfo, LRUCache
+
+class TestLRUCache(unittest.TestCase):
+    def test_invalid_maxsize(self):
+        with pytest.raises(ValueError) as excinfo:
+            __ = LRUCache(0)
+        self.assertEqual("maxsize cannot be less than 1", str(excinfo.value))
+
+    def test_hits_and_misses(self):
+        cache = LRUCache(2)
+        self.assertIsNone(cache.get("a", 0))
+        cache.put("a", 1, 0)
+        self.assertEqual(1, cache.get("a", 0))
+        self.assertEqual(CacheInfo(1, 1, 0, 2, 1), cache.info())
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1, 0)
+        cache.put("b", 2, 0)
+        # "a" becomes the most recently used entry
+        cache.get("a", 0)
+        cache.put("c", 3, 0)
+        self.assertIsNone(cache.get("b", 0))
+        self.assertEqual(1, cache.get("a", 0))
+        self.assertEqual(3, cache.get("c", 0))
+        self.assertEqual(1, cache.info().evictions)
+        self.assertEqual(2, cache.info().currsize)
+
+    def test_version_invalidation(self):
+        cache = LRUCache(2)
+        cache.put("a", 1, 0)
+        self.assertIsNone(cache.get("a", 1))
+        self.assertEqual(0, cache.info().currsize)
+        # results computed before the version changed are not stored
+        cache.put("a", 1, 0)
+        self.assertIsNone(cache.get("a", 1))
+        cache.put("a", 2, 1)
+        self.assertEqual(2, cache.get("a", 1))
+
+    def test_clear(self):
+        cache = LRUCache(2)
+        cache.put("a", 1, 0)
+        cache.get("a", 0)
+        cache.clear()
+        self.assertIsNone(cache.get("a", 0))
+        self.assertEqual(CacheInfo(0, 1, 0, 2, 0), cache.info())
@@ -0,0 +1,249 @@
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import pytest
+
+from symspellpy import SymSpellEngine, Verbosity
+
+class TestSymSpellEngine(unittest.TestCase):
+    fortests_path = os.path.join(os.path.dirname(__file__), "fortests")
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.dictionary_path = os.path.join(self.temp_dir, "dict.txt")
+        with open(self.dictionary_path, "w") as outfile:
+            outfile.write("steama 4\nsteamb 6\nsteamc 2\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_load_once(self):
+        engine = SymSpellEngine(self.dictionary_path)
+        self.assertFalse(engine.is_loaded)
+        sym_spell = engine.load()
+        self.assertTrue(engine.is_loaded)
+        self.assertIs(sym_spell, engine.load())
+        self.assertIs(sym_spell, engine.sym_spell)
+        # repeated use must not inflate the counts like reloading the
+        # dictionary on every call did
+        for __ in range(3):
+            result = engine.sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamb", result[0].term)
+        self.assertEqual(6, result[0].count)
+
+    def test_unload(self):
+        engine = SymSpellEngine(self.dictionary_path)
+        self.assertFalse(engine.unload())
+        sym_spell = engine.load()
+        self.assertTrue(engine.unload())
+        self.assertFalse(engine.is_loaded)
+        self.assertIsNot(sym_spell, engine.load())
+
+    def test_reload_unchanged(self):
+        engine = SymSpellEngine(self.dictionary_path)
+        sym_spell = engine.load()
+        self.assertFalse(engine.is_stale())
+        self.assertFalse(engine.reload())
+        self.assertIs(sym_spell, engine.sym_spell)
+
+        self.assertTrue(engine.reload(force=True))
+        self.assertIsNot(sym_spell, engine.sym_spell)
+        self.assertEqual(6, engine.sym_spell.words["steamb"])
+
+    def test_reload_changed(self):
+        engine = SymSpellEngine(self.dictionary_path)
+        sym_spell = engine.load()
+        with open(self.dictionary_path, "a") as outfile:
+            outfile.write("steamd 20\n")
+        self.assertTrue(engine.is_stale())
+        self.assertTrue(engine.reload())
+        self.assertIsNot(sym_spell, engine.sym_spell)
+        # the previous index is left untouched for in-flight lookups
+        self.assertNotIn("steamd", sym_spell.words)
+        result = engine.sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamd", result[0].term)
+
+    def test_bigram_dictionary(self):
+        bigram_path = os.path.join(self.fortests_path, "bad_dict.txt")
+        engine = SymSpellEngine(self.dictionary_path, bigram_path)
+        self.assertEqual(12, engine.sym_spell.bigrams["rtyu tyui"])
+
+    def test_invalid_dictionary_path(self):
+        engine = SymSpellEngine("invalid/dictionary/path.txt")
+        with pytest.raises(ValueError) as excinfo:
+            engine.load()
+        self.assertEqual("Dictionary file not found: "
+                         "invalid/dictionary/path.txt", str(excinfo.value))
+        self.assertFalse(engine.is_loaded)
+
+    def test_index_path(self):
+        index_path = os.path.join(self.temp_dir, "index", "dict.idx")
+        engine = SymSpellEngine(self.dictionary_path, index_path=index_path)
+        engine.load()
+        self.assertTrue(os.path.exists(index_path))
+
+        # a second process maps the index instead of building it
+        engine_2 = SymSpellEngine(self.dictionary_path, index_path=index_path)
+        self.assertIsNotNone(engine_2.sym_spell._index)
+        result = engine_2.sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamb", result[0].term)
+
+        # a newer dictionary invalidates the index
+        with open(self.dictionary_path, "a") as outfile:
+            outfile.write("steamd 20\n")
+        os.utime(self.dictionary_path,
+                 ns=(os.stat(index_path).st_mtime_ns + 10 ** 9,) * 2)
+        self.assertTrue(engine_2.reload())
+        self.assertIsNone(engine_2.sym_spell._index)
+        result = engine_2.sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamd", result[0].term)
+
+    def test_journal_requires_index_path(self):
+        journal_path = os.path.join(self.temp_dir, "dict.journal")
+        with pytest.raises(ValueError) as excinfo:
+            __ = SymSpellEngine(self.dictionary_path,
+                                journal_path=journal_path)
+        self.assertEqual("journal_path requires an index_path",
+                         str(excinfo.value))
+
+    def test_engine_without_journal(self):
+        engine = SymSpellEngine(self.dictionary_path)
+        self.assertTrue(engine.create_dictionary_entry("steamd", 20))
+        self.assertEqual(20, engine.sym_spell.words["steamd"])
+        with pytest.raises(ValueError) as excinfo:
+            engine.compact()
+        self.assertEqual("Engine has no journal to compact",
+                         str(excinfo.value))
+
+    def test_journal_replay(self):
+        index_path = os.path.join(self.temp_dir, "dict.idx")
+        journal_path = os.path.join(self.temp_dir, "dict.journal")
+        engine = SymSpellEngine(self.dictionary_path, index_path=index_path,
+                                journal_path=journal_path,
+                                compact_every=None)
+        self.assertTrue(engine.create_dictionary_entry("steamd", 20))
+        self.assertTrue(engine.delete_dictionary_entry("steama"))
+        self.assertFalse(engine.create_dictionary_entry("steamb", 1))
+        result = engine.sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamd", result[0].term)
+
+        # a restart maps the snapshot and replays the journal
+        engine_2 = SymSpellEngine(self.dictionary_path,
+                                  index_path=index_path,
+                                  journal_path=journal_path)
+        self.assertEqual(0, engine_2._snapshot_seq)
+        self.assertEqual(20, engine_2.sym_spell.words["steamd"])
+        self.assertEqual(7, engine_2.sym_spell.words["steamb"])
+        self.assertNotIn("steama", engine_2.sym_spell.words)
+
+        # so does a rebuild from a changed dictionary
+        with open(self.dictionary_path, "a") as outfile:
+            outfile.write("steame 1\n")
+        os.utime(self.dictionary_path,
+                 ns=(os.stat(index_path).st_mtime_ns + 10 ** 9,) * 2)
+        self.assertTrue(engine_2.reload())
+        self.assertEqual(20, engine_2.sym_spell.words["steamd"])
+        self.assertEqual(7, engine_2.sym_spell.words["steamb"])
+        self.assertNotIn("steama", engine_2.sym_spell.words)
+        self.assertIn("steame", engine_2.sym_spell.words)
+
+    def test_journal_compaction(self):
+        index_path = os.path.join(self.temp_dir, "dict.idx")
+        journal_path = os.path.join(self.temp_dir, "dict.journal")
+        engine = SymSpellEngine(self.dictionary_path, index_path=index_path,
+                                journal_path=journal_path, compact_every=4)
+        for __ in range(3):
+            engine.create_dictionary_entry("steamd", 10)
+        engine.delete_dictionary_entry("steama")
+        # the fourth update started a compaction
+        engine.compact(wait=True)
+        with open(journal_path, "r") as infile:
+            self.assertEqual(["3\t+\tsteamd\t30\n", "4\t-\tsteama\n"],
+                             infile.readlines())
+        engine.create_dictionary_entry("steamc", 1)
+
+        engine_2 = SymSpellEngine(self.dictionary_path,
+                                  index_path=index_path,
+                                  journal_path=journal_path)
+        sym_spell = engine_2.sym_spell
+        self.assertEqual(4, engine_2._snapshot_seq)
+        self.assertEqual(30, sym_spell.words["steamd"])
+        self.assertEqual(3, sym_spell.words["steamc"])
+        self.assertNotIn("steama", sym_spell.words)
+
+        # without updates since the snapshot, the index stays mapped
+        engine.compact(wait=True)
+        engine_3 = SymSpellEngine(self.dictionary_path,
+                                  index_path=index_path,
+                                  journal_path=journal_path)
+        self.assertEqual(5, engine_3.sym_spell.index_metadata["journal_seq"])
+        self.assertEqual(3, engine_3.sym_spell.words["steamc"])
+
+    def test_index_records_dictionary_files(self):
+        index_path = os.path.join(self.temp_dir, "dict.idx")
+        engine = SymSpellEngine(self.dictionary_path, index_path=index_path)
+        engine.load()
+        # a changed dictionary invalidates the index even when the index
+        # is newer, e.g. one written by a compaction that started earlier
+        with open(self.dictionary_path, "a") as outfile:
+            outfile.write("steamd 20\n")
+        os.utime(index_path,
+                 ns=(os.stat(self.dictionary_path).st_mtime_ns + 10 ** 9,) * 2)
+        engine_2 = SymSpellEngine(self.dictionary_path, index_path=index_path)
+        self.assertIsNone(engine_2.sym_spell._index)
+        self.assertIn("steamd", engine_2.sym_spell.words)
+
+        engine_3 = SymSpellEngine(self.dictionary_path, index_path=index_path)
+        self.assertIsNotNone(engine_3.sym_spell._index)
+        self.assertIn("steamd", engine_3.sym_spell.words)
+
+    def test_update_mapped_index(self):
+        index_path = os.path.join(self.temp_dir, "dict.idx")
+        journal_path = os.path.join(self.temp_dir, "dict.journal")
+        SymSpellEngine(self.dictionary_path, index_path=index_path).load()
+        engine = SymSpellEngine(self.dictionary_path, index_path=index_path,
+                                journal_path=journal_path,
+                                compact_every=None)
+        sym_spell = engine.sym_spell
+        self.assertIsNotNone(sym_spell._index)
+        self.assertTrue(engine.create_dictionary_entry("steamd", 20))
+        # the update is applied to a copy, lookups still running on the
+        # mapped index are not affected
+        self.assertIsNot(sym_spell, engine.sym_spell)
+        self.assertIsNotNone(sym_spell._index)
+        self.assertNotIn("steamd", sym_spell.words)
+        result = engine.sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamd", result[0].term)
+
+    def test_compaction_after_dictionary_change(self):
+        index_path = os.path.join(self.temp_dir, "dict.idx")
+        journal_path = os.path.join(self.temp_dir, "dict.journal")
+        engine = SymSpellEngine(self.dictionary_path, index_path=index_path,
+                                journal_path=journal_path,
+                                compact_every=None)
+        engine.create_dictionary_entry("steamd", 10)
+        engine.create_dictionary_entry("steamd", 10)
+        replay = engine._journal.replay
+
+        def replay_during_change(*args, **kwargs):
+            # the dictionary changes while the compaction runs
+            with open(self.dictionary_path, "a") as outfile:
+                outfile.write("steame 1\n")
+            return replay(*args, **kwargs)
+
+        engine._journal.replay = replay_during_change
+        engine.compact(wait=True)
+        # neither the snapshot nor the journal was replaced
+        sym_spell = engine._map_index(engine._signature)
+        self.assertEqual(0, sym_spell.index_metadata["journal_seq"])
+        with open(journal_path, "r") as infile:
+            self.assertEqual(2, len(infile.readlines()))
+
+        engine_3 = SymSpellEngine(self.dictionary_path,
+                                  index_path=index_path,
+                                  journal_path=journal_path)
+        self.assertIn("steame", engine_3.sym_spell.words)
+        self.assertEqual(20, engine_3.sym_spell.words["steamd"])
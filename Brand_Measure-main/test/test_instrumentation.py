@@ -0,0 +1,120 @@
+import json
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pytest
+
+from com_in_ineuron_ai_service.instrumentation import (
+    JobTrace, StageMetrics, peakRss)
+from com_in_ineuron_ai_service.jobQueue import Job
+
+class TestStageMetrics(unittest.TestCase):
+    def test_spans(self):
+        metrics = StageMetrics()
+        trace = JobTrace("job")
+        with metrics.span("decode", trace, audioBytes=100) as span:
+            sum(range(100000))
+            span.audioBytes += 50
+        with pytest.raises(ValueError):
+            with metrics.span("decode", trace, chunk=2):
+                raise ValueError("bad chunk")
+
+        @metrics.timed("spot")
+        def spot(text):
+            return text.split()
+
+        self.assertEqual(["a", "b"], spot("a b"))
+        stages = metrics.snapshot()
+        self.assertEqual(["decode", "spot"], list(stages))
+        self.assertEqual(2, stages["decode"]["calls"])
+        self.assertEqual(1, stages["decode"]["errors"])
+        self.assertEqual(150, stages["decode"]["audioBytes"])
+        self.assertGreater(stages["decode"]["cpuSeconds"], 0)
+        self.assertGreaterEqual(stages["decode"]["wallSeconds"],
+                                stages["decode"]["cpuSeconds"] * 0.5)
+        self.assertEqual(1, stages["spot"]["calls"])
+        # only spans given the trace are in it
+        self.assertEqual(2, len(trace.spans))
+        if os.name == "posix":
+            self.assertGreater(peakRss(), 0)
+
+    def test_render(self):
+        metrics = StageMetrics(prefix="test")
+        with metrics.span('say "hi"', audioBytes=10):
+            pass
+        lines = metrics.render().splitlines()
+        self.assertIn("# TYPE test_stage_wall_seconds summary", lines)
+        self.assertIn('test_stage_wall_seconds_count{stage="say \\"hi\\""} 1',
+                      lines)
+        self.assertIn('test_stage_audio_bytes_total{stage="say \\"hi\\""} 10',
+                      lines)
+        self.assertIn('test_stage_errors_total{stage="say \\"hi\\""} 0', lines)
+        for line in lines:
+            if not line.startswith("#"):
+                float(line.rsplit(" ", 1)[1])
+
+    def test_trace(self):
+        metrics = StageMetrics()
+        trace = JobTrace("job")
+        with metrics.span("job", trace):
+            with metrics.span("chunk", trace, chunk=0):
+                pass
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, "traces", "job.json")
+        trace.save(path)
+        with open(path) as infile:
+            events = json.load(infile)["traceEvents"]
+        self.assertEqual(["M", "X", "X"], [event["ph"] for event in events])
+        job, chunk = events[1:]
+        self.assertEqual(("job", "chunk"), (job["name"], chunk["name"]))
+        self.assertEqual(0, chunk["args"]["chunk"])
+        # the chunk span is nested in the job span
+        self.assertLessEqual(job["ts"], chunk["ts"])
+        self.assertLessEqual(chunk["ts"] + chunk["dur"],
+                             job["ts"] + job["dur"])
+
+    def test_transcript_jobs(self):
+        pytest.importorskip("speech_recognition")
+        from com_in_ineuron_ai_service.transcriptJobs import (
+            TranscriptJobRunner)
+        from com_in_ineuron_ai_speech_to_text.silenceDetector import writeWav
+        from test.test_transcript_generator import LengthRecognizer
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        wav_path = os.path.join(temp_dir, "input.wav")
+        silence = np.zeros(16000)
+        parts = [silence]
+        for seconds in (3, 4):
+            time_axis = np.arange(seconds * 16000) / 16000
+            parts += [np.sin(2 * np.pi * 440 * time_axis) * 16000, silence]
+        writeWav(wav_path, np.concatenate(parts).astype(np.int16).tobytes(),
+                 16000, 2)
+        metrics = StageMetrics()
+        trace_dir = os.path.join(temp_dir, "traces")
+        runner = TranscriptJobRunner(
+            str.upper, str.split, "chunks", recognizer=LengthRecognizer(),
+            archivePath=os.path.join(temp_dir, "archive"), metrics=metrics,
+            traceFolder=trace_dir)
+        job = Job(wav_path)
+        runner(job)
+
+        stages = metrics.snapshot()
+        self.assertEqual(1, stages["job"]["calls"])
+        self.assertEqual(2, stages["recognize"]["calls"])
+        self.assertEqual(2, stages["correct"]["calls"])
+        self.assertEqual(2, stages["spot"]["calls"])
+        self.assertEqual(1, stages["archive"]["calls"])
+        # the mono 16 bit chunks, with some silence around them
+        self.assertGreater(stages["recognize"]["audioBytes"], 7 * 16000 * 2)
+        with open(os.path.join(trace_dir, job.id + ".json")) as infile:
+            trace = json.load(infile)
+        names = [event["name"] for event in trace["traceEvents"]
+                 if event["ph"] == "X"]
+        self.assertEqual("job", names[0])
+        self.assertEqual(2, names.count("recognize"))
@@ -0,0 +1,149 @@
+import os
+import os.path
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+import pytest
+
+from com_in_ineuron_ai_service.jobQueue import JobQueue, StagePipeline
+
+class TestStagePipeline(unittest.TestCase):
+    def test_stages_overlap(self):
+        events = []
+        lock = threading.Lock()
+
+        def source():
+            for i in range(4):
+                with lock:
+                    events.append(("source", i))
+                yield i
+                time.sleep(0.05)
+
+        def double(item):
+            with lock:
+                events.append(("double", item))
+            return item * 2
+
+        items = []
+        StagePipeline([(double, 1), (str, 1)], queueSize=1).run(
+            source(), items.append)
+        self.assertEqual(["0", "2", "4", "6"], items)
+        # the first item is through a stage before the last one is read
+        self.assertLess(events.index(("double", 0)),
+                        events.index(("source", 3)))
+
+    def test_several_workers(self):
+        active = []
+        lock = threading.Lock()
+
+        def slow(item):
+            with lock:
+                active.append(item)
+            time.sleep(0.05)
+            return item
+
+        items = []
+        start = time.perf_counter()
+        StagePipeline([(slow, 4)], queueSize=2).run(range(8), items.append)
+        self.assertEqual(list(range(8)), sorted(items))
+        self.assertLess(time.perf_counter() - start, 8 * 0.05)
+
+    def test_errors(self):
+        def fail(item):
+            if item == 3:
+                raise ValueError("bad item")
+            return item
+
+        def endless():
+            i = 0
+            while True:
+                yield i
+                i += 1
+
+        items = []
+        with pytest.raises(ValueError):
+            StagePipeline([(fail, 2), (str, 1)], queueSize=1).run(
+                endless(), items.append)
+        self.assertNotIn("3", items)
+
+        def broken_source():
+            yield 1
+            raise KeyError("no more")
+
+        with pytest.raises(KeyError):
+            StagePipeline([(str, 1)]).run(broken_source(), items.append)
+        with pytest.raises(ZeroDivisionError):
+            StagePipeline([(str, 1)]).run(range(3), lambda item: 1 / 0)
+
+class TestJobQueue(unittest.TestCase):
+    def test_jobs(self):
+        def run_job(job):
+            if job.path == "missing.wav":
+                raise IOError("no such file")
+            job.progress["steps"] = 1
+            return job.path.upper()
+
+        jobs = JobQueue(run_job, workers=2, keepJobs=2)
+        first = jobs.submit("first.wav")
+        failed = jobs.submit("missing.wav")
+        self.assertIs(first, jobs.wait(first.id, timeout=5))
+        self.assertEqual("done", first.status)
+        self.assertEqual("FIRST.WAV", first.toDict()["result"])
+        self.assertEqual({"steps": 1}, first.toDict()["progress"])
+        jobs.wait(failed.id, timeout=5)
+        self.assertEqual("failed", failed.status)
+        self.assertEqual("no such file", failed.error)
+        self.assertIsNone(jobs.wait("unknown"))
+
+        # only the last keepJobs finished jobs are kept
+        last = jobs.submit("last.wav")
+        jobs.wait(last.id, timeout=5)
+        self.assertEqual(2, len(jobs.list()))
+        self.assertIsNone(jobs.get(first.id))
+        self.assertNotIn("result", last.toDict(withResult=False))
+
+    def test_transcript_jobs(self):
+        pytest.importorskip("speech_recognition")
+        from com_in_ineuron_ai_service.transcriptJobs import (
+            TranscriptJobRunner)
+        from com_in_ineuron_ai_speech_to_text.silenceDetector import writeWav
+        from test.test_transcript_generator import LengthRecognizer
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        wav_path = os.path.join(temp_dir, "input.wav")
+        silence = np.zeros(16000)
+        parts = [silence]
+        for seconds in (3, 4, 5):
+            time_axis = np.arange(seconds * 16000) / 16000
+            parts += [np.sin(2 * np.pi * 440 * time_axis) * 16000, silence]
+        writeWav(wav_path, np.concatenate(parts).astype(np.int16).tobytes(),
+                 16000, 2)
+        archive_path = os.path.join(temp_dir, "archive")
+        runner = TranscriptJobRunner(
+            str.upper, lambda text: text.split()[2:3], "chunks",
+            recognizer=LengthRecognizer(), maxWorkers=2,
+            archivePath=archive_path)
+
+        jobs = JobQueue(runner)
+        job = jobs.wait(jobs.submit(wav_path).id, timeout=30)
+        self.assertEqual("done", job.status, job.error)
+        chunks = [os.path.join("chunks", "speech_chunk{}.wav".format(i))
+                  for i in range(1, 4)]
+        result = job.result
+        self.assertEqual(chunks, list(result["inputFileTranscriptedOp"]))
+        self.assertEqual("Chunk of 4 seconds. ",
+                         result["inputFileTranscriptedOp"][chunks[0]])
+        self.assertEqual("CHUNK OF 5 SECONDS. ",
+                         result["spellCorrectedOpMap"][chunks[1]])
+        self.assertEqual([["4"], ["5"], ["6"]],
+                         list(result["extractedKeywors"].values()))
+        self.assertEqual({"transcribed": 3, "corrected": 3, "spotted": 3,
+                          "chunks": 3}, job.progress)
+        self.assertFalse(os.path.exists(wav_path))
+        self.assertTrue(os.path.exists(os.path.join(archive_path,
+                                                    "input.wav")))
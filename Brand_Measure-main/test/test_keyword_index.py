@@ -0,0 +1,122 @@
+import json
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import pytest
+
+pytest.importorskip("flashtext")
+
+from com_in_ineuron_ai_keywordspotter.keywordIndex import KeywordIndex
+from com_in_ineuron_ai_keywordspotter.keywordSpotter import (
+    AddMultiKeywords, compiledIndex)
+
+class TestKeywordIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.catalog_path = os.path.join(self.temp_dir, "brands.json")
+        self.cache_path = os.path.join(self.temp_dir, "cache",
+                                       "brands.idx")
+        self.write_catalog({"team": ["manchester united", "man utd"],
+                            "game": ["football"]})
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_catalog(self, catalog):
+        with open(self.catalog_path, "w") as outfile:
+            json.dump(catalog, outfile)
+        # make the change visible whatever the timestamp resolution
+        stat = os.stat(self.catalog_path)
+        os.utime(self.catalog_path, ns=(stat.st_atime_ns,
+                                        stat.st_mtime_ns + 10 ** 9))
+
+    def test_extract(self):
+        index = KeywordIndex({"place": ["england"],
+                              "team": ["manchester united"]})
+        self.assertEqual(2, len(index))
+        text = "Manchester United beat England"
+        self.assertEqual(["team", "place"], index.extract(text))
+        self.assertEqual([("team", 0, 17), ("place", 23, 30)],
+                         index.extract(text, spans=True))
+        transcripts = {"chunk1": text, "chunk2": "no brands here"}
+        self.assertEqual({"chunk1": ["team", "place"], "chunk2": []},
+                         index.extractBatch(transcripts))
+        self.assertEqual([[("place", 0, 7)]],
+                         index.extractBatch(["england"], spans=True))
+        self.assertEqual({"team": 2, "place": 1}, index.countCategories(
+            [text, "manchester united again"]))
+        self.assertFalse(index.reload())
+
+    def test_add_multi_keywords(self):
+        keyword_dict = {"place": ["england"], "game": ["football"]}
+        compiledIndex.cache_clear()
+        for text in ("football in england", "England"):
+            AddMultiKeywords(text, keyword_dict).addkey()
+        self.assertEqual(["game", "place"], AddMultiKeywords(
+            "football in england", keyword_dict).addkey())
+        self.assertEqual(1, compiledIndex.cache_info().currsize)
+
+    def test_save_and_load(self):
+        index = KeywordIndex.fromCatalog(self.catalog_path, self.cache_path)
+        self.assertTrue(os.path.exists(self.cache_path))
+        loaded = KeywordIndex.load(self.cache_path)
+        self.assertEqual(3, len(loaded))
+        self.assertEqual(["team", "game"],
+                         loaded.extract("Man Utd play football"))
+        self.assertEqual(index.signature, loaded.signature)
+
+        with open(self.cache_path, "wb") as outfile:
+            outfile.write(b"truncated")
+        with pytest.raises(ValueError):
+            KeywordIndex.load(self.cache_path)
+        # an unreadable cache is rebuilt from the catalogue
+        index = KeywordIndex.fromCatalog(self.catalog_path, self.cache_path)
+        self.assertEqual(["team"], index.extract("man utd"))
+        self.assertEqual(3, len(KeywordIndex.load(self.cache_path)))
+
+    def test_stale_cache_rebuilt(self):
+        KeywordIndex.fromCatalog(self.catalog_path, self.cache_path)
+        self.write_catalog({"game": ["football", "soccer"]})
+        index = KeywordIndex.fromCatalog(self.catalog_path, self.cache_path)
+        self.assertEqual(["game"], index.extract("man utd soccer"))
+
+    def test_reload(self):
+        index = KeywordIndex.fromCatalog(self.catalog_path, self.cache_path)
+        self.assertFalse(index.reload())
+        self.write_catalog({"team": ["chelsea"]})
+        self.assertEqual(["team"], index.extract("man utd"))
+        self.assertTrue(index.reload())
+        self.assertEqual([], index.extract("man utd"))
+        self.assertEqual(["team"], index.extract("chelsea"))
+        self.assertEqual(1, len(KeywordIndex.load(self.cache_path)))
+        self.assertTrue(index.reload(force=True))
+
+    def test_reload_on_extract(self):
+        index = KeywordIndex.fromCatalog(self.catalog_path, checkInterval=0)
+        self.write_catalog({"team": ["chelsea"]})
+        self.assertEqual(["team"], index.extractBatch(["chelsea"])[0])
+
+    def test_reload_on_extract_keeps_keywords(self):
+        index = KeywordIndex.fromCatalog(self.catalog_path, checkInterval=0)
+        # a catalogue half written by an editor
+        with open(self.catalog_path, "w") as outfile:
+            outfile.write('{"team": ["chel')
+        self.assertEqual(["team"], index.extract("man utd"))
+        self.write_catalog({"team": ["chelsea"]})
+        self.assertEqual(["team"], index.extract("chelsea"))
+
+        # only one extraction checks at a time
+        index.checkLock.acquire()
+        self.write_catalog({"game": ["chelsea"]})
+        self.assertEqual(["team"], index.extract("chelsea"))
+        index.checkLock.release()
+        self.assertEqual(["game"], index.extract("chelsea"))
+
+    def test_invalid_catalog(self):
+        with open(self.catalog_path, "w") as outfile:
+            json.dump({"team": "chelsea"}, outfile)
+        with pytest.raises(ValueError):
+            KeywordIndex.fromCatalog(self.catalog_path)
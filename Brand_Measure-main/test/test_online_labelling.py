@@ -0,0 +1,67 @@
+import unittest
+
+import numpy as np
+
+from com_in_ineuron_ai_labelling.OnlineLabelling import (
+    OnlineSpeakerClustering, StableLabelling, matchLabels)
+from com_in_ineuron_ai_labelling.SignalLabelling import create_labelling
+
+def partial_splits(count):
+    return [slice(i * 960, i * 960 + 25600) for i in range(count)]
+
+class TestOnlineSpeakerClustering(unittest.TestCase):
+    def test_speakers(self):
+        rng = np.random.default_rng(0)
+        voices = rng.normal(size=(3, 256))
+        speakers = np.repeat([0, 1, 0, 2, 1], 20)
+        embeds = voices[speakers] + rng.normal(scale=0.5, size=(100, 256))
+        clustering = OnlineSpeakerClustering(threshold=0.5)
+        labels = clustering.assignAll(embeds)
+        # speakers are named in order of appearance
+        np.testing.assert_array_equal(speakers, labels)
+        self.assertEqual([40, 40, 20], clustering.counts)
+        np.testing.assert_allclose(1, np.linalg.norm(clustering.centroids,
+                                                     axis=1))
+
+    def test_max_speakers(self):
+        clustering = OnlineSpeakerClustering(threshold=0.99, maxSpeakers=2)
+        labels = clustering.assignAll(np.eye(4) + [0.5, 0, 0, 0])
+        self.assertEqual([0, 1, 0, 0], labels.tolist())
+
+class TestStableLabelling(unittest.TestCase):
+    def test_same_as_create_labelling(self):
+        rng = np.random.default_rng(1)
+        labels = np.repeat(rng.integers(0, 3, 30), rng.integers(1, 12, 30))
+        splits = partial_splits(len(labels))
+        stable = StableLabelling(smoothing=1)
+        turns = []
+        for start in range(0, len(labels), 7):
+            turns += stable.feed(labels[start:start + 7],
+                                 splits[start:start + 7])
+        turns += stable.finish()
+        self.assertEqual(create_labelling(labels, splits), turns)
+
+    def test_smoothing(self):
+        labels = [0] * 10 + [1] + [0] * 5 + [1] * 10
+        splits = partial_splits(len(labels))
+        stable = StableLabelling(smoothing=5)
+        # the lone partial of speaker 1 is smoothed away, and a turn is
+        # only emitted once two partials after its end are known
+        self.assertEqual([], stable.feed(labels[:17], splits[:17]))
+        self.assertEqual([], stable.feed(labels[17:18], splits[17:18]))
+        self.assertEqual([("0", 0, 1.76)],
+                         stable.feed(labels[18:19], splits[18:19]))
+        self.assertEqual([("1", 1.76, 2.3)],
+                         stable.feed(labels[19:], splits[19:]) +
+                         stable.finish())
+
+class TestMatchLabels(unittest.TestCase):
+    def test_match_labels(self):
+        reference = [0, 0, 0, 1, 1, 1, 2]
+        np.testing.assert_array_equal(
+            [0, 0, 0, 1, 1, 1, 1],
+            matchLabels(reference, [5, 5, 5, 3, 3, 3, 3]))
+        # a cluster overlapping a taken one gets a new name
+        np.testing.assert_array_equal(
+            [1, 1, 3, 0, 0, 0, 2],
+            matchLabels([1, 1, 1, 0, 0, 0, 2], [7, 7, 8, 2, 2, 2, 9]))
@@ -0,0 +1,140 @@
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import pytest
+
+from symspellpy import DictionaryRegistry, SymSpellEngine, Verbosity
+
+class TestDictionaryRegistry(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.base_path = self.write_dictionary(
+            "base.txt", "steama 4\nsteamb 6\nsteamc 2\nhello 10\n")
+        self.overlay_path = self.write_dictionary(
+            "overlay.txt", "steamx 1\nsteamb 1\nhullo 3\n")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_dictionary(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "w") as outfile:
+            outfile.write(content)
+        return path
+
+    def create_registry(self, memory_budget=None):
+        registry = DictionaryRegistry(memory_budget)
+        registry.register("en", SymSpellEngine(self.base_path))
+        registry.register("tenant", SymSpellEngine(self.overlay_path),
+                          base="en")
+        return registry
+
+    def test_invalid_registration(self):
+        with pytest.raises(ValueError) as excinfo:
+            __ = DictionaryRegistry(-1)
+        self.assertEqual("memory_budget cannot be negative",
+                         str(excinfo.value))
+        registry = self.create_registry()
+        with pytest.raises(ValueError) as excinfo:
+            registry.register("en", SymSpellEngine(self.base_path))
+        self.assertEqual("Dictionary already registered: en",
+                         str(excinfo.value))
+        with pytest.raises(ValueError) as excinfo:
+            registry.register("other", SymSpellEngine(self.base_path),
+                              base="fr")
+        self.assertEqual("Unknown dictionary: fr", str(excinfo.value))
+        with pytest.raises(ValueError) as excinfo:
+            registry.get("fr")
+        self.assertEqual("Unknown dictionary: fr", str(excinfo.value))
+        with pytest.raises(ValueError) as excinfo:
+            registry.unregister("en")
+        self.assertEqual("Dictionary is the base of another dictionary: en",
+                         str(excinfo.value))
+
+    def test_lazy_loading(self):
+        registry = self.create_registry()
+        self.assertEqual(0, registry.memory_usage)
+        self.assertFalse(registry.info()["en"]["loaded"])
+
+        sym_spell = registry.get("en")
+        self.assertIs(sym_spell, registry.get("en"))
+        info = registry.info()
+        self.assertTrue(info["en"]["loaded"])
+        self.assertGreater(info["en"]["size"], 0)
+        self.assertFalse(info["tenant"]["loaded"])
+        self.assertEqual(info["en"]["size"], registry.memory_usage)
+
+        # an overlay loads its base once, and holds only its own words
+        layers = registry.layers("tenant")
+        self.assertIs(sym_spell, layers[1])
+        self.assertNotIn("steama", layers[0].words)
+        self.assertEqual("en", registry.info()["tenant"]["base"])
+
+        self.assertTrue(registry.unregister("tenant"))
+        self.assertFalse(registry.unregister("tenant"))
+        self.assertEqual(["en"], registry.names)
+
+    def test_memory_budget(self):
+        registry = self.create_registry()
+        registry.register("other", SymSpellEngine(self.base_path))
+        registry.get("other")
+        registry.layers("tenant")
+        sizes = {name: info["size"]
+                 for name, info in registry.info().items()}
+        budget = sizes["en"] + sizes["tenant"]
+
+        registry = self.create_registry(budget)
+        registry.register("other", SymSpellEngine(self.base_path))
+        registry.get("other")
+        registry.get("en")
+        # the least recently used dictionary makes room for the overlay
+        registry.layers("tenant")
+        info = registry.info()
+        self.assertFalse(info["other"]["loaded"])
+        self.assertTrue(info["en"]["loaded"])
+        self.assertTrue(info["tenant"]["loaded"])
+        self.assertLessEqual(registry.memory_usage, budget)
+
+        # dictionaries in use are kept even when over budget
+        registry.get("other")
+        info = registry.info()
+        self.assertTrue(info["other"]["loaded"])
+        self.assertFalse(info["en"]["loaded"] and info["tenant"]["loaded"])
+
+        self.assertTrue(registry.evict("other"))
+        self.assertFalse(registry.evict("other"))
+        self.assertFalse(registry.info()["other"]["loaded"])
+        self.assertEqual(6, registry.get("other").words["steamb"])
+
+    def test_layered_lookup(self):
+        registry = self.create_registry()
+        # the overlay wins at equal distance
+        result = registry.lookup("tenant", "steamd", Verbosity.TOP)
+        self.assertEqual(["steamx"], [item.term for item in result])
+        result = registry.lookup("tenant", "steamd", Verbosity.CLOSEST)
+        self.assertEqual(["steamx", "steamb", "steama", "steamc"],
+                         [item.term for item in result])
+        # a word in both layers is suggested once, with the overlay count
+        self.assertEqual(1, result[1].count)
+        # the base wins when it is closer
+        result = registry.lookup("tenant", "hello", Verbosity.ALL)
+        self.assertEqual([("hello", 0, 10), ("hullo", 1, 3)],
+                         [(item.term, item.distance, item.count)
+                          for item in result])
+        result = registry.lookup("tenant", "hullo", Verbosity.CLOSEST)
+        self.assertEqual(["hullo"], [item.term for item in result])
+
+        result = registry.lookup("tenant", "xyz", Verbosity.TOP, 1,
+                                 include_unknown=True)
+        self.assertEqual([("xyz", 2, 0)],
+                         [(item.term, item.distance, item.count)
+                          for item in result])
+        self.assertEqual([], registry.lookup("tenant", "xyz", Verbosity.TOP))
+
+        # a dictionary without base looks up as usual
+        self.assertEqual(["steamb"],
+                         [item.term for item in
+                          registry.lookup("en", "steamd", Verbosity.TOP)])
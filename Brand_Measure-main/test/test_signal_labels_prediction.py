@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+import pytest
+
+pytest.importorskip("sklearn")
+pytest.importorskip("kneed")
+pytest.importorskip("spectralcluster")
+
+from com_in_ineuron_ai_labelling.SignalLabelsPrediction import (
+    compareLabelPrediction, fastClusterCount, signalLabelPrediction)
+
+def speaker_embeddings(seed, n, speakers):
+    # non-negative L2-normed embeddings like those of the voice encoder
+    rng = np.random.default_rng(seed)
+    centers = np.abs(rng.normal(0, 1, (speakers, 256)))
+    labels = rng.integers(0, speakers, n)
+    embeds = np.abs(centers[labels] + rng.normal(0, 0.8, (n, 256)))
+    embeds /= np.linalg.norm(embeds, axis=1, keepdims=True)
+    return embeds.astype(np.float32), labels
+
+class TestSignalLabelsPrediction(unittest.TestCase):
+    def test_cluster_count(self):
+        for seed, speakers in ((0, 3), (1, 4), (2, 6)):
+            embeds, __ = speaker_embeddings(seed, 1500, speakers)
+            self.assertEqual(speakers, fastClusterCount(embeds))
+
+    def test_few_embeddings(self):
+        embeds, __ = speaker_embeddings(0, 2, 2)
+        self.assertIsNone(fastClusterCount(embeds))
+        embeds = np.ones((20, 256), dtype=np.float32) / 16
+        self.assertIsNone(fastClusterCount(embeds))
+
+    def test_unknown_method(self):
+        embeds, __ = speaker_embeddings(0, 10, 2)
+        with pytest.raises(ValueError):
+            signalLabelPrediction(embeds, method="exhaustive")
+
+    def test_compare(self):
+        embeds, labels = speaker_embeddings(3, 300, 3)
+        report = compareLabelPrediction(embeds)
+        self.assertEqual(["kmeans", "fast"], list(report))
+        for method in ("kmeans", "fast"):
+            self.assertEqual(3, report[method]["clusters"])
+            self.assertTrue(report[method]["sameClusters"])
+            self.assertEqual(1.0, report[method]["adjustedRandIndex"])
+            self.assertLessEqual(report[method]["countSeconds"],
+                                 report[method]["seconds"])
+            self.assertEqual(len(labels), len(report[method]["labels"]))
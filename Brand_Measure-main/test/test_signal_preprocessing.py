@@ -0,0 +1,74 @@
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("resemblyzer")
+
+from com_in_ineuron_ai_preprocessing.SingalPreprocessing import (
+    PartialStream, embedMels, embedPartials, loadEncoder, partialMels,
+    preprocess_wav, streamWav)
+from com_in_ineuron_ai_speech_to_text.silenceDetector import writeWav
+
+class TestSignalPreprocessing(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        # preprocessed waveforms of 1.2s, 3s and 0.3s at 16 kHz
+        self.wavs = [rng.normal(0, 0.1, n).astype(np.float32)
+                     for n in (19200, 48000, 4800)]
+
+    def test_encoder_loaded_once(self):
+        self.assertIs(loadEncoder("cpu"), loadEncoder("cpu"))
+
+    def test_same_as_embed_utterance(self):
+        encoder = loadEncoder()
+        # small batches mix the windows of consecutive waveforms
+        for batch_size in (5, 256):
+            embedded = embedPartials(self.wavs, encoder, batchSize=batch_size)
+            self.assertEqual(len(self.wavs), len(embedded))
+            for wav, (cont_embeds, wav_splits) in zip(self.wavs, embedded):
+                _, expected, expected_splits = encoder.embed_utterance(
+                    wav, return_partials=True, rate=16)
+                self.assertEqual(expected_splits, wav_splits)
+                np.testing.assert_allclose(expected, cont_embeds, atol=1e-5)
+
+    def test_partial_stream(self):
+        rng = np.random.default_rng(1)
+        for wav in self.wavs + [rng.normal(0, 0.1, 100000).astype(np.float32)]:
+            expected, expected_splits = partialMels(wav)
+            stream = PartialStream()
+            mels, wav_splits = [], []
+            start = 0
+            while start < len(wav):
+                stop = start + int(rng.integers(1, 30000))
+                new_mels, new_splits = stream.feed(wav[start:stop])
+                mels += new_mels
+                wav_splits += new_splits
+                start = stop
+            new_mels, new_splits = stream.finish()
+            self.assertEqual(expected_splits, wav_splits + new_splits)
+            np.testing.assert_allclose(expected, mels + new_mels, atol=1e-6)
+            # only the audio of about one partial is kept
+            self.assertLess(len(stream.buffer), 2 * 25600)
+        embeds = embedMels(expected, batchSize=5)
+        np.testing.assert_allclose(
+            embedPartials([wav])[0][0], embeds, atol=1e-5)
+
+    def test_stream_wav(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, "input.wav")
+        rng = np.random.default_rng(2)
+        samples = (rng.normal(0, 0.1, 16000 * 5) * 32767).astype("<i2")
+        writeWav(path, samples.tobytes(), 16000, 2)
+        windows = list(streamWav(path, windowSeconds=2))
+        self.assertEqual(3, len(windows))
+        # windows of loud noise are not trimmed
+        np.testing.assert_allclose(
+            preprocess_wav(samples[:32000] / 32768.0, source_sr=16000),
+            windows[0], atol=1e-5)
@@ -0,0 +1,113 @@
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import pytest
+
+from com_in_ineuron_ai_speech_to_text.silenceDetector import (
+    SilenceSplitter, encodePcm, readWavBlocks, splitWavOnSilence, toMono,
+    wavDbfs, writeWav)
+
+class TestSilenceDetector(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.wav_path = os.path.join(self.temp_dir, "input.wav")
+        # at 8 frames per ms: silence up to 1000ms, a tone up to 3000ms,
+        # quiet noise up to 3300ms, a tone up to 4300ms, silence up to
+        # 6300ms
+        rng = np.random.default_rng(0)
+        tone = lambda ms: np.sin(np.arange(ms * 8) * 0.3) * 8000
+        self.samples = np.concatenate((
+            np.zeros(8000), tone(2000), rng.normal(0, 20, 2400), tone(1000),
+            np.zeros(16000))).astype(np.int16)
+        writeWav(self.wav_path, self.samples.tobytes(), 8000, 2)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def assert_chunks(self, ranges, chunks):
+        self.assertEqual(len(ranges), len(chunks))
+        for (start, end), chunk in zip(ranges, chunks):
+            np.testing.assert_array_equal(self.samples[start * 8:end * 8],
+                                          chunk[:, 0])
+
+    def test_read_wav(self):
+        blocks = list(readWavBlocks(self.wav_path, blockMs=1000))
+        self.assertEqual(7, len(blocks))
+        self.assertEqual((8000, 1), blocks[0].shape)
+        np.testing.assert_array_equal(self.samples,
+                                      np.concatenate(blocks)[:, 0])
+        self.assertEqual(self.samples.tobytes(),
+                         encodePcm(np.concatenate(blocks), 2))
+        self.assertAlmostEqual(-18.48, wavDbfs(self.wav_path), places=2)
+
+    def test_to_mono(self):
+        samples = np.array([[1, 2], [-1, -2], [4, 4]])
+        np.testing.assert_array_equal([[1], [-2], [4]], toMono(samples))
+        self.assertIs(samples[:, :1].base, toMono(samples[:, :1]).base)
+
+    def test_chunk_boundaries(self):
+        chunks = list(splitWavOnSilence(self.wav_path, 200, -50, False))
+        self.assert_chunks([(1000, 3000), (3300, 4300)], chunks)
+        chunks = list(splitWavOnSilence(self.wav_path, 200, -50, 100))
+        self.assert_chunks([(900, 3100), (3200, 4400)], chunks)
+        # the noise is shorter than the padding of both chunks, which
+        # share it halfway
+        chunks = list(splitWavOnSilence(self.wav_path, 200, -50, 200))
+        self.assert_chunks([(800, 3150), (3150, 4500)], chunks)
+        chunks = list(splitWavOnSilence(self.wav_path, 200, -50, True))
+        self.assert_chunks([(0, 3150), (3150, 6300)], chunks)
+        # the noise is too short to split on
+        chunks = list(splitWavOnSilence(self.wav_path, 500, -50, 100))
+        self.assert_chunks([(900, 4400)], chunks)
+        # the recording is shorter than a silence, or silent throughout
+        chunks = list(splitWavOnSilence(self.wav_path, 10000, -50, 100))
+        self.assert_chunks([(0, 6300)], chunks)
+        self.assertEqual(
+            [], list(splitWavOnSilence(self.wav_path, 200, 0, 100)))
+
+    def test_incremental(self):
+        rng = np.random.default_rng(1)
+        expected = list(splitWavOnSilence(self.wav_path, 200, -50, 200))
+        splitter = SilenceSplitter(8000, 1, 2, 200, -50, 200)
+        samples = self.samples.reshape(-1, 1)
+        chunks = list()
+        start = 0
+        while start < len(samples):
+            end = start + int(rng.integers(1, 4000))
+            chunks += splitter.feed(samples[start:end])
+            # a chunk is complete once the silence after it is, and
+            # only the samples from the start of the next one are kept
+            if start < 4500 * 8 <= end:
+                self.assertEqual(1, len(chunks))
+                self.assertEqual(3150 * 8, splitter.pcmStart)
+            start = end
+        chunks += splitter.flush()
+        self.assertEqual(len(expected), len(chunks))
+        for expected_chunk, chunk in zip(expected, chunks):
+            np.testing.assert_array_equal(expected_chunk, chunk)
+
+    def test_same_as_pydub(self):
+        audio_segment = pytest.importorskip("pydub").AudioSegment
+        split_on_silence = pytest.importorskip("pydub.silence").split_on_silence
+        stereo_path = os.path.join(self.temp_dir, "stereo.wav")
+        rng = np.random.default_rng(2)
+        noise = rng.normal(0, 300, (len(self.samples), 1))
+        stereo = np.hstack((self.samples[:, None], self.samples[:, None]
+                            + noise)).astype(np.int16)
+        writeWav(stereo_path, stereo.tobytes(), 8000, 2, channels=2)
+        sound = audio_segment.from_wav(stereo_path)
+        for min_silence_len, keep_silence in ((100, 50), (200, True),
+                                              (300, 500)):
+            silence_thresh = sound.dBFS - 14
+            self.assertEqual(sound.dBFS, wavDbfs(stereo_path))
+            expected = split_on_silence(sound, min_silence_len,
+                                        silence_thresh, keep_silence)
+            chunks = list(splitWavOnSilence(stereo_path, min_silence_len,
+                                            silence_thresh, keep_silence,
+                                            blockMs=300))
+            self.assertEqual([chunk.raw_data for chunk in expected],
+                             [encodePcm(chunk, 2) for chunk in chunks])
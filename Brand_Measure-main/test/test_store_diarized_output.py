@@ -0,0 +1,108 @@
+import os
+import os.path
+import shutil
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+import pytest
+
+from com_in_ineuron_ai_finaloutputsignal.StoreDiarizedOutput import (
+    StoreDiarizedOutput, assembleSpeakers)
+from com_in_ineuron_ai_finaloutputsignal.wavFile import WavFile
+from com_in_ineuron_ai_speech_to_text.silenceDetector import (
+    readWavBlocks, writeWav)
+
+def write_float_wav(path, samples, frame_rate):
+    # IEEE float wav like scipy.io.wavfile.write writes float32 arrays
+    data = samples.astype("<f4").tobytes()
+    fmt = struct.pack("<HHIIHH", 3, 1, frame_rate, frame_rate * 4, 4, 32)
+    with open(path, "wb") as outfile:
+        outfile.write(b"RIFF" + struct.pack("<I", 4 + 8 + len(fmt) + 8 + len(data))
+                      + b"WAVE")
+        outfile.write(b"fmt " + struct.pack("<I", len(fmt)) + fmt)
+        outfile.write(b"data" + struct.pack("<I", len(data)) + data)
+
+class TestStoreDiarizedOutput(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, "speakers")
+        self.labelling = [("0", 0.0, 0.1), ("1", 0.1, 0.25),
+                          ("0", 0.25, 0.3)]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def read_speaker(self, i):
+        path = os.path.join(self.output_dir, "speaker{}.wav".format(i))
+        return np.concatenate(list(readWavBlocks(path)))
+
+    def assert_speakers(self, frames_per_ms):
+        # every track starts with the first ms of the recording
+        expected = np.repeat(np.r_[0, 0:100, 250:300], frames_per_ms)
+        np.testing.assert_array_equal(expected, self.read_speaker(0)[:, 0])
+        expected = np.repeat(np.r_[0, 100:250], frames_per_ms)
+        np.testing.assert_array_equal(expected, self.read_speaker(1)[:, 0])
+
+    def test_in_memory_waveform(self):
+        # 16 samples per ms, each ms holding its own index
+        wav = np.repeat(np.arange(1000), 16).astype(np.float32) / 32767
+        StoreDiarizedOutput(self.labelling, wav, 16000, self.output_dir)
+        self.assert_speakers(16)
+        tracks = assembleSpeakers(self.labelling, wav)
+        self.assertEqual(2, len(tracks))
+        np.testing.assert_array_equal(wav[:16], tracks[1][:16])
+        np.testing.assert_array_equal(wav[1600:4000], tracks[1][16:])
+
+    def test_memory_mapped_files(self):
+        path = os.path.join(self.temp_dir, "denoised.wav")
+        write_float_wav(path, np.repeat(np.arange(1000), 16) / 32767, 16000)
+        wav_file = WavFile(path)
+        self.assertTrue(wav_file.isFloat)
+        self.assertEqual((16000, 1), wav_file.frames.shape)
+        self.assertIsInstance(wav_file.frames, np.memmap)
+        StoreDiarizedOutput(self.labelling, folderPath=self.output_dir,
+                            wavPath=path)
+        self.assert_speakers(16)
+
+        # PCM frames keep their sample width and channels, here 24-bit
+        # samples holding 256 times the index of their ms
+        samples = np.repeat(np.arange(1000), 8) * 256
+        stereo = np.stack((samples, 2 * samples), axis=1)
+        raw = stereo.astype("<i4").view(np.uint8).reshape(-1, 4)[:, 1:]
+        writeWav(path, raw.tobytes(), 8000, 3, channels=2)
+        StoreDiarizedOutput(self.labelling, folderPath=self.output_dir,
+                            wavPath=path)
+        speaker = self.read_speaker(1)
+        expected = np.repeat(np.r_[0, 100:250], 8) * 256
+        np.testing.assert_array_equal(expected, speaker[:, 0])
+        np.testing.assert_array_equal(2 * expected, speaker[:, 1])
+
+    def test_invalid_file(self):
+        path = os.path.join(self.temp_dir, "not.wav")
+        with open(path, "wb") as outfile:
+            outfile.write(b"RIFF\0\0\0\0AVI ")
+        with pytest.raises(ValueError):
+            WavFile(path)
+
+    def test_same_as_pydub(self):
+        audio_segment = pytest.importorskip("pydub").AudioSegment
+        path = os.path.join(self.temp_dir, "denoised.wav")
+        rng = np.random.default_rng(0)
+        samples = rng.integers(-30000, 30000, 22050 * 3)
+        writeWav(path, samples.astype("<i2").tobytes(), 22050, 2)
+        times = np.sort(rng.uniform(0, 3.01, 40))
+        labelling = [(str(rng.integers(3)), start, stop)
+                     for start, stop in zip(times[:-1], times[1:])]
+        StoreDiarizedOutput(labelling, folderPath=self.output_dir,
+                            wavPath=path)
+
+        audio = audio_segment.from_wav(path)
+        speakers = {}
+        for x, y, z in labelling:
+            track = speakers.setdefault(x, audio[0])
+            speakers[x] = track + audio[(y * 1000):(z * 1000)]
+        for i, track in enumerate(speakers.values()):
+            self.assertEqual(track.raw_data, self.read_speaker(i).astype(
+                "<i2").tobytes())
@@ -1,12 +1,16 @@
+from concurrent.futures import ThreadPoolExecutor
 import os.path
 import pickle
+import shutil
 import sys
+import tempfile
 import unittest
 
 import pkg_resources
 import pytest
 
 from symspellpy import SymSpell, Verbosity
+from symspellpy.editdistance import DistanceAlgorithm
 from symspellpy.symspellpy import SuggestItem
 
 class TestSymSpellPy(unittest.TestCase):
@@ -49,6 +53,11 @@ class TestSymSpellPy(unittest.TestCase):
         self.assertEqual("count_threshold cannot be negative",
                          str(excinfo.value))
 
+    def test_negative_cache_size(self):
+        with pytest.raises(ValueError) as excinfo:
+            __ = SymSpell(1, 3, cache_size=-1)
+        self.assertEqual("cache_size cannot be negative", str(excinfo.value))
+
     def test_create_dictionary_entry_negative_count(self):
         sym_spell = SymSpell(1, 3)
         self.assertEqual(False, sym_spell.create_dictionary_entry("pipe", 0))
@@ -81,6 +90,10 @@ class TestSymSpellPy(unittest.TestCase):
         self.assertEqual("steamb", result[0].term)
         self.assertEqual(6, result[0].count)
         self.assertTrue(len(sym_spell.deletes))
+        self.assertEqual(["steama", "steamb", "steamc"],
+                         sym_spell.deletes["steam"])
+        self.assertEqual(["steamb"], sym_spell.deletes["steamb"])
+        self.assertNotIn("stream", sym_spell.deletes)
 
     def test_words_with_shared_prefix_should_retain_counts(self):
         sym_spell = SymSpell(1, 3)
@@ -196,6 +209,28 @@ class TestSymSpellPy(unittest.TestCase):
         result = sym_spell.lookup("flam", Verbosity.TOP, 0)
         self.assertEqual(0, len(result))
 
+    def test_lookup_fast_distance_algorithm(self):
+        query_path = os.path.join(self.fortests_path,
+                                  "noisy_query_en_1000.txt")
+        edit_distance_max = 2
+        prefix_length = 7
+        sym_spell = SymSpell(edit_distance_max, prefix_length)
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+        sym_spell_2 = SymSpell(edit_distance_max, prefix_length,
+                               distance_algorithm=
+                               DistanceAlgorithm.DAMERUAUOSA_FAST)
+        sym_spell_2.load_dictionary(self.dictionary_path, 0, 1)
+        with open(query_path, "r") as infile:
+            for line in infile:
+                phrase = line.split()[0]
+                for verbosity in Verbosity:
+                    expected = sym_spell.lookup(phrase, verbosity,
+                                                edit_distance_max)
+                    results = sym_spell_2.lookup(phrase, verbosity,
+                                                 edit_distance_max)
+                    self.assertEqual([str(s) for s in expected],
+                                     [str(s) for s in results])
+
     def test_lookup_max_edit_distance_too_large(self):
         sym_spell = SymSpell(2, 7, 10)
         sym_spell.create_dictionary_entry("flame", 20)
@@ -703,6 +738,51 @@ class TestSymSpellPy(unittest.TestCase):
         self.assertEqual(1, len(results))
         self.assertEqual(correction, results[0].term)
 
+    def test_lookup_compound_known_words_not_combined(self):
+        edit_distance_max = 2
+        prefix_length = 7
+        sym_spell = SymSpell(edit_distance_max, prefix_length)
+        sym_spell.create_dictionary_entry("in", 10)
+        sym_spell.create_dictionary_entry("to", 10)
+        sym_spell.create_dictionary_entry("into", 1000)
+
+        results = sym_spell.lookup_compound("in to", edit_distance_max)
+        self.assertEqual("in to", results[0].term)
+
+    def test_lookup_compound_executor(self):
+        edit_distance_max = 2
+        prefix_length = 7
+        sym_spell = SymSpell(edit_distance_max, prefix_length)
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+
+        typos = [
+            ("whereis th elove 123 hehad dated forImuch of THEPAST who "
+             "couqdn'tread in SIXTHgrade and ins pired him"),
+            "in te DHIRD 1 qarter oflast jear he hadlearned ofca sekretplan",
+            ("the bigjest playrs in te stroGSOmmer film slatew ith PLETY "
+             "of 12 funn"),
+            "the quick brown fox jumps over the lazy dog",
+            "teh",
+            ""]
+        with ThreadPoolExecutor(2) as executor:
+            for ignore_non_words in (False, True):
+                for typo in typos:
+                    sym_spell.replaced_words.clear()
+                    expected = sym_spell.lookup_compound(
+                        typo, edit_distance_max, ignore_non_words)
+                    replaced_words = dict(sym_spell.replaced_words)
+                    sym_spell.replaced_words.clear()
+                    results = sym_spell.lookup_compound(
+                        typo, edit_distance_max, ignore_non_words,
+                        executor=executor)
+                    self.assertEqual(1, len(results))
+                    self.assertEqual(expected[0].term, results[0].term)
+                    self.assertEqual(expected[0].distance,
+                                     results[0].distance)
+                    self.assertEqual(expected[0].count, results[0].count)
+                    self.assertEqual(replaced_words.keys(),
+                                     sym_spell.replaced_words.keys())
+
     def test_load_dictionary_encoding(self):
         dictionary_path = os.path.join(self.fortests_path, "non_en_dict.txt")
 
@@ -715,6 +795,25 @@ class TestSymSpellPy(unittest.TestCase):
         self.assertEqual(1, len(result))
         self.assertEqual("АБИ", result[0].term)
 
+    def test_correct_stream(self):
+        sym_spell = SymSpell(2, 7)
+        sym_spell.create_dictionary_entry("the", 100)
+        sym_spell.create_dictionary_entry("quick", 20)
+        sym_spell.create_dictionary_entry("fox", 10)
+
+        def lines():
+            yield "teh quikc fox\n"
+            yield "\n"
+            # the stream is consumed lazily
+            raise AssertionError("read past the requested lines")
+        corrections = sym_spell.correct_stream(lines())
+        self.assertEqual("the quick fox", next(corrections))
+        self.assertEqual("", next(corrections))
+
+        corrections = sym_spell.correct_stream(["QUIKC Fox"],
+                                               transfer_casing=True)
+        self.assertEqual(["QUICK Fox"], list(corrections))
+
     def test_word_segmentation(self):
         edit_distance_max = 0
         prefix_length = 7
@@ -773,6 +872,61 @@ class TestSymSpellPy(unittest.TestCase):
         result = sym_spell.word_segmentation(typo, edit_distance_max, 11)
         self.assertEqual(correction, result.corrected_string)
 
+    def test_word_segmentation_empty(self):
+        sym_spell = SymSpell(0, 7)
+        sym_spell.create_dictionary_entry("the", 10)
+        self.assertEqual(("", "", 0, 0.0), tuple(
+            sym_spell.word_segmentation("")))
+        self.assertEqual([], list(sym_spell.word_segmentation_stream("")))
+
+    def test_word_segmentation_stream(self):
+        edit_distance_max = 1
+        prefix_length = 7
+        sym_spell = SymSpell(edit_distance_max, prefix_length)
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+
+        typo = ("itwasthebestoftimes itwastheworstoftimesitwastheageofwisdom"
+                "itwastheageoffoolishness")
+        for max_segmentation_word_length in (None, 11):
+            expected = sym_spell.word_segmentation(
+                typo, max_segmentation_word_length=
+                max_segmentation_word_length)
+            # words do not depend on how the input is split into pieces
+            for size in (1, 7, len(typo)):
+                words = list(sym_spell.word_segmentation_stream(
+                    [typo[i : i + size] for i in range(0, len(typo), size)],
+                    max_segmentation_word_length=
+                    max_segmentation_word_length))
+                self.assertEqual(expected.segmented_string,
+                                 " ".join(w.segmented_string for w in words))
+                self.assertEqual(expected.corrected_string,
+                                 " ".join(w.corrected_string for w in words))
+                self.assertEqual(expected.distance_sum,
+                                 sum(w.distance_sum for w in words))
+                self.assertAlmostEqual(expected.log_prob_sum,
+                                       sum(w.log_prob_sum for w in words))
+
+    def test_word_segmentation_stream_is_lazy(self):
+        sym_spell = SymSpell(0, 7)
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+
+        def pieces():
+            yield "thequickbrownfoxjumpsover"
+            yield "thelazydog" * 2
+            raise AssertionError("read past the requested words")
+        words = sym_spell.word_segmentation_stream(pieces())
+        self.assertEqual(["the", "quick", "brown", "fox"],
+                         [next(words).corrected_string for __ in range(4)])
+
+    def test_word_segmentation_stream_window(self):
+        sym_spell = SymSpell(0, 7)
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+
+        typo = "thequickbrownfoxjumpsoverthelazydog" * 3
+        words = list(sym_spell.word_segmentation_stream(typo, window=4))
+        # committing early still covers the whole input in order
+        self.assertEqual(typo, "".join(w.segmented_string for w in words))
+
     def test_suggest_item(self):
         si_1 = SuggestItem("asdf", 12, 34)
         si_2 = SuggestItem("sdfg", 12, 34)
@@ -815,6 +969,55 @@ class TestSymSpellPy(unittest.TestCase):
                 num_lines += 1
         self.assertEqual(num_lines, sym_spell.word_count)
 
+    def test_create_dictionary_parallel_invalid_path(self):
+        sym_spell = SymSpell(2, 7)
+        self.assertEqual(False, sym_spell.create_dictionary_parallel(
+            [self.dictionary_path, "invalid/dictionary/path.txt"]))
+        self.assertEqual(0, sym_spell.word_count)
+
+    def test_create_dictionary_parallel(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            corpora = [os.path.join(temp_dir, "corpus_{}.txt".format(i))
+                       for i in range(2)]
+            with open(corpora[0], "w", encoding="utf-8") as outfile:
+                for i in range(200):
+                    outfile.write("The quick brown fox {} jumps over "
+                                  "the lazy dög's tail\n".format(i % 7))
+            with open(corpora[1], "w", encoding="utf-8") as outfile:
+                outfile.write("quick quack quick\nbrown fox")
+            for count_threshold in (1, 300):
+                sym_spell = SymSpell(2, 7, count_threshold)
+                for corpus in corpora:
+                    sym_spell.create_dictionary(corpus, encoding="utf-8")
+                for workers in (1, 2):
+                    sym_spell_2 = SymSpell(2, 7, count_threshold)
+                    # tiny shards split lines and multi-byte characters
+                    self.assertTrue(sym_spell_2.create_dictionary_parallel(
+                        corpora, workers=workers, encoding="utf-8",
+                        shard_size=50))
+                    self.assertEqual(sym_spell.words, sym_spell_2.words)
+                    self.assertEqual(sym_spell.below_threshold_words,
+                                     sym_spell_2.below_threshold_words)
+                    self.assertEqual(dict(sym_spell.deletes),
+                                     dict(sym_spell_2.deletes))
+                    self.assertEqual(sym_spell._max_length,
+                                     sym_spell_2._max_length)
+            self.assertEqual(400, sym_spell.words["the"])
+            self.assertEqual(202, sym_spell.below_threshold_words["quick"])
+            self.assertEqual(200, sym_spell.below_threshold_words["dög's"])
+
+            # merges with the words already loaded
+            sym_spell = SymSpell(2, 7, 300)
+            sym_spell.create_dictionary_entry("dög's", 150)
+            sym_spell.create_dictionary_parallel(corpora[0], workers=1,
+                                                 encoding="utf-8")
+            self.assertEqual(350, sym_spell.words["dög's"])
+            self.assertNotIn("dög's", sym_spell.below_threshold_words)
+            self.assertIn("dög's", sym_spell.deletes["dgs"])
+        finally:
+            shutil.rmtree(temp_dir)
+
     def test_pickle_uncompressed(self):
         pickle_path = os.path.join(self.fortests_path, "dictionary.pickle")
         is_compressed = False
@@ -874,6 +1077,229 @@ class TestSymSpellPy(unittest.TestCase):
         self.assertFalse(sym_spell.load_pickle(pickle_path, is_compressed))
         os.remove(pickle_path)
 
+    def test_index(self):
+        index_path = os.path.join(self.fortests_path, "dictionary.idx")
+        query_path = os.path.join(self.fortests_path,
+                                  "noisy_query_en_1000.txt")
+        edit_distance_max = 2
+        prefix_length = 7
+        sym_spell = SymSpell(edit_distance_max, prefix_length)
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+        sym_spell.save_index(index_path)
+
+        sym_spell_2 = SymSpell(edit_distance_max, prefix_length)
+        self.assertTrue(sym_spell_2.load_index(index_path))
+        self.assertEqual(sym_spell.words, dict(sym_spell_2.words.items()))
+        self.assertEqual(sym_spell._max_length, sym_spell_2._max_length)
+        with open(query_path, "r") as infile:
+            for line in infile:
+                phrase = line.split()[0]
+                for verbosity in Verbosity:
+                    expected = sym_spell.lookup(phrase, verbosity,
+                                                edit_distance_max)
+                    results = sym_spell_2.lookup(phrase, verbosity,
+                                                 edit_distance_max)
+                    self.assertEqual([str(s) for s in expected],
+                                     [str(s) for s in results])
+        typo = "thequickbrownfoxjumpsoverthelazydog"
+        self.assertEqual(sym_spell.word_segmentation(typo),
+                         sym_spell_2.word_segmentation(typo))
+        os.remove(index_path)
+
+    def test_memory_usage(self):
+        sym_spell = SymSpell(2, 7)
+        empty_size = sym_spell.memory_usage()
+        self.assertGreater(empty_size, 0)
+        sym_spell.create_dictionary_entry("steama", 4)
+        small_size = sym_spell.memory_usage()
+        self.assertGreater(small_size, empty_size)
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+        self.assertGreater(sym_spell.memory_usage(), small_size * 100)
+
+        index_path = os.path.join(self.fortests_path, "memory_usage.idx")
+        sym_spell.save_index(index_path)
+        sym_spell_2 = SymSpell(2, 7)
+        self.assertTrue(sym_spell_2.load_index(index_path))
+        # the mapped tables count with the size of the file
+        self.assertGreaterEqual(sym_spell_2.memory_usage(),
+                                os.path.getsize(index_path))
+        del sym_spell_2
+        os.remove(index_path)
+
+    def test_index_bloom_filter(self):
+        index_path = os.path.join(self.fortests_path, "dictionary.idx")
+        bloom_path = os.path.join(self.fortests_path, "dictionary_bloom.idx")
+        query_path = os.path.join(self.fortests_path,
+                                  "noisy_query_en_1000.txt")
+        edit_distance_max = 2
+        prefix_length = 7
+        sym_spell = SymSpell(edit_distance_max, prefix_length)
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+        sym_spell.save_index(index_path)
+        sym_spell.save_index(bloom_path, bloom_error_rate=0.01)
+
+        sym_spell_2 = SymSpell(edit_distance_max, prefix_length)
+        self.assertTrue(sym_spell_2.load_index(index_path))
+        sym_spell_3 = SymSpell(edit_distance_max, prefix_length)
+        self.assertTrue(sym_spell_3.load_index(bloom_path))
+        self.assertEqual(sym_spell.deletes["steam"],
+                         sym_spell_3.deletes["steam"])
+        self.assertFalse("stxm" in sym_spell_3.deletes)
+        with open(query_path, "r") as infile:
+            for line in infile:
+                phrase = line.split()[0]
+                for verbosity in Verbosity:
+                    expected = sym_spell_2.lookup(phrase, verbosity,
+                                                  edit_distance_max)
+                    results = sym_spell_3.lookup(phrase, verbosity,
+                                                 edit_distance_max)
+                    self.assertEqual([str(s) for s in expected],
+                                     [str(s) for s in results])
+
+        # updates drop the mapped index and its filter
+        sym_spell_3.create_dictionary_entry("stxmx", 10)
+        self.assertEqual(["stxmx"], sym_spell_3.deletes["stxm"])
+        del sym_spell_2, sym_spell_3
+        os.remove(index_path)
+        os.remove(bloom_path)
+
+    def test_index_bigrams_and_updates(self):
+        index_path = os.path.join(self.fortests_path, "dictionary.idx")
+        bigram_path = os.path.join(self.fortests_path, "bad_dict.txt")
+        sym_spell = SymSpell()
+        sym_spell.create_dictionary_entry("steama", 4)
+        sym_spell.create_dictionary_entry("steamb", 6)
+        sym_spell.create_dictionary_entry("steamc", 2)
+        sym_spell.load_bigram_dictionary(bigram_path, 0, 2)
+        sym_spell.save_index(index_path)
+
+        sym_spell_2 = SymSpell()
+        self.assertTrue(sym_spell_2.load_index(index_path))
+        self.assertEqual(sym_spell.bigrams, dict(sym_spell_2.bigrams.items()))
+        self.assertEqual(sym_spell.bigram_count_min,
+                         sym_spell_2.bigram_count_min)
+        self.assertEqual(6, sym_spell_2._max_length)
+        self.assertEqual(sym_spell.deletes["steam"],
+                         sym_spell_2.deletes["steam"])
+        self.assertFalse("stxm" in sym_spell_2.deletes)
+
+        # updates after loading switch back to in-memory tables
+        sym_spell_2.create_dictionary_entry("steamd", 10)
+        result = sym_spell_2.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamd", result[0].term)
+        self.assertTrue(sym_spell_2.delete_dictionary_entry("steamd"))
+        result = sym_spell_2.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamb", result[0].term)
+        os.remove(index_path)
+
+    def test_index_invalid(self):
+        index_path = os.path.join(self.fortests_path, "dictionary.idx")
+        sym_spell = SymSpell(2, 7)
+        sym_spell.create_dictionary_entry("steama", 4)
+        sym_spell.save_index(index_path)
+
+        sym_spell_2 = SymSpell(1, 7)
+        self.assertFalse(sym_spell_2.load_index(index_path))
+        sym_spell_2 = SymSpell(2, 6)
+        self.assertFalse(sym_spell_2.load_index(index_path))
+        os.remove(index_path)
+
+        with open(index_path, "wb") as f:
+            f.write(b"not an index file")
+        with pytest.raises(ValueError) as excinfo:
+            sym_spell.load_index(index_path)
+        self.assertEqual("Not a compact index file", str(excinfo.value))
+        os.remove(index_path)
+
+    def test_lookup_cache(self):
+        sym_spell = SymSpell(2, 7, cache_size=2)
+        self.assertEqual(dict(), SymSpell().cache_info())
+        sym_spell.create_dictionary_entry("steama", 4)
+        sym_spell.create_dictionary_entry("steamb", 6)
+        sym_spell.create_dictionary_entry("steamc", 2)
+        result = sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual(1, len(result))
+        # modifying a result does not modify the cached result
+        result[0].term = "modified"
+        result = sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamb", result[0].term)
+        # the default max_edit_distance shares the cached result
+        result = sym_spell.lookup("stream", Verbosity.TOP)
+        self.assertEqual("steamb", result[0].term)
+        result = sym_spell.lookup("stream", Verbosity.CLOSEST, 2)
+        self.assertEqual(3, len(result))
+        info = sym_spell.cache_info()["lookup"]
+        self.assertEqual((2, 2, 0, 2), info[:4])
+        sym_spell.lookup("steamx", Verbosity.TOP, 2)
+        self.assertEqual(1, sym_spell.cache_info()["lookup"].evictions)
+
+        sym_spell.clear_cache()
+        self.assertEqual((0, 0, 0, 2, 0),
+                         tuple(sym_spell.cache_info()["lookup"]))
+
+    def test_lookup_cache_invalidation(self):
+        sym_spell = SymSpell(2, 7, cache_size=10)
+        sym_spell.create_dictionary_entry("steama", 4)
+        sym_spell.create_dictionary_entry("steamb", 6)
+        result = sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamb", result[0].term)
+
+        sym_spell.create_dictionary_entry("steama", 10)
+        result = sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steama", result[0].term)
+        self.assertEqual(14, result[0].count)
+
+        sym_spell.delete_dictionary_entry("steama")
+        result = sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("steamb", result[0].term)
+
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+        result = sym_spell.lookup("stream", Verbosity.TOP, 2)
+        self.assertEqual("stream", result[0].term)
+        self.assertEqual(0, sym_spell.cache_info()["lookup"].hits)
+
+    def test_lookup_compound_cache(self):
+        sym_spell = SymSpell(2, 7, cache_size=10)
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+        sym_spell.load_bigram_dictionary(self.bigram_path, 0, 2)
+
+        typo = "whereis th elove hehad dated"
+        results = sym_spell.lookup_compound(typo, 2)
+        self.assertEqual("the", sym_spell.replaced_words["th"].term)
+
+        sym_spell.replaced_words.clear()
+        results_2 = sym_spell.lookup_compound(typo, 2)
+        self.assertEqual(str(results[0]), str(results_2[0]))
+        # cached results still record the replaced words
+        self.assertEqual("the", sym_spell.replaced_words["th"].term)
+        self.assertEqual(1, sym_spell.cache_info()["lookup_compound"].hits)
+
+        results = sym_spell.lookup_compound(typo, 2, transfer_casing=True)
+        self.assertEqual(2, sym_spell.cache_info()["lookup_compound"].misses)
+
+        bigram_path = os.path.join(self.fortests_path, "bad_dict.txt")
+        sym_spell.load_bigram_dictionary(bigram_path, 0, 2)
+        sym_spell.lookup_compound(typo, 2)
+        self.assertEqual(3, sym_spell.cache_info()["lookup_compound"].misses)
+
+    def test_word_segmentation_cache(self):
+        sym_spell = SymSpell(0, 7, cache_size=10)
+        sym_spell.load_dictionary(self.dictionary_path, 0, 1)
+
+        typo = "thequickbrownfoxjumpsoverthelazydog"
+        correction = "the quick brown fox jumps over the lazy dog"
+        result = sym_spell.word_segmentation(typo)
+        self.assertEqual(correction, result.corrected_string)
+        self.assertIs(result, sym_spell.word_segmentation(typo))
+        self.assertIsNot(result, sym_spell.word_segmentation(typo, 0, 11))
+        self.assertEqual((1, 2),
+                         sym_spell.cache_info()["word_segmentation"][:2])
+
+        sym_spell.create_dictionary_entry("thequick", 10 ** 12)
+        result = sym_spell.word_segmentation(typo)
+        self.assertEqual("thequick brown fox jumps over the lazy dog",
+                         result.corrected_string)
+
     def test_delete_dictionary_entry(self):
         sym_spell = SymSpell()
         sym_spell.create_dictionary_entry("stea", 1)
@@ -916,6 +1342,24 @@ class TestSymSpellPy(unittest.TestCase):
         self.assertEqual("steama", result[0].term)
         self.assertEqual(len("steama"), sym_spell._max_length)
 
+    def test_delete_dictionary_entry_add_again(self):
+        sym_spell = SymSpell()
+        sym_spell.create_dictionary_entry("steama", 2)
+        sym_spell.create_dictionary_entry("steamb", 3)
+
+        self.assertTrue(sym_spell.delete_dictionary_entry("steama"))
+        self.assertEqual(["steamb"], sym_spell.deletes["steam"])
+        self.assertTrue(sym_spell.delete_dictionary_entry("steamb"))
+        self.assertNotIn("steam", sym_spell.deletes)
+        self.assertEqual(0, len(sym_spell.deletes))
+
+        self.assertTrue(sym_spell.create_dictionary_entry("steama", 5))
+        self.assertEqual(["steama"], sym_spell.deletes["steam"])
+        result = sym_spell.lookup("steamx", Verbosity.TOP, 2)
+        self.assertEqual(1, len(result))
+        self.assertEqual("steama", result[0].term)
+        self.assertEqual(5, result[0].count)
+
     def test_lookup_transfer_casing(self):
         sym_spell = SymSpell()
         sym_spell.create_dictionary_entry("steam", 4)
@@ -0,0 +1,136 @@
+import os
+import os.path
+import shutil
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import pytest
+
+from com_in_ineuron_ai_service.jobQueue import Job
+from com_in_ineuron_ai_service.transcriptCache import (
+    TranscriptCache, pcmKey, recordingKey)
+from com_in_ineuron_ai_speech_to_text.silenceDetector import writeWav
+
+def write_recording(path, seconds_list, frequency=440, last_frequency=None):
+    silence = np.zeros(16000)
+    parts = [silence]
+    for i, seconds in enumerate(seconds_list):
+        if i == len(seconds_list) - 1 and last_frequency is not None:
+            frequency = last_frequency
+        time_axis = np.arange(seconds * 16000) / 16000
+        parts += [np.sin(2 * np.pi * frequency * time_axis) * 16000, silence]
+    writeWav(path, np.concatenate(parts).astype(np.int16).tobytes(), 16000, 2)
+
+class TestTranscriptCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, "cache")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_keys(self):
+        self.assertEqual(pcmKey(b"\1\2", 16000, 2), pcmKey(b"\1\2", 16000, 2))
+        self.assertNotEqual(pcmKey(b"\1\2", 16000, 2),
+                            pcmKey(b"\1\2", 8000, 2))
+        path = os.path.join(self.temp_dir, "a.wav")
+        other_path = os.path.join(self.temp_dir, "b.wav")
+        write_recording(path, (1,))
+        write_recording(other_path, (1,))
+        params = {"min_silence_len": 500}
+        self.assertEqual(recordingKey(path, params),
+                         recordingKey(other_path, params))
+        self.assertNotEqual(recordingKey(path, params),
+                            recordingKey(path, {"min_silence_len": 400}))
+        write_recording(other_path, (1,), frequency=220)
+        self.assertNotEqual(recordingKey(path, params),
+                            recordingKey(other_path, params))
+
+    def test_get_and_put(self):
+        cache = TranscriptCache(self.cache_dir)
+        self.assertIsNone(cache.get("chunk", "abc"))
+        cache.put("chunk", "abc", {"text": None})
+        cache.put("result", "abc", {"text": "été"})
+        self.assertEqual({"text": None}, cache.get("chunk", "abc"))
+        self.assertEqual(2, len(cache))
+        # entries survive a restart
+        cache = TranscriptCache(self.cache_dir)
+        self.assertEqual({"text": "été"}, cache.get("result", "abc"))
+        cache.clear()
+        self.assertEqual(0, len(cache))
+        self.assertEqual([], os.listdir(self.cache_dir))
+
+    def test_lru_eviction(self):
+        cache = TranscriptCache(self.cache_dir, maxBytes=100)
+        for key in ("a", "b", "c"):
+            cache.put("chunk", key, "x" * 20)
+            # distinct modification times for the order after a restart
+            time.sleep(0.01)
+        self.assertEqual(3, len(cache))
+        cache.get("chunk", "a")
+        cache.put("chunk", "d", "x" * 20)
+        self.assertIsNone(cache.get("chunk", "b"))
+        time.sleep(0.01)
+        self.assertIsNotNone(cache.get("chunk", "a"))
+        self.assertLessEqual(cache.totalBytes, 100)
+        cache = TranscriptCache(self.cache_dir, maxBytes=70)
+        cache.put("chunk", "e", "x")
+        # "a" was used after "d" was stored
+        self.assertEqual(["chunk-a.json", "chunk-e.json"],
+                         sorted(os.listdir(self.cache_dir)))
+        # a damaged entry is a miss
+        with open(os.path.join(self.cache_dir, "chunk-e.json"), "w") as outfile:
+            outfile.write("{")
+        self.assertIsNone(cache.get("chunk", "e"))
+        self.assertEqual(1, len(cache))
+
+    def test_cached_recognizer(self):
+        calls = []
+
+        def recognizer(pcm_data, sample_rate, sample_width):
+            calls.append(pcm_data)
+            return "speech" if pcm_data else None
+
+        cached = TranscriptCache(self.cache_dir).recognizer(recognizer)
+        for pcm_data in (b"\1\2", b"", b"\1\2", b""):
+            cached(pcm_data, 16000, 2)
+        self.assertEqual([b"\1\2", b""], calls)
+        self.assertEqual(2, cached.hits)
+        self.assertEqual("speech", cached(b"\1\2", 16000, 2))
+
+    def test_transcript_jobs(self):
+        pytest.importorskip("speech_recognition")
+        from com_in_ineuron_ai_service.transcriptJobs import (
+            TranscriptJobRunner)
+        from test.test_transcript_generator import LengthRecognizer
+
+        cache = TranscriptCache(self.cache_dir)
+        recognizer = LengthRecognizer()
+        runner = TranscriptJobRunner(str.upper, str.split, "chunks",
+                                     recognizer=recognizer, cache=cache)
+        path = os.path.join(self.temp_dir, "ad.wav")
+        write_recording(path, (3, 4))
+        first = Job(path)
+        result = runner(first)
+        self.assertEqual(2, recognizer.calls)
+        self.assertEqual(0, first.progress["cachedChunks"])
+
+        # the same audio again is not processed at all
+        second = Job(path)
+        self.assertEqual(result, runner(second))
+        self.assertEqual(2, recognizer.calls)
+        self.assertTrue(second.progress["cached"])
+        self.assertEqual(2, second.progress["chunks"])
+
+        # of a recording sharing chunks, only the new ones are recognized;
+        # the silence threshold depends on the loudness of the whole
+        # recording, which is the same here
+        write_recording(path, (3, 4), last_frequency=220)
+        third = Job(path)
+        result = runner(third)
+        self.assertEqual(3, recognizer.calls)
+        self.assertEqual(1, third.progress["cachedChunks"])
+        self.assertEqual(["Chunk of 4 seconds. ", "Chunk of 5 seconds. "],
+                         list(result["inputFileTranscriptedOp"].values()))
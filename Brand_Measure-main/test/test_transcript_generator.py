@@ -0,0 +1,83 @@
+import os
+import os.path
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+import pytest
+
+import numpy as np
+
+pytest.importorskip("speech_recognition")
+
+from com_in_ineuron_ai_speech_to_text.silenceDetector import writeWav
+from com_in_ineuron_ai_speech_to_text.transcriptGenerator import (
+    generateTranscript)
+
+class LengthRecognizer(object):
+    """Local stand-in engine: names each chunk after its length, and
+    answers the first chunks last."""
+    def __init__(self):
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, pcm_data, sample_rate, sample_width):
+        with self.lock:
+            self.calls += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        seconds = len(pcm_data) / sample_rate / sample_width
+        time.sleep(max(0.0, 0.6 - seconds / 10))
+        with self.lock:
+            self.active -= 1
+        if seconds < 2.5:
+            return None
+        return "chunk of {} seconds".format(round(seconds))
+
+class TestTranscriptGenerator(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.wav_path = os.path.join(self.temp_dir, "input.wav")
+        silence = np.zeros(16000)
+        parts = [silence]
+        for seconds in (2, 3, 1, 4):
+            time_axis = np.arange(seconds * 16000) / 16000
+            parts += [np.sin(2 * np.pi * 440 * time_axis) * 16000, silence]
+        samples = np.concatenate(parts).astype(np.int16)
+        writeWav(self.wav_path, samples.tobytes(), 16000, 2)
+        self.folder_path = os.path.join(self.temp_dir, "chunks")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_chunk_order(self):
+        recognizer = LengthRecognizer()
+        text_map = generateTranscript(self.wav_path, self.folder_path,
+                                      recognizer=recognizer, maxWorkers=2)
+        self.assertEqual(4, recognizer.calls)
+        self.assertLessEqual(recognizer.max_active, 2)
+        # the chunk without speech is left out, the others keep their
+        # order and names
+        self.assertEqual(
+            [(os.path.join(self.folder_path, "speech_chunk1.wav"),
+              "Chunk of 3 seconds. "),
+             (os.path.join(self.folder_path, "speech_chunk2.wav"),
+              "Chunk of 4 seconds. "),
+             (os.path.join(self.folder_path, "speech_chunk4.wav"),
+              "Chunk of 5 seconds. ")],
+            list(text_map.items()))
+        self.assertFalse(os.path.exists(self.folder_path))
+
+    def test_export_chunks(self):
+        text_map = generateTranscript(self.wav_path, self.folder_path,
+                                      recognizer=LengthRecognizer(),
+                                      exportChunks=True)
+        self.assertEqual(["speech_chunk{}.wav".format(i)
+                          for i in range(1, 5)],
+                         sorted(os.listdir(self.folder_path)))
+        for chunk_name in text_map:
+            self.assertTrue(os.path.exists(chunk_name))
@@ -0,0 +1,7 @@
+"""Benchmarks of the vendored symspellpy package.
+
+The scripts in this package run from a checkout, either as
+``python benchmarks/<script>.py`` or as ``python -m benchmarks.<script>``
+from the project root. :mod:`benchmarks.suite` runs the full suite and
+writes its results as JSON.
+"""
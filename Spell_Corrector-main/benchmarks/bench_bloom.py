@@ -0,0 +1,143 @@
+"""
+Benchmark :meth:`SymSpell.lookup` on a memory-mapped index with and
+without a Bloom filter over its deletes.
+
+Usage::
+
+    python benchmarks/bench_bloom.py [--queries N]
+        [--error-rates 0.1 0.01 0.001]
+
+Reports lookups/s per verbosity on misspellings at distance 1 to 3
+(best of `--repeat` runs), the time per probe of the deletes those
+lookups make, the size of each filter and its measured false positive
+rate. The in-memory dict the index is saved from is included for
+comparison.
+"""
+import argparse
+import os
+import os.path
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from benchmarks import fixtures
+from symspellpy import SymSpell, Verbosity
+
+class _RecordingDeletes(object):
+    """Stand-in for SymSpell._deletes that records the probed keys."""
+    def __init__(self, deletes):
+        self.deletes = deletes
+        self.probes = list()
+
+    def get(self, key, default=None):
+        self.probes.append(key)
+        return self.deletes.get(key, default)
+
+def probed_deletes(sym_spell, queries):
+    recorder = _RecordingDeletes(sym_spell._deletes)
+    sym_spell._deletes = recorder
+    try:
+        for verbosity in (Verbosity.TOP, Verbosity.ALL):
+            for query in queries:
+                sym_spell.lookup(query, verbosity, 2)
+    finally:
+        sym_spell._deletes = recorder.deletes
+    return recorder.probes
+
+def best_time(func, repeat):
+    times = list()
+    for __ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def lookups_per_second(sym_spell, queries, verbosity, repeat):
+    def run():
+        for query in queries:
+            sym_spell.lookup(query, verbosity, 2)
+    return len(queries) / best_time(run, repeat)
+
+def probe_us(sym_spell, probes, repeat):
+    deletes = sym_spell._deletes
+    def run():
+        for key in probes:
+            deletes.get(key)
+    return best_time(run, repeat) / len(probes) * 1e6
+
+def false_positive_rate(deletes, num_probes=100000, seed=0):
+    """Measure the filter on random strings that are not deletes."""
+    rng = random.Random(seed)
+    bloom = deletes._bloom
+    probes = 0
+    false_positives = 0
+    while probes < num_probes:
+        key = "".join(rng.choice("abcdefghijklmnopqrstuvwxyz")
+                      for __ in range(rng.randint(3, 7)))
+        if key in deletes:
+            continue
+        probes += 1
+        if key in bloom:
+            false_positives += 1
+    return false_positives / probes
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--queries", type=int, default=300,
+                        help="queries per edit distance")
+    parser.add_argument("--error-rates", nargs="+", type=float,
+                        default=[0.1, 0.01, 0.001])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    words = fixtures.load_words(30000)
+    queries = [typo for distance, pairs
+               in fixtures.lookup_queries(words, args.queries,
+                                          (1, 2, 3)).items()
+               for typo, __ in pairs]
+    sym_spell = SymSpell(2, 7)
+    sym_spell.load_dictionary(fixtures.DICTIONARY_PATH, 0, 1)
+    probes = probed_deletes(sym_spell, queries)
+    num_misses = sum(key not in sym_spell._deletes for key in probes)
+    print("{} queries, {} deletes, {} probes, {:.0%} misses".format(
+        len(queries), len(sym_spell.deletes), len(probes),
+        num_misses / len(probes)))
+    row = "{:<14} {:>9} {:>8} {:>9} {:>10} {:>10}"
+    print(row.format("index", "filter KB", "FP rate", "probe us", "TOP/s",
+                     "ALL/s"))
+    print(row.format(
+        "in-memory", "-", "-",
+        "{:.2f}".format(probe_us(sym_spell, probes, args.repeat)),
+        "{:.0f}".format(lookups_per_second(sym_spell, queries,
+                                           Verbosity.TOP, args.repeat)),
+        "{:.0f}".format(lookups_per_second(sym_spell, queries,
+                                           Verbosity.ALL, args.repeat))))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for error_rate in [None] + args.error_rates:
+            filename = os.path.join(temp_dir, "{}.idx".format(error_rate))
+            sym_spell.save_index(filename, error_rate)
+            mapped = SymSpell(2, 7)
+            mapped.load_index(filename)
+            if error_rate is None:
+                name, size, rate = "mmap", "-", "-"
+            else:
+                name = "mmap+{:g}".format(error_rate)
+                size = "{:.0f}".format(
+                    len(mapped._deletes._bloom.bits) / 1024)
+                rate = "{:.4f}".format(
+                    false_positive_rate(mapped._deletes))
+            print(row.format(
+                name, size, rate,
+                "{:.2f}".format(probe_us(mapped, probes, args.repeat)),
+                "{:.0f}".format(lookups_per_second(
+                    mapped, queries, Verbosity.TOP, args.repeat)),
+                "{:.0f}".format(lookups_per_second(
+                    mapped, queries, Verbosity.ALL, args.repeat))))
+            # release the mapping before the directory is removed
+            del mapped
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark :meth:`SymSpell.create_dictionary_parallel` against
+:meth:`SymSpell.create_dictionary` for an increasing number of worker
+processes.
+
+Usage::
+
+    python benchmarks/bench_create_dictionary.py [corpus ...]
+        [--workers 1 2 4 8] [--shard-size BYTES]
+
+Without a corpus, a synthetic corpus is generated from the bundled
+frequency dictionary.
+"""
+import argparse
+import os
+import os.path
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from symspellpy import SymSpell
+
+DICTIONARY_PATH = os.path.join(os.path.dirname(__file__), "..", "symspellpy",
+                               "frequency_dictionary_en_82_765.txt")
+
+def make_corpus(filename, num_lines, words_per_line=12, vocabulary=30000,
+                seed=0):
+    with open(DICTIONARY_PATH, "r") as infile:
+        words = [line.split()[0] for __, line in zip(range(vocabulary),
+                                                     infile)]
+    rng = random.Random(seed)
+    with open(filename, "w") as outfile:
+        for __ in range(num_lines):
+            outfile.write(" ".join(rng.choice(words)
+                                   for __ in range(words_per_line)))
+            outfile.write("\n")
+
+def time_build(build):
+    sym_spell = SymSpell(2, 7)
+    start = time.perf_counter()
+    build(sym_spell)
+    return time.perf_counter() - start, sym_spell
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("corpora", nargs="*")
+    parser.add_argument("--workers", nargs="+", type=int,
+                        default=[1, 2, 4, 8])
+    parser.add_argument("--shard-size", type=int, default=2 ** 24)
+    parser.add_argument("--lines", type=int, default=200000,
+                        help="lines of the synthetic corpus")
+    args = parser.parse_args()
+
+    temp_dir = None
+    corpora = args.corpora
+    if not corpora:
+        temp_dir = tempfile.TemporaryDirectory()
+        corpora = [os.path.join(temp_dir.name, "corpus.txt")]
+        make_corpus(corpora[0], args.lines)
+    size = sum(os.path.getsize(corpus) for corpus in corpora)
+    print("corpus: {:.1f} MB, {} CPUs".format(size / 2 ** 20,
+                                              os.cpu_count()))
+
+    def build_sequential(sym_spell):
+        for corpus in corpora:
+            sym_spell.create_dictionary(corpus)
+    baseline, reference = time_build(build_sequential)
+    print("{:>16} {:>9.2f}s".format("create_dictionary", baseline))
+    for workers in args.workers:
+        elapsed, sym_spell = time_build(
+            lambda s: s.create_dictionary_parallel(
+                corpora, workers=workers, shard_size=args.shard_size))
+        assert sym_spell.words == reference.words
+        print("{:>8} workers {:>9.2f}s  speedup {:.2f}x".format(
+            workers, elapsed, baseline / elapsed))
+    if temp_dir is not None:
+        temp_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
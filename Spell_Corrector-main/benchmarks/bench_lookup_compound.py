@@ -0,0 +1,86 @@
+"""
+Benchmark :meth:`SymSpell.lookup_compound` on clean and on noisy text,
+with and without a thread pool correcting the spans between known
+words concurrently.
+
+Usage::
+
+    python benchmarks/bench_lookup_compound.py [--sentences N]
+        [--noise 0.0 0.1 0.3] [--threads 0 2 4]
+
+The sentences are drawn from the bundled frequency dictionary; a
+fraction `noise` of their words is misspelled by a random deletion,
+insertion, substitution or by merging it with the next word.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import os
+import os.path
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from symspellpy import SymSpell
+
+DICTIONARY_PATH = os.path.join(os.path.dirname(__file__), "..", "symspellpy",
+                               "frequency_dictionary_en_82_765.txt")
+
+def misspell(word, rng):
+    i = rng.randrange(len(word))
+    edit = rng.randrange(3)
+    if edit == 0 and len(word) > 1:
+        return word[: i] + word[i + 1 :]
+    if edit == 1:
+        return word[: i] + rng.choice(string.ascii_lowercase) + word[i :]
+    return word[: i] + rng.choice(string.ascii_lowercase) + word[i + 1 :]
+
+def make_sentences(num_sentences, noise, words_per_sentence=12,
+                   vocabulary=20000, seed=0):
+    with open(DICTIONARY_PATH, "r") as infile:
+        words = [line.split()[0] for __, line in zip(range(vocabulary),
+                                                     infile)]
+    rng = random.Random(seed)
+    sentences = list()
+    for __ in range(num_sentences):
+        terms = [rng.choice(words) for __ in range(words_per_sentence)]
+        noisy = list()
+        for term in terms:
+            if rng.random() >= noise:
+                noisy.append(term)
+            elif rng.random() < 0.2 and noisy:
+                noisy[-1] += term
+            else:
+                noisy.append(misspell(term, rng))
+        sentences.append(" ".join(noisy))
+    return sentences
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sentences", type=int, default=500)
+    parser.add_argument("--noise", nargs="+", type=float,
+                        default=[0.0, 0.1, 0.3])
+    parser.add_argument("--threads", nargs="+", type=int, default=[0, 4],
+                        help="thread pool sizes, 0 for no executor")
+    args = parser.parse_args()
+
+    sym_spell = SymSpell(2, 7)
+    sym_spell.load_dictionary(DICTIONARY_PATH, 0, 1)
+    print("{} CPUs".format(os.cpu_count()))
+    for noise in args.noise:
+        sentences = make_sentences(args.sentences, noise)
+        for threads in args.threads:
+            executor = ThreadPoolExecutor(threads) if threads else None
+            start = time.perf_counter()
+            for sentence in sentences:
+                sym_spell.lookup_compound(sentence, 2, executor=executor)
+            elapsed = time.perf_counter() - start
+            if executor is not None:
+                executor.shutdown()
+            print("noise {:.2f} threads {:>2} {:>9.1f} sentences/s".format(
+                noise, threads, len(sentences) / elapsed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Reproducible benchmark inputs built from the bundled frequency
+dictionary.
+
+Every fixture is derived from the first `vocabulary` words of
+``frequency_dictionary_en_82_765.txt`` and a seeded random generator, so
+the same arguments give the same inputs on every machine and commit.
+:func:`fingerprint` summarizes the inputs so result files can tell
+whether they were measured on the same fixtures.
+"""
+import hashlib
+import os.path
+import random
+import string
+
+from symspellpy.editdistance import DistanceAlgorithm, EditDistance
+
+DICTIONARY_PATH = os.path.join(os.path.dirname(__file__), "..", "symspellpy",
+                               "frequency_dictionary_en_82_765.txt")
+
+def load_words(vocabulary=None):
+    """Read the terms of the frequency dictionary, most frequent
+    first.
+
+    Parameters
+    ----------
+    vocabulary : int, optional
+        The number of terms to read, all of them if omitted.
+
+    Returns
+    -------
+    list of str
+        The terms.
+    """
+    words = list()
+    with open(DICTIONARY_PATH, "r") as infile:
+        for line in infile:
+            if vocabulary is not None and len(words) >= vocabulary:
+                break
+            words.append(line.split()[0])
+    return words
+
+def misspell(word, distance, rng, max_tries=100):
+    """Apply random edits to `word` until its Damerau-OSA distance to
+    `word` is exactly `distance`.
+
+    Parameters
+    ----------
+    word : str
+        The correctly spelled word.
+    distance : int
+        The number of edits.
+    rng : random.Random
+        The random generator.
+    max_tries : int, optional
+        Number of attempts before giving up, edits can cancel out.
+
+    Returns
+    -------
+    str
+        The misspelled word, or None if no misspelling was found.
+    """
+    comparer = EditDistance(DistanceAlgorithm.DAMERUAUOSA)
+    for __ in range(max_tries):
+        typo = word
+        for __ in range(distance):
+            typo = _random_edit(typo, rng)
+        if comparer.compare(word, typo, distance) == distance:
+            return typo
+    return None
+
+def _random_edit(word, rng):
+    edit = rng.randrange(4)
+    i = rng.randrange(len(word) + 1)
+    if edit == 0 or not word:
+        # insertion
+        return word[: i] + rng.choice(string.ascii_lowercase) + word[i :]
+    i = min(i, len(word) - 1)
+    if edit == 1 and len(word) > 1:
+        # deletion
+        return word[: i] + word[i + 1 :]
+    if edit == 2 and i + 1 < len(word):
+        # transposition of adjacent characters
+        return word[: i] + word[i + 1] + word[i] + word[i + 2 :]
+    # substitution
+    return word[: i] + rng.choice(string.ascii_lowercase) + word[i + 1 :]
+
+def lookup_queries(words, num_queries, distances=(0, 1, 2, 3), seed=0):
+    """Pick words and misspell them at each distance.
+
+    Parameters
+    ----------
+    words : list of str
+        The words to draw from.
+    num_queries : int
+        The number of queries per distance.
+    distances : iterable of int, optional
+        The edit distances of the misspellings, 0 for correct words.
+    seed : int, optional
+        The seed of the random generator.
+
+    Returns
+    -------
+    dict
+        The list of (query, correct word) pairs for each distance.
+    """
+    rng = random.Random(seed)
+    queries = dict()
+    for distance in distances:
+        pairs = list()
+        while len(pairs) < num_queries:
+            word = rng.choice(words)
+            # short words have few distinct misspellings
+            if len(word) <= distance:
+                continue
+            typo = misspell(word, distance, rng)
+            if typo is not None:
+                pairs.append((typo, word))
+        queries[distance] = pairs
+    return queries
+
+def sentences(words, num_sentences, words_per_sentence=12, noise=0.2,
+              seed=0):
+    """Build sentences of random words, some of them misspelled at
+    distance 1 or 2 or merged with the next word.
+
+    Returns
+    -------
+    list of str
+        The sentences.
+    """
+    rng = random.Random(seed)
+    result = list()
+    for __ in range(num_sentences):
+        terms = list()
+        for __ in range(words_per_sentence):
+            word = rng.choice(words)
+            if rng.random() < noise:
+                if terms and rng.random() < 0.2:
+                    terms[-1] += word
+                    continue
+                word = misspell(word, rng.randint(1, 2), rng) or word
+            terms.append(word)
+        result.append(" ".join(terms))
+    return result
+
+def unsegmented(words, num_phrases, words_per_phrase=8, seed=0):
+    """Build phrases of random words without spaces for
+    :meth:`.symspellpy.SymSpell.word_segmentation`.
+
+    Returns
+    -------
+    list of str
+        The phrases.
+    """
+    rng = random.Random(seed)
+    return ["".join(rng.choice(words) for __ in range(words_per_phrase))
+            for __ in range(num_phrases)]
+
+def fingerprint(*fixtures):
+    """Hash the fixtures so result files measured on different inputs
+    can be told apart.
+
+    Returns
+    -------
+    str
+        The hex SHA-1 digest of the fixtures.
+    """
+    digest = hashlib.sha1()
+    for fixture in fixtures:
+        digest.update(repr(fixture).encode("utf-8"))
+    return digest.hexdigest()
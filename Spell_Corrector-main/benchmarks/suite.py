@@ -0,0 +1,293 @@
+"""
+Benchmark suite of the vendored symspellpy package.
+
+Usage::
+
+    python -m benchmarks.suite [-o results.json] [--compare base.json]
+        [--profile {cprofile,pyinstrument}] [--profile-dir DIR]
+
+Measures, on the fixtures of :mod:`benchmarks.fixtures`:
+
+* the time and peak RSS of building the dictionary from
+  ``frequency_dictionary_en_82_765.txt``,
+* the time and peak RSS of loading the pickle and the compact index
+  snapshots of that dictionary,
+* :meth:`SymSpell.lookup` latency percentiles per verbosity and per
+  edit distance of the query,
+* :meth:`SymSpell.lookup_compound` and :meth:`SymSpell.word_segmentation`
+  throughput.
+
+Build and load run in fresh processes so each reports its own peak
+RSS. The results are written as JSON; ``--compare`` prints the change
+of every metric against an earlier result file. With ``--profile``,
+the lookup, lookup_compound and word_segmentation stages run under
+cProfile (top functions by own time are added to the results, and
+``.prof`` files written to ``--profile-dir``) or pyinstrument (a text
+report per stage is written to ``--profile-dir``).
+"""
+import argparse
+import cProfile
+import json
+import multiprocessing
+import os
+import os.path
+import platform
+import pstats
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from benchmarks import fixtures
+from symspellpy import SymSpell, Verbosity
+from symspellpy.__version__ import __version__
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+PERCENTILES = (50, 90, 99)
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None if the
+    platform does not report it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    if sys.platform == "darwin":
+        return peak / 2 ** 20
+    return peak / 2 ** 10
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(0, -(-len(sorted_values) * percent // 100) - 1)
+    return sorted_values[int(rank)]
+
+def build(snapshot_dir):
+    """Build the dictionary and save its snapshots, run in a fresh
+    process."""
+    sym_spell = SymSpell(MAX_EDIT_DISTANCE, PREFIX_LENGTH)
+    start = time.perf_counter()
+    sym_spell.load_dictionary(fixtures.DICTIONARY_PATH, 0, 1)
+    elapsed = time.perf_counter() - start
+    sym_spell.save_pickle(os.path.join(snapshot_dir, "symspell.pickle"))
+    sym_spell.save_index(os.path.join(snapshot_dir, "symspell.idx"))
+    return {"seconds": elapsed, "peak_rss_mb": peak_rss_mb(),
+            "words": len(sym_spell.words),
+            "deletes": len(sym_spell.deletes)}
+
+def load_snapshot(snapshot_dir, kind):
+    """Load a snapshot written by :func:`build`, run in a fresh
+    process."""
+    sym_spell = SymSpell(MAX_EDIT_DISTANCE, PREFIX_LENGTH)
+    rss_before = peak_rss_mb()
+    start = time.perf_counter()
+    if kind == "pickle":
+        loaded = sym_spell.load_pickle(
+            os.path.join(snapshot_dir, "symspell.pickle"))
+    else:
+        loaded = sym_spell.load_index(
+            os.path.join(snapshot_dir, "symspell.idx"))
+    elapsed = time.perf_counter() - start
+    # first lookup, the index pages its data in lazily
+    sym_spell.lookup("hello", Verbosity.TOP)
+    first_lookup = time.perf_counter() - start - elapsed
+    assert loaded, "could not load the {} snapshot".format(kind)
+    return {"seconds": elapsed, "first_lookup_seconds": first_lookup,
+            "rss_before_mb": rss_before, "peak_rss_mb": peak_rss_mb()}
+
+def run_isolated(func, *args):
+    """Run `func` in a fresh interpreter so its peak RSS and timings
+    are not affected by earlier stages."""
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(1) as pool:
+        return pool.apply(func, args)
+
+def bench_lookup(sym_spell, queries):
+    results = dict()
+    for verbosity in Verbosity:
+        per_distance = dict()
+        for distance, pairs in queries.items():
+            latencies = list()
+            found = 0
+            for typo, word in pairs:
+                start = time.perf_counter()
+                suggestions = sym_spell.lookup(typo, verbosity,
+                                               MAX_EDIT_DISTANCE)
+                latencies.append(time.perf_counter() - start)
+                if suggestions and suggestions[0].term == word:
+                    found += 1
+            latencies.sort()
+            stats = {"p{}_us".format(percent):
+                     percentile(latencies, percent) * 1e6
+                     for percent in PERCENTILES}
+            stats["max_us"] = latencies[-1] * 1e6
+            stats["mean_us"] = sum(latencies) / len(latencies) * 1e6
+            stats["top_hit_rate"] = found / len(pairs)
+            per_distance[str(distance)] = stats
+        results[verbosity.name.lower()] = per_distance
+    return results
+
+def bench_lookup_compound(sym_spell, sentences):
+    start = time.perf_counter()
+    for sentence in sentences:
+        sym_spell.lookup_compound(sentence, MAX_EDIT_DISTANCE)
+    elapsed = time.perf_counter() - start
+    return {"sentences": len(sentences), "seconds": elapsed,
+            "sentences_per_second": len(sentences) / elapsed}
+
+def bench_word_segmentation(sym_spell, phrases):
+    start = time.perf_counter()
+    for phrase in phrases:
+        sym_spell.word_segmentation(phrase)
+    elapsed = time.perf_counter() - start
+    num_chars = sum(len(phrase) for phrase in phrases)
+    return {"phrases": len(phrases), "seconds": elapsed,
+            "phrases_per_second": len(phrases) / elapsed,
+            "chars_per_second": num_chars / elapsed}
+
+def profiled(name, profiler, profile_dir, top, func, *args):
+    """Run a stage, under `profiler` if one is requested.
+
+    Returns
+    -------
+    dict
+        The results of the stage, with the top `top` functions by own
+        time under "hot_spots" when profiled with cProfile.
+    """
+    if profiler is None:
+        return func(*args)
+    if profiler == "pyinstrument":
+        from pyinstrument import Profiler
+        profile = Profiler()
+        profile.start()
+        results = func(*args)
+        profile.stop()
+        with open(os.path.join(profile_dir, name + ".txt"), "w") as outfile:
+            outfile.write(profile.output_text(unicode=False, color=False))
+        return results
+    profile = cProfile.Profile()
+    results = profile.runcall(func, *args)
+    profile.dump_stats(os.path.join(profile_dir, name + ".prof"))
+    stats = pstats.Stats(profile)
+    hot_spots = list()
+    for (filename, line, function), (__, ncalls, tottime, cumtime,
+                                     __) in stats.stats.items():
+        hot_spots.append({
+            "function": "{}:{}({})".format(os.path.basename(filename), line,
+                                           function),
+            "calls": ncalls, "tottime": tottime, "cumtime": cumtime})
+    hot_spots.sort(key=lambda spot: spot["tottime"], reverse=True)
+    results["hot_spots"] = hot_spots[: top]
+    return results
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def flatten(results, prefix=""):
+    """Flatten nested results into {"a.b.c": number}."""
+    flat = dict()
+    for key, value in results.items():
+        name = prefix + key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+def compare(baseline, results):
+    """Print the relative change of every metric of `results` against
+    `baseline`."""
+    if baseline["meta"]["fixtures"] != results["meta"]["fixtures"]:
+        print("warning: results were measured on different fixtures",
+              file=sys.stderr)
+    old = flatten({k: v for k, v in baseline.items() if k != "meta"})
+    new = flatten({k: v for k, v in results.items() if k != "meta"})
+    for name in sorted(new):
+        if name not in old:
+            continue
+        change = ("{:+.1f}%".format((new[name] - old[name]) / old[name] * 100)
+                  if old[name] else "n/a")
+        print("{:<48} {:>14.4f} {:>14.4f} {:>9}".format(
+            name, old[name], new[name], change), file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-o", "--output",
+                        help="JSON file to write, stdout if omitted")
+    parser.add_argument("--compare", help="earlier JSON results to diff")
+    parser.add_argument("--vocabulary", type=int, default=30000,
+                        help="most frequent words the fixtures draw from")
+    parser.add_argument("--queries", type=int, default=500,
+                        help="lookup queries per edit distance")
+    parser.add_argument("--sentences", type=int, default=200)
+    parser.add_argument("--phrases", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--profile", choices=["cprofile", "pyinstrument"])
+    parser.add_argument("--profile-dir", default=".",
+                        help="directory of the profiler output")
+    parser.add_argument("--top", type=int, default=25,
+                        help="hot spots reported per profiled stage")
+    args = parser.parse_args(argv)
+
+    words = fixtures.load_words(args.vocabulary)
+    queries = fixtures.lookup_queries(words, args.queries, seed=args.seed)
+    sentences = fixtures.sentences(words, args.sentences, seed=args.seed)
+    phrases = fixtures.unsegmented(words, args.phrases, seed=args.seed)
+    results = {"meta": {
+        "symspellpy": __version__,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "fixtures": fixtures.fingerprint(queries, sentences, phrases),
+        "args": vars(args)}}
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        results["build"] = run_isolated(build, snapshot_dir)
+        results["load"] = {
+            kind: run_isolated(load_snapshot, snapshot_dir, kind)
+            for kind in ("pickle", "index")}
+        sym_spell = SymSpell(MAX_EDIT_DISTANCE, PREFIX_LENGTH)
+        sym_spell.load_pickle(os.path.join(snapshot_dir, "symspell.pickle"))
+
+    if args.profile is not None:
+        os.makedirs(args.profile_dir, exist_ok=True)
+    stage_args = (args.profile, args.profile_dir, args.top)
+    results["lookup"] = profiled("lookup", *stage_args, bench_lookup,
+                                 sym_spell, queries)
+    results["lookup_compound"] = profiled(
+        "lookup_compound", *stage_args, bench_lookup_compound, sym_spell,
+        sentences)
+    results["word_segmentation"] = profiled(
+        "word_segmentation", *stage_args, bench_word_segmentation,
+        sym_spell, phrases)
+    results["peak_rss_mb"] = peak_rss_mb()
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output is None:
+        print(output)
+    else:
+        with open(args.output, "w") as outfile:
+            outfile.write(output)
+            outfile.write("\n")
+    if args.compare is not None:
+        with open(args.compare, "r") as infile:
+            compare(json.load(infile), results)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,7 +2,7 @@ from flask import Flask, request, jsonify,render_template
 import os
 from flask_cors import CORS, cross_origin
 
-from spellcorrector import spell_corrector
+from spellcorrector import spell_corrector, reload_dictionaries, engine
 
 os.putenv('LANG', 'en_US.UTF-8')
 os.putenv('LC_ALL', 'en_US.UTF-8')
@@ -25,7 +25,17 @@ def predictRoute():
     return jsonify({ "text" : result})
 
 
+@app.route("/reload", methods=['POST'])
+@cross_origin()
+def reloadRoute():
+    force = bool(request.json.get('force', False)) if request.is_json else False
+    reloaded = reload_dictionaries(force=force)
+    return jsonify({ "reloaded" : reloaded})
+
+
 #port = int(os.getenv("PORT"))
 if __name__ == "__main__":
+    # build the dictionary index before serving the first request
+    engine.load()
     #app.run(host='0.0.0.0', port=port)
-    app.run(host='0.0.0.0', port=7000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=7000, debug=True)
@@ -1,15 +1,40 @@
+import os
+
 import pkg_resources
-from symspellpy import SymSpell, Verbosity
+from symspellpy import DictionaryRegistry, SymSpellEngine, Verbosity
 
-sym_spell = SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
 dictionary_path = pkg_resources.resource_filename("symspellpy", "frequency_dictionary_en_82_765.txt")
 bigram_path = pkg_resources.resource_filename("symspellpy", "frequency_bigramdictionary_en_243_342.txt")
 
-# term_index is the column of the term and count_index is the
-# column of the term frequency
-def spell_corrector(input_term):
-       sym_spell.load_dictionary(dictionary_path, term_index=0, count_index=1)
-       sym_spell.load_bigram_dictionary(bigram_path, term_index=0, count_index=2)
+# memory-mapped index shared by all worker processes, rebuilt when the
+# dictionaries are newer
+index_path = os.path.join("artifacts", "symspell_en_82_765.idx")
+
+# the index is built once per process on first use and shared by every
+# request; term_index is the column of the term and count_index is the
+# column of the term frequency; repeated inputs are answered from a
+# cache of the last 10000 results per lookup method
+engine = SymSpellEngine(dictionary_path, bigram_path,
+                        max_dictionary_edit_distance=2, prefix_length=7,
+                        term_index=0, count_index=1, bigram_count_index=2,
+                        index_path=index_path, cache_size=10000)
+
+# named dictionaries, e.g. per language or tenant, are loaded on first
+# use; the least recently used ones are unloaded once the loaded
+# dictionaries take more than about 1 GB
+registry = DictionaryRegistry(memory_budget=2 ** 30)
+registry.register("en", engine)
+
+
+def reload_dictionaries(force=False):
+       # rebuild the shared index if the dictionary files changed on disk
+       return engine.reload(force=force)
+
+
+def spell_corrector(input_term, dictionary="en"):
+       # lookup_compound searches one dictionary, so it should be a
+       # complete one rather than an overlay registered with a base
+       sym_spell = registry.get(dictionary)
 
        # lookup suggestions for multi-word input strings (supports compound
        # splitting & merging)
@@ -29,4 +54,4 @@ def spell_corrector(input_term):
        return splitter
 
 
-#spell_corrector(input_term = 'The yougn boy finaly understod the diffrence betwen paralell and perpendcular.')
\ No newline at end of file
+#spell_corrector(input_term = 'The yougn boy finaly understod the diffrence betwen paralell and perpendcular.')
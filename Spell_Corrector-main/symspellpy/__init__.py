@@ -9,3 +9,5 @@ from .__version__ import (__title__, __description__, __version__,
 from . import editdistance
 from . import helpers
 from .symspellpy import SymSpell, Verbosity
+from .engine import SymSpellEngine
+from .registry import DictionaryRegistry
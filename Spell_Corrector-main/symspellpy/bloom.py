@@ -0,0 +1,115 @@
+"""
+.. module:: bloom
+   :synopsis: Bloom filter over the deletes of a compact index.
+"""
+import math
+import zlib
+
+# 2**64 / golden ratio, spreads the checksum into the step of the
+# double hashing
+_GOLDEN = 0x9E3779B97F4A7C15
+
+class BloomFilter(object):
+    """Bloom filter over strings.
+
+    The bit positions of a key are derived by double hashing from the
+    CRC-32 checksum of its UTF-8 bytes, which is stable across
+    processes, so the bits can be saved with an index, and several
+    times cheaper than the :func:`.index.hash64` lookup it guards. (A
+    second CRC-32 with another seed would not do: CRC is affine, so
+    both checksums would differ by a constant.)
+    The filter has no false negatives: a key that was added is always
+    reported present, a key that was not is reported present with
+    roughly the error rate the filter was sized for.
+
+    Parameters
+    ----------
+    bits : bytearray or memoryview
+        The bit array, 8 bits per byte.
+    num_hashes : int
+        The number of bit positions per key.
+
+    Raises
+    ------
+    ValueError
+        If `bits` is empty or `num_hashes` is less than 1.
+    """
+    def __init__(self, bits, num_hashes):
+        if not len(bits):
+            raise ValueError("bits cannot be empty")
+        if num_hashes < 1:
+            raise ValueError("num_hashes cannot be less than 1")
+        self._bits = bits
+        self._num_bits = len(bits) * 8
+        self._num_hashes = num_hashes
+
+    @classmethod
+    def create(cls, capacity, error_rate, num_hashes=2):
+        """Create an empty filter sized for `capacity` keys.
+
+        Every key that is present costs all `num_hashes` bit lookups,
+        so the default uses fewer hashes than the size-optimal number
+        (about 7 for a 1% error rate) and more bits instead.
+
+        Parameters
+        ----------
+        capacity : int
+            The expected number of keys.
+        error_rate : float
+            The false positive rate at `capacity` keys, between 0 and
+            1 exclusive.
+        num_hashes : int, optional
+            The number of bit positions per key.
+
+        Returns
+        -------
+        :class:`BloomFilter`
+            The empty filter.
+
+        Raises
+        ------
+        ValueError
+            If `error_rate` is not between 0 and 1 exclusive.
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+        capacity = max(capacity, 1)
+        # error_rate = (1 - exp(-num_hashes * capacity / num_bits))
+        #              ** num_hashes
+        num_bits = math.ceil(
+            -num_hashes * capacity
+            / math.log(1 - error_rate ** (1 / num_hashes)))
+        # whole 64-bit words keep the array aligned in the index file
+        num_bits += -num_bits % 64
+        return cls(bytearray(num_bits // 8), num_hashes)
+
+    def add(self, key):
+        """Add a key."""
+        bits = self._bits
+        num_bits = self._num_bits
+        position = zlib.crc32(key.encode("utf-8"))
+        step = (position * _GOLDEN >> 32) | 1
+        for __ in range(self._num_hashes):
+            position %= num_bits
+            bits[position >> 3] |= 1 << (position & 7)
+            position += step
+
+    def __contains__(self, key):
+        bits = self._bits
+        num_bits = self._num_bits
+        position = zlib.crc32(key.encode("utf-8"))
+        step = (position * _GOLDEN >> 32) | 1
+        for __ in range(self._num_hashes):
+            position %= num_bits
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+            position += step
+        return True
+
+    @property
+    def bits(self):
+        return self._bits
+
+    @property
+    def num_hashes(self):
+        return self._num_hashes
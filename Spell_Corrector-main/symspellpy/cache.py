@@ -0,0 +1,147 @@
+"""
+.. module:: cache
+   :synopsis: Bounded LRU cache for spelling correction results.
+"""
+from collections import OrderedDict, namedtuple
+import threading
+
+class LRUCache(object):
+    """Least recently used cache of results computed from one version
+    of a dictionary.
+
+    Every access passes the current dictionary version. Entries stored
+    under an older version are dropped as a whole the first time a
+    newer version is seen, so callers only need to bump their version
+    counter whenever the dictionary changes.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of cached results.
+
+    Attributes
+    ----------
+    _entries : collections.OrderedDict
+        Cached results, least recently used first.
+    _version : int
+        The dictionary version the cached results were computed from.
+    _hits : int
+        Number of :meth:`get` calls that found a result.
+    _misses : int
+        Number of :meth:`get` calls that did not find a result.
+    _evictions : int
+        Number of results dropped to stay within `maxsize`.
+    _lock : threading.Lock
+        Serializes access so the cache can be shared between threads.
+
+    Raises
+    ------
+    ValueError
+        If `maxsize` is less than 1.
+    """
+    def __init__(self, maxsize):
+        if maxsize < 1:
+            raise ValueError("maxsize cannot be less than 1")
+        self._maxsize = maxsize
+        self._entries = OrderedDict()
+        self._version = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        """Look up a cached result.
+
+        Parameters
+        ----------
+        key : tuple
+            The arguments the result was computed for.
+        version : int
+            The current dictionary version.
+
+        Returns
+        -------
+        object
+            The cached result, or None if there is none for `key` and
+            `version`.
+        """
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self._misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            return value
+
+    def put(self, key, value, version):
+        """Store a result, evicting the least recently used result if
+        the cache is full. Results computed from an outdated dictionary
+        version are not stored.
+
+        Parameters
+        ----------
+        key : tuple
+            The arguments the result was computed for.
+        value : object
+            The result, must not be None.
+        version : int
+            The dictionary version the result was computed from.
+        """
+        with self._lock:
+            self._check_version(version)
+            if version != self._version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self):
+        """Drop all cached results and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+
+    def info(self):
+        """Report the cache statistics.
+
+        Returns
+        -------
+        :class:`CacheInfo`
+            The counters and size of the cache.
+        """
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._evictions,
+                             self._maxsize, len(self._entries))
+
+    def _check_version(self, version):
+        if version > self._version:
+            self._entries.clear()
+            self._version = version
+
+    @property
+    def maxsize(self):
+        return self._maxsize
+
+CacheInfo = namedtuple("CacheInfo",
+                       ["hits", "misses", "evictions", "maxsize", "currsize"])
+CacheInfo.__doc__ = """Statistics of a :class:`LRUCache`, like
+:func:`functools.lru_cache` reports them.
+
+Attributes
+----------
+hits : int
+    Number of lookups that were answered from the cache.
+misses : int
+    Number of lookups that had to be computed.
+evictions : int
+    Number of results dropped because the cache was full.
+maxsize : int
+    The maximum number of cached results.
+currsize : int
+    The current number of cached results.
+"""
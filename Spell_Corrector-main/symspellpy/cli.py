@@ -0,0 +1,169 @@
+"""
+.. module:: cli
+   :synopsis: Command line spelling correction of whole text files.
+
+Usage::
+
+    python -m symspellpy.cli [input] [-o output] [--workers N]
+
+Reads `input` (or stdin) line by line and writes the
+:meth:`.symspellpy.SymSpell.lookup_compound` correction of each line to
+`output` (or stdout), in input order. With more than one worker, the
+lines are corrected by a pool of processes that memory-map one shared
+compact index. Throughput is reported on stderr when done.
+"""
+import argparse
+from collections import deque
+from itertools import islice
+import multiprocessing
+import os
+import os.path
+import sys
+import tempfile
+import time
+
+from symspellpy.engine import SymSpellEngine
+
+DICTIONARY_PATH = os.path.join(os.path.dirname(__file__),
+                               "frequency_dictionary_en_82_765.txt")
+BIGRAM_PATH = os.path.join(os.path.dirname(__file__),
+                           "frequency_bigramdictionary_en_243_342.txt")
+
+# state of a pool worker, set up by _init_worker
+_sym_spell = None
+_correct_kwargs = None
+
+def correct_parallel(engine, lines, workers, chunk_size=64,
+                     max_pending=None, **kwargs):
+    """Correct a stream of lines with a pool of worker processes.
+
+    Lines are sent to the workers in chunks and at most `max_pending`
+    chunks are in flight at any time, so memory use does not depend on
+    the length of the input. Corrections are yielded in input order.
+
+    Parameters
+    ----------
+    engine : :class:`.engine.SymSpellEngine`
+        The engine the workers load their index with; it must have an
+        `index_path` so the workers map the index built here instead
+        of each building their own.
+    lines : iterable of str
+        The lines to correct.
+    workers : int
+        The number of worker processes.
+    chunk_size : int, optional
+        The number of lines sent to a worker at once.
+    max_pending : int, optional
+        The maximum number of chunks in flight, defaults to four per
+        worker.
+    **kwargs
+        Arguments passed on to
+        :meth:`.symspellpy.SymSpell.correct_stream`.
+
+    Yields
+    ------
+    str
+        The corrected text of each line, without the line ending.
+    """
+    if max_pending is None:
+        max_pending = 4 * workers
+    # build (or check) the shared index once before the workers map it
+    engine.load()
+    lines = iter(lines)
+    with multiprocessing.Pool(workers, _init_worker,
+                              (engine.settings, kwargs)) as pool:
+        pending = deque()
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if chunk:
+                pending.append(pool.apply_async(_correct_chunk, (chunk,)))
+            if pending and (len(pending) >= max_pending or not chunk):
+                for correction in pending.popleft().get():
+                    yield correction
+            elif not chunk:
+                break
+
+def _init_worker(settings, correct_kwargs):
+    global _sym_spell, _correct_kwargs
+    _sym_spell = SymSpellEngine(**settings).load()
+    _correct_kwargs = correct_kwargs
+
+def _correct_chunk(chunk):
+    return list(_sym_spell.correct_stream(chunk, **_correct_kwargs))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Correct the spelling of a text file line by line.")
+    parser.add_argument("input", nargs="?",
+                        help="file to correct, stdin if omitted")
+    parser.add_argument("-o", "--output",
+                        help="file to write to, stdout if omitted")
+    parser.add_argument("--dictionary", default=DICTIONARY_PATH,
+                        help="word/frequency dictionary file")
+    parser.add_argument("--bigram", default=BIGRAM_PATH,
+                        help="bigram dictionary file")
+    parser.add_argument("--index",
+                        help="compact index file shared by the workers, "
+                             "a temporary file if omitted")
+    parser.add_argument("--max-edit-distance", type=int, default=2)
+    parser.add_argument("--prefix-length", type=int, default=7)
+    parser.add_argument("--ignore-non-words", action="store_true")
+    parser.add_argument("--transfer-casing", action="store_true")
+    parser.add_argument("-w", "--workers", type=int,
+                        default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=64,
+                        help="lines sent to a worker at once")
+    parser.add_argument("--encoding", default="utf-8")
+    args = parser.parse_args(argv)
+
+    temp_dir = None
+    index_path = args.index
+    if index_path is None and args.workers > 1:
+        temp_dir = tempfile.TemporaryDirectory()
+        index_path = os.path.join(temp_dir.name, "symspell.idx")
+    engine = SymSpellEngine(
+        args.dictionary,
+        args.bigram if os.path.exists(args.bigram) else None,
+        max_dictionary_edit_distance=args.max_edit_distance,
+        prefix_length=args.prefix_length, encoding=args.encoding,
+        index_path=index_path)
+    correct_kwargs = {"max_edit_distance": args.max_edit_distance,
+                      "ignore_non_words": args.ignore_non_words,
+                      "transfer_casing": args.transfer_casing}
+
+    infile = (sys.stdin if args.input is None
+              else open(args.input, "r", encoding=args.encoding))
+    outfile = (sys.stdout if args.output is None
+               else open(args.output, "w", encoding=args.encoding))
+    try:
+        # the index build is not part of the throughput
+        engine.load()
+        start = time.perf_counter()
+        if args.workers > 1:
+            corrections = correct_parallel(engine, infile, args.workers,
+                                           args.chunk_size,
+                                           **correct_kwargs)
+        else:
+            corrections = engine.load().correct_stream(infile,
+                                                       **correct_kwargs)
+        num_lines = 0
+        for correction in corrections:
+            outfile.write(correction)
+            outfile.write("\n")
+            num_lines += 1
+        outfile.flush()
+        elapsed = time.perf_counter() - start
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+        if outfile is not sys.stdout:
+            outfile.close()
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    print("Corrected {} lines in {:.2f}s ({:.1f} lines/s)".format(
+        num_lines, elapsed, num_lines / elapsed if elapsed > 0 else 0.0),
+          file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
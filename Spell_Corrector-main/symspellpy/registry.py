@@ -0,0 +1,311 @@
+"""
+.. module:: registry
+   :synopsis: Named, lazily loaded dictionaries within a memory budget.
+"""
+from collections import OrderedDict
+import threading
+
+from symspellpy.symspellpy import SuggestItem, Verbosity
+
+class DictionaryRegistry(object):
+    """Registry of named :class:`.engine.SymSpellEngine` dictionaries,
+    e.g. one per language or tenant.
+
+    A dictionary is only built or mapped the first time it is used.
+    The approximate memory of every loaded dictionary is tracked with
+    :meth:`.symspellpy.SymSpell.memory_usage`, and once the total
+    exceeds `memory_budget` the least recently used dictionaries are
+    unloaded until it fits again. An evicted dictionary is loaded again
+    on its next use, so engines with an `index_path` make evictions
+    cheap.
+
+    A dictionary can be registered as an overlay of a `base`
+    dictionary, e.g. the domain words of a tenant on top of the English
+    dictionary. :meth:`lookup` then searches the overlay first and the
+    base second. The base is loaded once and shared by all its
+    overlays, which only hold their own words.
+
+    Parameters
+    ----------
+    memory_budget : int, optional
+        The approximate number of bytes the loaded dictionaries may
+        use, no limit if omitted. The dictionaries a request needs are
+        never evicted by that request, so a single dictionary larger
+        than the budget is still loaded.
+
+    Attributes
+    ----------
+    _engines : dict
+        The engine of each registered dictionary.
+    _bases : dict
+        The name of the base of each registered overlay.
+    _loaded : collections.OrderedDict
+        The approximate size of each loaded dictionary, least recently
+        used first.
+    _lock : threading.Lock
+        Serializes the bookkeeping, not the loading itself.
+
+    Raises
+    ------
+    ValueError
+        If `memory_budget` is negative.
+    """
+    def __init__(self, memory_budget=None):
+        if memory_budget is not None and memory_budget < 0:
+            raise ValueError("memory_budget cannot be negative")
+        self._memory_budget = memory_budget
+        self._engines = dict()
+        self._bases = dict()
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def register(self, name, engine, base=None):
+        """Add a dictionary.
+
+        Parameters
+        ----------
+        name : str
+            The name of the dictionary.
+        engine : :class:`.engine.SymSpellEngine`
+            The engine that loads it, not loaded until first use.
+        base : str, optional
+            The name of a registered dictionary that lookups in this
+            one fall back to.
+
+        Raises
+        ------
+        ValueError
+            If `name` is already registered or `base` is not.
+        """
+        with self._lock:
+            if name in self._engines:
+                raise ValueError("Dictionary already registered: "
+                                 "{}".format(name))
+            if base is not None and base not in self._engines:
+                raise ValueError("Unknown dictionary: {}".format(base))
+            self._engines[name] = engine
+            if base is not None:
+                self._bases[name] = base
+
+    def unregister(self, name):
+        """Remove a dictionary and unload it.
+
+        Returns
+        -------
+        bool
+            True if the dictionary was registered.
+
+        Raises
+        ------
+        ValueError
+            If `name` is the base of another dictionary.
+        """
+        with self._lock:
+            if name not in self._engines:
+                return False
+            if name in self._bases.values():
+                raise ValueError("Dictionary is the base of another "
+                                 "dictionary: {}".format(name))
+            engine = self._engines.pop(name)
+            self._bases.pop(name, None)
+            self._loaded.pop(name, None)
+        engine.unload()
+        return True
+
+    def get(self, name):
+        """Load a dictionary if needed.
+
+        Parameters
+        ----------
+        name : str
+            The name of the dictionary.
+
+        Returns
+        -------
+        :class:`.symspellpy.SymSpell`
+            The dictionary, without its base.
+
+        Raises
+        ------
+        ValueError
+            If `name` is not registered.
+        """
+        return self.layers(name)[0]
+
+    def layers(self, name):
+        """Load a dictionary and its bases if needed.
+
+        Parameters
+        ----------
+        name : str
+            The name of the dictionary.
+
+        Returns
+        -------
+        list of :class:`.symspellpy.SymSpell`
+            The dictionary followed by its base, the base of its base
+            and so on.
+
+        Raises
+        ------
+        ValueError
+            If `name` is not registered.
+        """
+        with self._lock:
+            names = self._chain(name)
+            engines = [self._engines[layer] for layer in names]
+        layers = list()
+        for layer, engine in zip(names, engines):
+            sym_spell = engine.load()
+            layers.append(sym_spell)
+            with self._lock:
+                is_new = layer not in self._loaded
+            # size the dictionary once, when this registry loads it
+            size = sym_spell.memory_usage() if is_new else None
+            with self._lock:
+                if layer not in self._engines:
+                    continue
+                if layer in self._loaded:
+                    self._loaded.move_to_end(layer)
+                elif size is not None:
+                    self._loaded[layer] = size
+        with self._lock:
+            evicted = self._evict(set(names))
+        for engine in evicted:
+            engine.unload()
+        return layers
+
+    def lookup(self, name, phrase, verbosity, max_edit_distance=None,
+               include_unknown=False, ignore_token=None,
+               transfer_casing=False):
+        """Find suggested spellings for a given phrase word in a
+        dictionary and its bases, see
+        :meth:`.symspellpy.SymSpell.lookup`.
+
+        Suggestions are ordered by edit distance, then by layer,
+        overlay first, then by count, and a word found in several
+        layers is suggested with the count of the first of them. With
+        :attr:`.symspellpy.Verbosity.TOP` or
+        :attr:`.symspellpy.Verbosity.CLOSEST`, a layer is only searched
+        up to the distance of the best suggestion of the layers before
+        it, and not at all after an exact match.
+
+        Parameters
+        ----------
+        name : str
+            The name of the dictionary.
+        max_edit_distance : int, optional
+            The maximum edit distance between phrase and suggested
+            words, the smallest `max_dictionary_edit_distance` of the
+            layers by default.
+
+        Returns
+        -------
+        list
+            :class:`.symspellpy.SuggestItem` objects.
+
+        Raises
+        ------
+        ValueError
+            If `name` is not registered.
+        ValueError
+            If `max_edit_distance` is greater than the
+            `max_dictionary_edit_distance` of a layer.
+        """
+        layers = self.layers(name)
+        if max_edit_distance is None:
+            max_edit_distance = min(sym_spell.max_dictionary_edit_distance
+                                    for sym_spell in layers)
+        suggestions = list()
+        seen = set()
+        for rank, sym_spell in enumerate(layers):
+            distance = max_edit_distance
+            if suggestions and verbosity != Verbosity.ALL:
+                distance = min(distance, suggestions[0][0])
+                if distance == 0:
+                    break
+            for item in sym_spell.lookup(phrase, verbosity, distance,
+                                         ignore_token=ignore_token,
+                                         transfer_casing=transfer_casing):
+                if item.term not in seen:
+                    seen.add(item.term)
+                    suggestions.append((item.distance, rank, -item.count,
+                                        item))
+            suggestions.sort(key=lambda entry: entry[:3])
+        if suggestions and verbosity != Verbosity.ALL:
+            closest = suggestions[0][0]
+            suggestions = [entry for entry in suggestions
+                           if entry[0] == closest]
+            if verbosity == Verbosity.TOP:
+                suggestions = suggestions[:1]
+        suggestions = [entry[3] for entry in suggestions]
+        if include_unknown and not suggestions:
+            suggestions.append(SuggestItem(phrase, max_edit_distance + 1, 0))
+        return suggestions
+
+    def evict(self, name):
+        """Unload a dictionary, it is loaded again on its next use.
+
+        Returns
+        -------
+        bool
+            True if the dictionary was loaded.
+        """
+        with self._lock:
+            self._loaded.pop(name, None)
+            engine = self._engines.get(name)
+        return engine is not None and engine.unload()
+
+    def info(self):
+        """Report the registered dictionaries.
+
+        Returns
+        -------
+        dict
+            For each dictionary name, a dict with its "base" (or None),
+            whether it is "loaded", and its approximate "size" in
+            bytes (0 if not loaded).
+        """
+        with self._lock:
+            return {name: {"base": self._bases.get(name),
+                           "loaded": name in self._loaded,
+                           "size": self._loaded.get(name, 0)}
+                    for name in self._engines}
+
+    def _chain(self, name):
+        if name not in self._engines:
+            raise ValueError("Unknown dictionary: {}".format(name))
+        names = [name]
+        while names[-1] in self._bases:
+            names.append(self._bases[names[-1]])
+        return names
+
+    def _evict(self, pinned):
+        evicted = list()
+        if self._memory_budget is None:
+            return evicted
+        usage = sum(self._loaded.values())
+        for name in list(self._loaded):
+            if usage <= self._memory_budget:
+                break
+            if name in pinned:
+                continue
+            usage -= self._loaded.pop(name)
+            evicted.append(self._engines[name])
+        return evicted
+
+    @property
+    def memory_budget(self):
+        return self._memory_budget
+
+    @property
+    def memory_usage(self):
+        """int: The approximate size of the loaded dictionaries in
+        bytes."""
+        with self._lock:
+            return sum(self._loaded.values())
+
+    @property
+    def names(self):
+        with self._lock:
+            return list(self._engines)
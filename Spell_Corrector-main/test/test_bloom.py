@@ -0,0 +1,46 @@
+import unittest
+
+import pytest
+
+from symspellpy.bloom import BloomFilter
+
+class TestBloomFilter(unittest.TestCase):
+    def test_invalid_error_rate(self):
+        for error_rate in (0, 1, 1.5):
+            with pytest.raises(ValueError) as excinfo:
+                __ = BloomFilter.create(100, error_rate)
+            self.assertEqual("error_rate must be between 0 and 1",
+                             str(excinfo.value))
+
+    def test_invalid_bits(self):
+        with pytest.raises(ValueError) as excinfo:
+            __ = BloomFilter(bytearray(), 2)
+        self.assertEqual("bits cannot be empty", str(excinfo.value))
+        with pytest.raises(ValueError) as excinfo:
+            __ = BloomFilter(bytearray(8), 0)
+        self.assertEqual("num_hashes cannot be less than 1",
+                         str(excinfo.value))
+
+    def test_no_false_negatives(self):
+        bloom = BloomFilter.create(1000, 0.01)
+        keys = ["key{}".format(i) for i in range(1000)] + ["", "dög's"]
+        for key in keys:
+            bloom.add(key)
+        for key in keys:
+            self.assertIn(key, bloom)
+
+    def test_error_rate(self):
+        bloom = BloomFilter.create(10000, 0.01)
+        for i in range(10000):
+            bloom.add("key{}".format(i))
+        false_positives = sum("other{}".format(i) in bloom
+                              for i in range(10000))
+        self.assertLess(false_positives, 200)
+
+    def test_shared_bits(self):
+        bloom = BloomFilter.create(10, 0.01)
+        bloom.add("steam")
+        bloom_2 = BloomFilter(memoryview(bytes(bloom.bits)),
+                              bloom.num_hashes)
+        self.assertIn("steam", bloom_2)
+        self.assertNotIn("steem", bloom_2)
@@ -0,0 +1,57 @@
+from contextlib import redirect_stderr
+import io
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from symspellpy import SymSpellEngine
+from symspellpy.cli import correct_parallel, main
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.dictionary_path = os.path.join(self.temp_dir, "dict.txt")
+        with open(self.dictionary_path, "w") as outfile:
+            outfile.write("the 100\nquick 20\nbrown 15\nfox 10\n")
+        self.input_path = os.path.join(self.temp_dir, "input.txt")
+        self.lines = ["teh quikc {} brwn fox".format("fox " * (i % 3))
+                      for i in range(50)]
+        with open(self.input_path, "w") as outfile:
+            outfile.write("\n".join(self.lines))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def run_main(self, *args):
+        output_path = os.path.join(self.temp_dir, "output.txt")
+        stderr = io.StringIO()
+        with redirect_stderr(stderr):
+            self.assertEqual(0, main([self.input_path, "-o", output_path,
+                                      "--dictionary", self.dictionary_path]
+                                     + list(args)))
+        with open(output_path, "r") as infile:
+            return infile.read().splitlines(), stderr.getvalue()
+
+    def test_main(self):
+        corrections, report = self.run_main("--workers", "1")
+        self.assertEqual(len(self.lines), len(corrections))
+        self.assertEqual("the quick brown fox", corrections[0])
+        self.assertEqual("the quick fox fox brown fox", corrections[2])
+        self.assertTrue(report.startswith("Corrected 50 lines in "))
+        self.assertIn("lines/s", report)
+
+    def test_main_workers_preserve_order(self):
+        expected, __ = self.run_main("--workers", "1")
+        corrections, report = self.run_main("--workers", "2",
+                                            "--chunk-size", "3")
+        self.assertEqual(expected, corrections)
+        self.assertTrue(report.startswith("Corrected 50 lines in "))
+
+    def test_correct_parallel(self):
+        index_path = os.path.join(self.temp_dir, "dict.idx")
+        engine = SymSpellEngine(self.dictionary_path, index_path=index_path)
+        expected = list(engine.sym_spell.correct_stream(self.lines))
+        self.assertEqual(expected, list(correct_parallel(
+            engine, iter(self.lines), 2, chunk_size=4, max_pending=2)))
+        self.assertEqual([], list(correct_parallel(engine, [], 2)))
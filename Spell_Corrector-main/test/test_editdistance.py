@@ -6,7 +6,9 @@ import numpy as np
 import pytest
 
 from symspellpy.editdistance import (AbstractDistanceComparer, DamerauOsa,
-                                     EditDistance, Levenshtein)
+                                     DamerauOsaFast, DistanceAlgorithm,
+                                     EditDistance, Levenshtein,
+                                     LevenshteinFast)
 
 def build_test_strings():
     alphabet = "abcd"
@@ -297,3 +299,93 @@ class TestEditDistance(unittest.TestCase):
         distance = comparer.distance(short_string, very_long_string,
                                      max_distance)
         self.assertEqual(-1, distance)
+
+    def test_edit_distance_fast_algorithms(self):
+        edit_distance = EditDistance(DistanceAlgorithm.LEVENSHTEIN_FAST)
+        self.assertIsInstance(edit_distance._distance_comparer,
+                              LevenshteinFast)
+        self.assertEqual(get_levenshtein("abcd", "badc", 3),
+                         edit_distance.compare("abcd", "badc", 3))
+        edit_distance = EditDistance(DistanceAlgorithm.DAMERUAUOSA_FAST)
+        self.assertIsInstance(edit_distance._distance_comparer,
+                              DamerauOsaFast)
+        self.assertEqual(2, edit_distance.compare("abcd", "badc", 3))
+
+    def test_levenshtein_fast_match_ref(self):
+        comparer = LevenshteinFast()
+        for max_distance in (0, 1, 3, sys.maxsize):
+            for s1 in self.test_strings:
+                for s2 in self.test_strings:
+                    self.assertEqual(get_levenshtein(s1, s2, max_distance),
+                                     comparer.distance(s1, s2,
+                                                       max_distance))
+
+    def test_damerau_osa_fast_match_ref(self):
+        comparer = DamerauOsaFast()
+        for max_distance in (0, 1, 3, sys.maxsize):
+            for s1 in self.test_strings:
+                for s2 in self.test_strings:
+                    self.assertEqual(get_damerau_osa(s1, s2, max_distance),
+                                     comparer.distance(s1, s2,
+                                                       max_distance))
+
+    def test_fast_null_and_negative_max_distance(self):
+        short_string = "string"
+        long_string = "long_string"
+        for comparer in (LevenshteinFast(), DamerauOsaFast()):
+            self.assertEqual(len(short_string),
+                             comparer.distance(short_string, None, 10))
+            self.assertEqual(-1, comparer.distance(None, long_string, 10))
+            self.assertEqual(0, comparer.distance(None, None, 10))
+            for max_distance in (0, -1):
+                self.assertEqual(-1, comparer.distance(short_string, None,
+                                                       max_distance))
+                self.assertEqual(0, comparer.distance(None, None,
+                                                      max_distance))
+                self.assertEqual(0, comparer.distance(short_string,
+                                                      short_string,
+                                                      max_distance))
+            self.assertEqual(-1, comparer.distance(short_string,
+                                                   "very_long_string", 5))
+
+    def test_fast_long_strings_fall_back(self):
+        string_1 = "ab" * 40
+        string_2 = "ba" + "ab" * 39 + "c"
+        self.assertEqual(get_levenshtein(string_1, string_2, 5),
+                         LevenshteinFast().distance(string_1, string_2, 5))
+        self.assertEqual(get_damerau_osa(string_1, string_2, 5),
+                         DamerauOsaFast().distance(string_1, string_2, 5))
+
+    def test_fast_reuses_pattern_masks(self):
+        comparer = DamerauOsaFast()
+        comparer.distance("steams", "steems", 2)
+        masks = comparer._pattern_masks
+        self.assertEqual(1, comparer.distance("steams", "streams", 2))
+        self.assertIs(masks, comparer._pattern_masks)
+        self.assertEqual(0b100001, masks["s"])
+        self.assertEqual(1, comparer.distance("pipe", "pips", 2))
+        self.assertIsNot(masks, comparer._pattern_masks)
+
+    def test_fast_batch_match_ref(self):
+        strings_2 = self.test_strings + ["abcdabcd", "dcbadcba", "Abécd"]
+        for comparer, get_distance in ((LevenshteinFast(), get_levenshtein),
+                                       (DamerauOsaFast(), get_damerau_osa)):
+            comparer.min_batch_size = 1
+            for max_distance in (0, 1, 3, sys.maxsize):
+                for s1 in self.test_strings + ["abcdabcd"]:
+                    self.assertEqual(
+                        [get_distance(s1, s2, max_distance)
+                         for s2 in strings_2],
+                        comparer.distances(s1, strings_2, max_distance))
+
+    def test_compare_batch(self):
+        edit_distance = EditDistance(DistanceAlgorithm.DAMERUAUOSA)
+        self.assertFalse(edit_distance.supports_batch)
+        self.assertEqual([1, 2, -1], edit_distance.compare_batch(
+            "abcd", ["abc", "badc", "dcba"], 2))
+        edit_distance = EditDistance(DistanceAlgorithm.DAMERUAUOSA_FAST)
+        self.assertTrue(edit_distance.supports_batch)
+        self.assertEqual(DamerauOsaFast.min_batch_size,
+                         edit_distance.min_batch_size)
+        self.assertEqual([1, 2, -1], edit_distance.compare_batch(
+            "abcd", ["abc", "badc", "dcba"], 2))
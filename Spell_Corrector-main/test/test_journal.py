@@ -0,0 +1,80 @@
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+import pytest
+
+from symspellpy import SymSpell
+from symspellpy.journal import Journal
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal_path = os.path.join(self.temp_dir, "dict.journal")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_append_and_replay(self):
+        journal = Journal(self.journal_path)
+        self.assertEqual(1, journal.append_create("steama", 4))
+        self.assertEqual(2, journal.append_create("steamb", 6))
+        self.assertEqual(3, journal.append_delete("steama"))
+        journal.close()
+
+        journal = Journal(self.journal_path)
+        self.assertEqual(3, journal.last_seq)
+        self.assertEqual([(2, "+", "steamb", 6), (3, "-", "steama", None)],
+                         journal.entries(after=1))
+        sym_spell = SymSpell()
+        self.assertEqual(3, journal.replay(sym_spell))
+        self.assertEqual({"steamb": 6}, sym_spell.words)
+        sym_spell = SymSpell()
+        self.assertEqual(1, journal.replay(sym_spell, upto=1))
+        self.assertEqual({"steama": 4}, sym_spell.words)
+        journal.close()
+
+    def test_invalid_key(self):
+        journal = Journal(self.journal_path)
+        for key in ("a\tb", "a\nb"):
+            with pytest.raises(ValueError) as excinfo:
+                journal.append_create(key, 1)
+            self.assertEqual("key cannot contain tabs or line breaks",
+                             str(excinfo.value))
+        self.assertEqual(0, journal.last_seq)
+        journal.close()
+
+    def test_partial_line_dropped(self):
+        with open(self.journal_path, "w") as outfile:
+            outfile.write("1\t+\tsteama\t4\n2\t+\tste")
+        journal = Journal(self.journal_path)
+        self.assertEqual(1, journal.last_seq)
+        self.assertEqual(2, journal.append_create("steamb", 6))
+        self.assertEqual([(1, "+", "steama", 4), (2, "+", "steamb", 6)],
+                         journal.entries())
+        journal.close()
+
+    def test_compact(self):
+        journal = Journal(self.journal_path)
+        journal.append_create("steama", 4)
+        journal.append_create("steamb", 6)
+        journal.append_create("steama", 1)
+        journal.append_delete("steamb")
+        journal.append_create("steamb", 2)
+        journal.append_create("steamb", -5)
+        journal.append_delete("steamc")
+        journal.append_create("steamd", 1)
+        expected = SymSpell()
+        journal.replay(expected)
+
+        journal.compact(upto=7)
+        self.assertEqual([(3, "+", "steama", 5), (4, "-", "steamb", None),
+                          (6, "+", "steamb", 2), (7, "-", "steamc", None),
+                          (8, "+", "steamd", 1)], journal.entries())
+        self.assertEqual(9, journal.append_create("steame", 1))
+        sym_spell = SymSpell()
+        journal.replay(sym_spell, upto=8)
+        self.assertEqual(expected.words, sym_spell.words)
+        journal.close()